@@ -0,0 +1,244 @@
+"""
+desc: Grades exported submissions without running a quiz. Submissions are read from a JSONL or CSV file of
+        (student, deck, card, direction, answer) records and graded with the same answer keys the quizzes use.
+        Every record's result and every student's totals can be written out as JSONL or CSV (picked by the
+        file extension).
+
+        The input is streamed in chunks which are graded by a pool of worker processes. Only a few chunks are
+        ever in flight at once, so memory stays bounded no matter how big the file is, and results are written
+        in the same order as the submissions.
+
+        Directions are the ones used by the quizzes (see grading.py). A "reading+meaning" record is graded like
+        the Kanji quiz and is worth 2 points: the meaning goes in its own "meaning" field or after a tab in
+        the answer.
+"""
+
+import collections
+import concurrent.futures
+import csv
+import io
+import json
+import os
+
+import grading
+import registry
+import reviewlog
+
+FIELDS = ("student", "deck", "card", "direction", "answer")
+RESULT_FIELDS = FIELDS + ("points", "maxPoints", "error")
+TOTAL_FIELDS = ("student", "answers", "points", "maxPoints", "errors")
+
+QUESTION_DIRECTIONS = (grading.FORWARD, grading.REVERSE)
+KANJI_DIRECTIONS = (grading.READING, grading.MEANING, grading.KANJI, reviewlog.READING_AND_MEANING)
+
+def card(deckName, index):
+    """
+    This function is used to get a card (and its answer key). Each worker
+    process builds a card the first time it's graded, and its deck keeps it.
+
+    :param deckName: The name of the deck.
+    :param index: The index of the card in the deck.
+    :return: (deck, card)
+    """
+    import japanese_quiz
+
+    deck = japanese_quiz.openDeck(deckName)
+    return (deck, deck[index])
+
+def gradeRecord(record):
+    """
+    This function is used to grade a single submission.
+
+    :param record: A dict with the FIELDS of a submission (and "meaning" for reading+meaning records).
+    :return: A tuple of the RESULT_FIELDS.
+    """
+    if not isinstance(record, dict):
+        return ("", "", None, "", json.dumps(record, ensure_ascii=False), 0, 1, "bad record")
+    student = str(record.get("student", ""))
+    deckName = record.get("deck", "")
+    direction = record.get("direction", grading.FORWARD)
+    answer = record.get("answer", "")
+    if answer is None:
+        answer = ""
+    answer = str(answer)
+    maxPoints = 2 if direction == reviewlog.READING_AND_MEANING else 1
+
+    # JSON cards are numbers and CSV cards are text. Anything else (1.5, 1e400, true, -1) isn't a card.
+    index = record.get("card")
+    if isinstance(index, str) and index.strip().isdecimal():
+        index = int(index)
+    try:
+        if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+            raise IndexError(index)
+        (deck, element) = card(deckName, index)
+    except (KeyError, IndexError):
+        return (student, deckName, record.get("card"), direction, answer, 0, maxPoints, "unknown card")
+
+    if deck.kind == "kanji":
+        if direction not in KANJI_DIRECTIONS:
+            return (student, deckName, index, direction, answer, 0, maxPoints, "bad direction")
+        if direction == reviewlog.READING_AND_MEANING:
+            meaning = record.get("meaning")
+            if meaning is None:
+                (answer, _, meaning) = answer.partition("\t")
+            points = element.isCorrect(answer, str(meaning))[0]
+            answer = answer + "\t" + str(meaning)
+        else:
+            points = int(grading.grade(element.answerKey, direction, answer))
+    else:
+        if direction not in QUESTION_DIRECTIONS:
+            return (student, deckName, index, direction, answer, 0, maxPoints, "bad direction")
+        points = int(element.isCorrect(answer, direction))
+
+    return (student, deckName, index, direction, answer, points, maxPoints, "")
+
+def gradeChunk(kind, items, resultsKind=None):
+    """
+    This function is used to grade a chunk of submissions (in a worker process).
+    The results are also formatted here so the parent process only has to
+    write them out.
+
+    :param kind: "jsonl" if the items are raw JSON lines, "csv" if they're already dicts.
+    :param items: The submissions.
+    :param resultsKind: The format of the results file ("jsonl", "csv", or None if there isn't one).
+    :return: (a list of result tuples, the formatted results)
+    """
+    results = []
+    for item in items:
+        if kind == "jsonl":
+            try:
+                record = json.loads(item)
+            except ValueError:
+                results.append(("", "", None, "", item.rstrip("\n"), 0, 1, "bad record"))
+                continue
+        else:
+            record = item
+        results.append(gradeRecord(record))
+    return (results, formatRows(results, RESULT_FIELDS, resultsKind))
+
+def formatRows(rows, fields, kind):
+    """
+    This function is used to format rows for a results file.
+
+    :param rows: The rows.
+    :param fields: The names of the columns.
+    :param kind: "jsonl", "csv", or None (which formats nothing).
+    :return: The formatted rows.
+    """
+    if kind is None:
+        return ""
+    if kind == "csv":
+        text = io.StringIO()
+        csv.writer(text).writerows(rows)
+        return text.getvalue()
+    return "".join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n" for row in rows)
+
+def formatOf(path):
+    """
+    This function is used to pick a file format from a file's extension.
+
+    :param path: The path of the file.
+    :return: "csv" or "jsonl".
+    """
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+def readChunks(path, chunkSize):
+    """
+    This function is used to stream a submissions file in chunks. JSON lines
+    are handed to the workers unparsed, CSV rows are parsed here since a
+    quoted field can span lines.
+
+    :param path: The path of the submissions file.
+    :param chunkSize: How many submissions go in each chunk.
+    :return: A generator of (kind, items) chunks.
+    """
+    kind = formatOf(path)
+    with open(path, newline="" if kind == "csv" else None, encoding="utf-8") as f:
+        rows = csv.DictReader(f) if kind == "csv" else (line for line in f if line.strip())
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunkSize:
+                yield (kind, chunk)
+                chunk = []
+        if chunk:
+            yield (kind, chunk)
+
+class Writer:
+    """
+    Used to write formatted rows to a JSONL or CSV file (or nowhere).
+    """
+    def __init__(self, path, fields):
+        """
+        This function is used to open the output file.
+
+        :param self: The object.
+        :param path: The path of the file (None to throw the rows away).
+        :param fields: The names of the columns.
+        """
+        self.fields = fields
+        self.file = None
+        self.kind = None
+        if path is not None:
+            self.kind = formatOf(path)
+            self.file = open(path, "w", newline="" if self.kind == "csv" else None, encoding="utf-8")
+            if self.kind == "csv":
+                csv.writer(self.file).writerow(fields)
+
+    def write(self, text):
+        if self.file is not None:
+            self.file.write(text)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+def gradeFile(path, resultsPath=None, totalsPath=None, workers=None, chunkSize=5000):
+    """
+    This function is used to grade a whole submissions file.
+
+    :param path: The path of the submissions file (.jsonl or .csv).
+    :param resultsPath: Where to write the result of every submission (None to skip).
+    :param totalsPath: Where to write each student's totals (None to skip).
+    :param workers: How many worker processes to use (0 grades in this process, None uses every CPU).
+    :param chunkSize: How many submissions each worker grades at a time.
+    :return: A dict of student to [answers, points, maxPoints, errors].
+    """
+    totals = collections.defaultdict(lambda: [0, 0, 0, 0])
+    results = Writer(resultsPath, RESULT_FIELDS)
+
+    def collect(graded):
+        (rows, text) = graded
+        results.write(text)
+        for row in rows:
+            total = totals[row[0]]
+            total[0] += 1
+            total[1] += row[5]
+            total[2] += row[6]
+            total[3] += bool(row[7])
+
+    # decks.bin is compiled here (if it's missing or out of date) so the workers only ever open it.
+    registry.decks()
+
+    chunks = readChunks(path, chunkSize)
+    if workers == 0:
+        for (kind, items) in chunks:
+            collect(gradeChunk(kind, items, results.kind))
+    else:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        inFlight = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for (kind, items) in chunks:
+                inFlight.append(pool.submit(gradeChunk, kind, items, results.kind))
+                if len(inFlight) >= 2 * workers:
+                    collect(inFlight.popleft().result())
+            while inFlight:
+                collect(inFlight.popleft().result())
+    results.close()
+
+    if totalsPath is not None:
+        writer = Writer(totalsPath, TOTAL_FIELDS)
+        writer.write(formatRows([(student,) + tuple(total) for (student, total) in sorted(totals.items())], TOTAL_FIELDS, writer.kind))
+        writer.close()
+    return dict(totals)
@@ -0,0 +1,526 @@
+"""
+desc: The benchmark suite. It times deck compilation and loading, the script checks, answer grading, and whole
+        quizzes. Quizzes are run through the real terminal code (kanaQuiz, kanjiQuizPrompt, vocabQuizPrompt) with
+        a replay backend in place of input() and print(): a scripted learner takes each quiz once to record an
+        answer stream, and the benchmark replays that stream with the same random seed, so every run asks
+        exactly the same prompts. A recorded answer file (one answer per line) can be replayed the same way.
+
+        Every run is stored in benchmarks.json and each benchmark is compared with its last stored result.
+        Anything that got slower by more than the tolerance is reported as a regression and the suite exits
+        with a failure. So does starting the quiz when importing japanese_quiz goes over IMPORT_BUDGET or
+        when getting as far as the menu imports one of the modules that are only meant to be imported once a
+        quiz starts (LAZY_MODULES).
+
+        python3 benchmarks.py [--tolerance 0.25] [--only NAME] [--replay DECK ANSWERS]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import deckfile
+import grading
+import japanese_quiz
+import romaji
+
+RESULTS_PATH = os.path.join(deckfile.HERE, "benchmarks.json")
+SEED = 1234
+MIN_TIME = 0.2          # Every benchmark is repeated until it has run for at least this long.
+IMPORT_BUDGET = 0.025   # The most importing japanese_quiz can take (in seconds, as measured by -X importtime).
+
+# Modules the quiz only imports once a quiz starts (or a color is printed), never just to show the menu.
+LAZY_MODULES = ("colorama", "confusion", "session", "reviewlog", "sqlite3", "fuzzy", "distractors", "numpy", "japanese_questions")
+
+# Runs the quiz (with the arguments it's given) until the menu asks for a quiz, then prints every module imported
+# by then. There's never an interrupted quiz to offer, since resuming one is meant to import the session.
+STARTUP = """
+import builtins, os.path, runpy, sys
+exists = os.path.exists
+os.path.exists = lambda path: not path.endswith("session.bin") and exists(path)
+def menu(prompt=""):
+    print(" ".join(sys.modules))
+    raise SystemExit
+builtins.input = menu
+sys.argv = ["japanese_quiz.py"] + sys.argv[1:]
+runpy.run_path("japanese_quiz.py", run_name="__main__")
+"""
+
+class ReplayBackend:
+    """
+    Used in place of input() and print() to feed a quiz a stream of answers.
+    """
+    def __init__(self, answers=(), learner=None):
+        """
+        This function is used to create a ReplayBackend object.
+
+        :param self: The object.
+        :param answers: The answers, in the order input() is called.
+        :param learner: Called with (the text printed before the prompt, the prompt) to make up an answer
+                        once the answers run out (None raises EOFError like input() at the end of a file).
+        """
+        self.answers = list(answers)
+        self.position = 0
+        self.learner = learner
+        self.recorded = []
+        self.shown = []
+        self.prompts = 0
+
+    def print(self, *args, sep=" ", end="\n", **kwargs):
+        self.shown.append(sep.join(str(a) for a in args) + end)
+
+    def input(self, prompt=""):
+        """
+        This function is used to answer a prompt.
+
+        :param self: The backend.
+        :param prompt: The prompt.
+        :return: The answer.
+        """
+        self.prompts += 1
+        if self.position < len(self.answers):
+            answer = self.answers[self.position]
+            self.position += 1
+        elif self.learner is not None:
+            text = "".join(self.shown).strip().split("\n")[-1] if self.shown else ""
+            answer = self.learner(text, prompt)
+        else:
+            raise EOFError("the answers ran out")
+        self.shown = []
+        self.recorded.append(answer)
+        return answer
+
+@contextlib.contextmanager
+def installed(backend):
+    """
+    This function is used to run the quiz with a backend in place of
+    input() and print(). The session file goes to a temporary directory.
+
+    :param backend: The backend.
+    :return: A context manager.
+    """
+    saved = japanese_quiz.SESSION_PATH
+    with tempfile.TemporaryDirectory() as directory:
+        japanese_quiz.input = backend.input
+        japanese_quiz.print = backend.print
+        japanese_quiz.SESSION_PATH = os.path.join(directory, "session.bin")
+        try:
+            yield backend
+        finally:
+            del japanese_quiz.input
+            del japanese_quiz.print
+            japanese_quiz.SESSION_PATH = saved
+
+def answerSheet(deck):
+    """
+    This function is used to build the answers a scripted learner knows:
+    the right answer for every prompt (and label) a deck can show.
+
+    :param deck: The deck.
+    :return: A dict of (prompt text, label) to the answer.
+    """
+    sheet = {}
+    for card in deck:
+        if deck.kind == "kana":
+            sheet[(card.question, ": ")] = card.correctAnswer
+        elif deck.kind == "kanji":
+            sheet[(card.kanji, "Enter the Hiragana of this Kanji?: ")] = card.hiragana
+            sheet[(card.kanji, "What does this Kanji mean?: ")] = card.meaning.split("/")[0]
+            sheet[(card.meaning, "What is the Kanji for the word above?: ")] = card.kanji
+        else:
+            forward = card.question if card.context is None else card.question + " (" + card.context + ")"
+            sheet[(forward, "What is the Japanese for the word above?: ")] = card.correctAnswer
+            sheet[(card.reverseQuestion("Vocab").question, "What is the English for the word above?: ")] = card.question.split("/")[0]
+    return sheet
+
+def scriptedLearner(deck, accuracy, rng):
+    """
+    This function is used to make a learner that gets a share of the
+    answers right and says yes to everything else.
+
+    :param deck: The deck the learner is quizzed on.
+    :param accuracy: The chance of answering right.
+    :param rng: The random number generator.
+    :return: A learner for ReplayBackend.
+    """
+    sheet = answerSheet(deck)
+
+    def learner(text, prompt):
+        if prompt.startswith("Do you have a Japanese keyboard"):
+            return "y"
+        # The kanji prompt's second answer comes right after the first, with nothing printed in between.
+        answer = sheet.get((text, prompt)) or sheet.get((learner.last, prompt))
+        if text:
+            learner.last = text
+        if answer is None:
+            return ""
+        return answer if rng.random() < accuracy else "x"
+    learner.last = None
+    return learner
+
+QUIZZES = {"kana": lambda deck: japanese_quiz.kanaQuiz(deck.title, deck),
+           "kanji": japanese_quiz.kanjiQuizPrompt,
+           "vocab": japanese_quiz.vocabQuizPrompt}
+
+def record(deckName, accuracy=0.7, seed=SEED):
+    """
+    This function is used to record the answers a scripted learner gives
+    in a quiz.
+
+    :param deckName: The name of the deck.
+    :param accuracy: The chance of answering right.
+    :param seed: The random seed the quiz is run with.
+    :return: The list of answers.
+    """
+    deck = japanese_quiz.openDeck(deckName)
+    backend = ReplayBackend(learner=scriptedLearner(deck, accuracy, random.Random(seed)))
+    random.seed(seed)
+    with installed(backend):
+        QUIZZES[deck.kind](deck)
+    return backend.recorded
+
+def replay(deckName, answers, seed=SEED):
+    """
+    This function is used to replay a stream of answers through a quiz.
+
+    :param deckName: The name of the deck.
+    :param answers: The answers.
+    :param seed: The random seed the quiz is run with (the one it was recorded with).
+    :return: How many prompts were answered.
+    """
+    deck = japanese_quiz.openDeck(deckName)
+    backend = ReplayBackend(answers)
+    random.seed(seed)
+    with installed(backend):
+        QUIZZES[deck.kind](deck)
+    return backend.prompts
+
+def sessionAnswers(deckName, seed, accuracy=0.7):
+    """
+    This function is used to record the answers a scripted learner gives
+    in a session (without the terminal prompts), for renderer.playFile.
+
+    :param deckName: The name of the deck.
+    :param seed: The seed of the session.
+    :param accuracy: The chance of answering right.
+    :return: A session dict (deck, answers, seed).
+    """
+    import renderer
+    import session
+
+    deck = japanese_quiz.openDeck(deckName)
+    quiz = session.QuizSession(deck, rng=random.Random(seed))
+    sheet = answerSheet(deck)
+    rng = random.Random(seed)
+    answers = []
+
+    def answer(label):
+        given = sheet.get((quiz.prompt.text, label + ": "))
+        answers.append(given if given is not None and rng.random() < accuracy else "x")
+        return answers[-1]
+    renderer.playSession(quiz, renderer.PlainRenderer(io.StringIO()), answer)
+    return {"deck": deckName, "answers": answers, "seed": seed}
+
+def measure(function):
+    """
+    This function is used to time a benchmark. The function is run until
+    MIN_TIME has passed (at least 3 times) and the fastest run is kept.
+
+    :param function: Runs the benchmark once and returns how many operations it did.
+    :return: Operations per second.
+    """
+    best = None
+    total = 0.0
+    runs = 0
+    while runs < 3 or total < MIN_TIME:
+        start = time.perf_counter()
+        operations = function()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        runs += 1
+        rate = operations / elapsed if elapsed > 0 else float("inf")
+        if best is None or rate > best:
+            best = rate
+    return best
+
+def startup():
+    """
+    This function is used to start a new interpreter that imports the quiz.
+
+    :return: How long the import took (in seconds).
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import japanese_quiz"], cwd=deckfile.HERE,
+                             capture_output=True, text=True, check=True)
+    line = [l for l in process.stderr.splitlines() if l.endswith("| japanese_quiz")][-1]
+    return int(line.split("|")[1]) / 1e6
+
+def startupModules(args=()):
+    """
+    This function is used to start the quiz in a new interpreter and stop
+    it at the menu (see STARTUP).
+
+    :param args: The quiz's command line arguments.
+    :return: The set of modules imported before the menu was shown.
+    """
+    process = subprocess.run([sys.executable, "-c", STARTUP] + list(args), cwd=deckfile.HERE,
+                             capture_output=True, text=True, check=True)
+    return set(process.stdout.splitlines()[-1].split())
+
+def startupProblems(budget=IMPORT_BUDGET, rounds=5):
+    """
+    This function is used to check that the quiz starts quickly: importing
+    japanese_quiz has to fit in the budget (the fastest of a few tries
+    counts), and getting to the menu can't import any of LAZY_MODULES.
+
+    :param budget: The most the import can take (in seconds).
+    :param rounds: How many times the import is timed.
+    :return: A list of problems (empty if there aren't any).
+    """
+    problems = []
+    times = []
+    for _ in range(rounds):
+        times.append(startup())
+    if min(times) > budget:
+        problems.append("importing japanese_quiz took {:.1f}ms (the budget is {:.1f}ms)".format(min(times) * 1000, budget * 1000))
+    modules = startupModules(["--user", "benchmark"])
+    for module in LAZY_MODULES:
+        if module in modules:
+            problems.append("starting the quiz imported {}".format(module))
+    return problems
+
+def benchmarks(directory):
+    """
+    This function is used to build every benchmark.
+
+    :param directory: A scratch directory for the files the benchmarks write.
+    :return: A list of (name, unit, function) tuples.
+    """
+    import japanese_questions
+
+    suite = []
+
+    def coldStart():
+        subprocess.run([sys.executable, "-c", "import japanese_quiz"], cwd=deckfile.HERE, check=True)
+        return 1
+    suite.append(("startup", "starts/s", coldStart))
+    path = os.path.join(directory, "decks.bin")
+    cardCount = sum(len(cards) for (_, _, _, cards) in japanese_questions.DECKS)
+
+    def compileDecks():
+        deckfile.compileDecks(japanese_questions.DECKS, path)
+        return cardCount
+    suite.append(("deck compile", "cards/s", compileDecks))
+
+    def loadDecks():
+        with deckfile.DeckFile(path) as deckFile:
+            count = 0
+            for deck in deckFile.decks():
+                deck.factory = japanese_quiz.KanjiQuestion if deck.kind == "kanji" else japanese_quiz.Question
+                for _ in deck:
+                    count += 1
+            return count
+    compileDecks()
+    suite.append(("deck load", "cards/s", loadDecks))
+
+    decks = [japanese_quiz.openDeck(name) for (name, _, _, _) in japanese_questions.DECKS]
+    texts = [f for deck in decks for i in range(len(deck)) for f in deck.fields(i) if isinstance(f, str)]
+
+    def scriptChecks():
+        for t in texts:
+            japanese_quiz.isHiragana(t)
+            japanese_quiz.isKatakana(t)
+        return 2 * len(texts)
+    suite.append(("isHiragana/isKatakana", "checks/s", scriptChecks))
+
+    questions = [card for deck in decks if deck.kind != "kanji" for card in deck]
+    responses = [(q, r) for q in questions for r in [q.correctAnswer, "x"] + grading.alternatesOf(q.alternateAnswers)]
+
+    def isAlternate():
+        for (q, r) in responses:
+            q.isAlternate(r)
+        return len(responses)
+    suite.append(("Question.isAlternate", "answers/s", isAlternate))
+
+    romajiResponses = [(q, romaji.toRomaji(q.correctAnswer)) for q in questions if romaji.isKana(q.correctAnswer)]
+
+    def isCorrect():
+        for (q, r) in romajiResponses:
+            q.isCorrect(r)
+        return len(romajiResponses)
+    suite.append(("Question.isCorrect (romaji)", "answers/s", isCorrect))
+
+    kanji = [card for deck in decks if deck.kind == "kanji" for card in deck]
+    kanjiResponses = [(k, h, m) for k in kanji for (h, m) in [(k.hiragana, k.meaning.split("/")[0]), ("x", k.meaning.lower()), ("x", "x")]]
+
+    def kanjiIsCorrect():
+        for (k, h, m) in kanjiResponses:
+            k.isCorrect(h, m)
+        return len(kanjiResponses)
+    suite.append(("KanjiQuestion.isCorrect", "answers/s", kanjiIsCorrect))
+
+    for deckName in ("hiragana", "kanji-lesson4", "vocab-chapter3"):
+        answers = record(deckName)
+        suite.append(("replay " + deckName, "prompts/s", lambda deckName=deckName, answers=answers: replay(deckName, answers)))
+
+    import renderer
+
+    sessionsPath = os.path.join(directory, "sessions.jsonl")
+    with open(sessionsPath, "w", encoding="utf-8") as f:
+        for seed in range(30):
+            entry = sessionAnswers(("hiragana", "kanji-lesson4", "vocab-chapter3")[seed % 3], seed)
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    for (name, Renderer) in sorted(renderer.RENDERERS.items()):
+        play = lambda Renderer=Renderer: renderer.playFile(sessionsPath, japanese_quiz.openDeck, Renderer(io.StringIO()))[0]
+        suite.append(("play sessions ({})".format(name), "sessions/s", play))
+
+    import metrics
+
+    latencies = [int(random.Random(SEED).lognormvariate(14, 1.5)) for _ in range(10000)]
+
+    def recordLatencies():
+        histogram = metrics.Histogram()
+        for latency in latencies:
+            histogram.record(latency)
+        histogram.percentile(99)
+        return len(latencies)
+    suite.append(("Histogram.record", "values/s", recordLatencies))
+
+    import linter
+
+    def lintDecks():
+        linter.lint([deck.name for deck in decks], workers=0)
+        return cardCount
+    suite.append(("lint", "cards/s", lintDecks))
+
+    import components
+
+    # A table the size of KRADFILE (made up, so the benchmark doesn't need it imported).
+    rng = random.Random(SEED)
+    radicals = [chr(0x2E80 + i) for i in range(250)]
+    weights = [1 / (i + 1) for i in range(len(radicals))]
+    table = {chr(0x4E00 + i): rng.choices(radicals, weights, k=rng.randint(2, 6)) for i in range(13000)}
+    lookAlikes = components.ComponentIndex(table)
+    queries = list(table)[::13]
+
+    def findLookAlikes():
+        for ch in queries:
+            lookAlikes.similar(ch, 3, limit=20)
+        return len(queries)
+    suite.append(("ComponentIndex.similar (13k Kanji)", "queries/s", findLookAlikes))
+
+    import calibration
+
+    (users, items, points, _, _) = calibration.simulate(200000)
+    fitted = calibration.Calibration()
+    fitted.add(users.tolist(), items.tolist(), points, [1] * len(points))
+
+    def fitModel():
+        for values in (fitted.ability, fitted.difficulty):
+            values[:] = 0.0
+        fitted.fit()
+        return len(points)
+    suite.append(("Calibration.fit (1PL)", "answers/s", fitModel))
+
+    import conjugation
+
+    vocab = [deck for deck in decks if deck.kind == "vocab"]
+
+    def conjugationDrills():
+        count = 0
+        conjugation.conjugate.cache_clear()
+        for deck in vocab:
+            for _ in conjugation.ConjugationDeck(deck, japanese_quiz.Question):
+                count += 1
+        return count
+    suite.append(("conjugation drills", "cards/s", conjugationDrills))
+    return suite
+
+def loadResults():
+    """
+    This function is used to load every stored run (benchmarks.json).
+
+    :return: A list of runs, oldest first.
+    """
+    if not os.path.exists(RESULTS_PATH):
+        return []
+    with open(RESULTS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def saveResults(runs):
+    """
+    This function is used to store every run (benchmarks.json).
+
+    :param runs: The list of runs.
+    :return: None
+    """
+    with open(RESULTS_PATH + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(runs, f, indent=1)
+    os.replace(RESULTS_PATH + ".tmp", RESULTS_PATH)
+
+def run(tolerance=0.25, only=None, save=True):
+    """
+    This function is used to run the suite and compare it with the last run.
+
+    :param tolerance: How much slower (0.25 = 25%) a benchmark can get before it's a regression.
+    :param only: Only run the benchmarks whose name contains this.
+    :param save: Whether to store the results.
+    :return: A list of failures (regressions and startup problems).
+    """
+    runs = loadResults()
+    previous = {}
+    for past in runs:
+        previous.update(past["results"])
+    results = {}
+    failures = []
+
+    print("{:<30} {:>14} {:>10}  {}".format("benchmark", "rate", "change", "unit"))
+    with tempfile.TemporaryDirectory() as directory:
+        for (name, unit, function) in benchmarks(directory):
+            if only and only not in name:
+                continue
+            rate = measure(function)
+            results[name] = rate
+            change = ""
+            if name in previous:
+                ratio = rate / previous[name] - 1
+                change = "{:+.1%}".format(ratio)
+                if ratio < -tolerance:
+                    failures.append("{} is {:.0%} slower".format(name, -ratio))
+                    change += " !"
+            print("{:<30} {:>14,.0f} {:>10}  {}".format(name, rate, change, unit))
+
+    if not only:
+        failures.extend(startupProblems())
+
+    if save:
+        runs.append({"timestamp": time.time(), "python": sys.version.split()[0], "results": results})
+        saveResults(runs)
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Japanese Quiz benchmarks")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="how much slower a benchmark can get (0.25 = 25%%)")
+    parser.add_argument("--only", help="only run the benchmarks whose name contains this")
+    parser.add_argument("--no-save", action="store_true", help="don't store this run")
+    parser.add_argument("--replay", nargs=2, metavar=("DECK", "ANSWERS"), help="replay an answer file (one answer per line) through a quiz")
+    args = parser.parse_args()
+
+    if args.replay:
+        (deckName, path) = args.replay
+        with open(path, encoding="utf-8") as f:
+            answers = f.read().split("\n")
+        start = time.perf_counter()
+        prompts = replay(deckName, answers)
+        print("[!] Replayed {} prompts in {:.3f}s.".format(prompts, time.perf_counter() - start))
+    else:
+        failures = run(args.tolerance, args.only, not args.no_save)
+        for failure in failures:
+            print("[!] " + failure)
+        if failures:
+            sys.exit(1)
@@ -0,0 +1,389 @@
+"""
+desc: Card difficulty and learner ability, fitted with an item response model over every answer in the review log.
+        A raw score (10/15) depends on how hard the deck was; the model puts every card and every learner on one
+        scale instead: a learner with ability θ gets a card with difficulty b right with probability
+        1 / (1 + e^(-a(θ - b))). The 1PL (Rasch) model gives every card the same a, the 2PL model fits an a
+        (how sharply the card tells learners apart) for every card too.
+
+        SQLite totals the answers of every (learner, card) pair, so only the pairs reach Python, and the model is
+        fitted to them with NumPy: every iteration is a Newton step for every ability at once, then for every
+        difficulty (and discrimination) at once. Weak priors keep learners and cards with a handful of answers
+        near the middle of the scale.
+
+        The pairs and the fitted model are saved in cache/ along with the id of the last answer counted. Later
+        fits only read the answers logged since, and start from the saved model, so they take a few iterations.
+
+        python3 calibration.py [--model 2pl] [--user NAME] [--deck hiragana]
+"""
+
+import argparse
+import os
+import time
+
+import deckfile
+
+CACHE_PATH = os.path.join(deckfile.HERE, "cache", "calibration-{}.npz")    # Formatted with the model.
+MODELS = ("1pl", "2pl")
+TARGET = 0.7            # The chance of getting a card right that a learner's level is matched to.
+ABILITY_PRIOR = 1.0     # The standard deviation of the abilities (and the difficulties) before any answers.
+DISCRIMINATION_PRIOR = 0.5      # The standard deviation of the discriminations around 1 (2PL only).
+MAX_STEP = 1.0          # The furthest one Newton step moves a value.
+
+class Calibration:
+    """
+    Used to keep the (learner, card) answer totals and the model fitted to them.
+    """
+    def __init__(self, model="1pl"):
+        """
+        This function is used to create an empty Calibration object.
+
+        :param self: The object.
+        :param model: "1pl" or "2pl".
+        """
+        import numpy as np
+
+        if model not in MODELS:
+            raise ValueError("unknown model {!r} (expected one of {})".format(model, ", ".join(MODELS)))
+        self.model = model
+        self.users = []         # Every learner, by index.
+        self.items = []         # Every (deck, card), by index.
+        self.userIndex = {}
+        self.itemIndex = {}
+        self.pairUsers = np.zeros(0, dtype=np.int64)    # The learner of every pair.
+        self.pairItems = np.zeros(0, dtype=np.int64)    # The card of every pair.
+        self.points = np.zeros(0, dtype=np.float64)     # The points the learner got on the card.
+        self.maxPoints = np.zeros(0, dtype=np.float64)  # The points the learner could have got.
+        self.ability = np.zeros(0, dtype=np.float64)
+        self.difficulty = np.zeros(0, dtype=np.float64)
+        self.discrimination = np.zeros(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.points)
+
+    def indexOf(self, keys, index, values):
+        """
+        This function is used to get the index of every key, adding the ones
+        that haven't been seen yet.
+
+        :param self: The calibration.
+        :param keys: The keys (learners or cards).
+        :param index: The dict of key to index.
+        :param values: The list of keys by index.
+        :return: A list of indices.
+        """
+        found = []
+        for key in keys:
+            i = index.get(key)
+            if i is None:
+                i = index[key] = len(values)
+                values.append(key)
+            found.append(i)
+        return found
+
+    def add(self, users, items, points, maxPoints):
+        """
+        This function is used to add answer totals. Totals for a pair that's
+        already known are added to it.
+
+        :param self: The calibration.
+        :param users: The learner of every total.
+        :param items: The (deck, card) of every total.
+        :param points: The points of every total.
+        :param maxPoints: The most points of every total.
+        :return: None
+        """
+        import numpy as np
+
+        if not len(points):
+            return
+        u = np.concatenate([self.pairUsers, self.indexOf(users, self.userIndex, self.users)])
+        i = np.concatenate([self.pairItems, self.indexOf(items, self.itemIndex, self.items)])
+        (pairs, inverse) = np.unique(u * len(self.items) + i, return_inverse=True)
+        self.points = np.bincount(inverse, np.concatenate([self.points, points]), len(pairs))
+        self.maxPoints = np.bincount(inverse, np.concatenate([self.maxPoints, maxPoints]), len(pairs))
+        (self.pairUsers, self.pairItems) = np.divmod(pairs, len(self.items))
+
+        # New learners start in the middle, new cards at the middle of the cards seen so far.
+        grow = lambda values, size, start: np.concatenate([values, np.full(size - len(values), start, dtype=np.float64)])
+        self.ability = grow(self.ability, len(self.users), 0.0)
+        self.difficulty = grow(self.difficulty, len(self.items), float(self.difficulty.mean()) if len(self.difficulty) else 0.0)
+        self.discrimination = grow(self.discrimination, len(self.items), 1.0)
+
+    def addLog(self, log, since=0):
+        """
+        This function is used to add the answers in the review log. SQLite
+        totals them for every (learner, card) pair.
+
+        :param self: The calibration.
+        :param log: The ReviewLog.
+        :param since: Only answers logged after this review id are added.
+        :return: The id of the last review added.
+        """
+        last = log.query("SELECT COALESCE(MAX(id), 0) FROM reviews")[0][0]
+        totals = log.query("""SELECT user, deck, card, SUM(points), SUM(maxPoints) FROM reviews NOT INDEXED
+                              WHERE id > ? AND id <= ? AND maxPoints > 0 GROUP BY 1, 2, 3""", (since, last))
+        if totals:
+            (users, decks, cards, points, maxPoints) = zip(*totals)
+            self.add(users, zip(decks, cards), points, maxPoints)
+        return last
+
+    def fit(self, iterations=100, tolerance=1e-4):
+        """
+        This function is used to fit the model to the answer totals (from
+        wherever it was left, so a refit after a few more answers is quick).
+
+        :param self: The calibration.
+        :param iterations: The most iterations.
+        :param tolerance: Stop once no value moves further than this in an iteration.
+        :return: The number of iterations.
+        """
+        import numpy as np
+
+        if not len(self.points):
+            return 0
+        (u, i, s, n) = (self.pairUsers, self.pairItems, self.points, self.maxPoints)
+        prior = 1 / ABILITY_PRIOR ** 2
+
+        def step(values, gradient, curvature, center, weight):
+            change = np.clip((gradient - weight * (values - center)) / (curvature + weight), -MAX_STEP, MAX_STEP)
+            values += change
+            return float(np.abs(change).max())
+
+        for iteration in range(1, iterations + 1):
+            a = self.discrimination[i]
+            p = 1 / (1 + np.exp(-a * (self.ability[u] - self.difficulty[i])))
+            moved = step(self.ability, np.bincount(u, a * (s - n * p), len(self.users)),
+                         np.bincount(u, a * a * n * p * (1 - p), len(self.users)), 0.0, prior)
+
+            p = 1 / (1 + np.exp(-a * (self.ability[u] - self.difficulty[i])))
+            moved = max(moved, step(self.difficulty, np.bincount(i, -a * (s - n * p), len(self.items)),
+                                    np.bincount(i, a * a * n * p * (1 - p), len(self.items)), 0.0, prior))
+
+            if self.model == "2pl":
+                gap = self.ability[u] - self.difficulty[i]
+                p = 1 / (1 + np.exp(-a * gap))
+                moved = max(moved, step(self.discrimination, np.bincount(i, gap * (s - n * p), len(self.items)),
+                                        np.bincount(i, gap * gap * n * p * (1 - p), len(self.items)), 1.0,
+                                        1 / DISCRIMINATION_PRIOR ** 2))
+                np.clip(self.discrimination, 0.1, 5.0, out=self.discrimination)
+            if moved < tolerance:
+                break
+        return iteration
+
+    def probability(self, user, deck, cards):
+        """
+        This function is used to predict how likely a learner is to get
+        cards right.
+
+        :param self: The calibration.
+        :param user: The learner (one that hasn't answered anything is in the middle).
+        :param deck: The name of the deck.
+        :param cards: The indices of the cards.
+        :return: A NumPy array of probabilities.
+        """
+        import numpy as np
+
+        known = [self.itemIndex.get((deck, card), -1) for card in cards]
+        seen = [i for i in known if i >= 0]
+        # Cards no one has answered yet are as hard as the deck's other cards.
+        middle = float(self.difficulty[seen].mean()) if seen else 0.0
+        difficulty = np.array([self.difficulty[i] if i >= 0 else middle for i in known], dtype=np.float64)
+        discrimination = np.array([self.discrimination[i] if i >= 0 else 1.0 for i in known], dtype=np.float64)
+        ability = self.ability[self.userIndex[user]] if user in self.userIndex else 0.0
+        return 1 / (1 + np.exp(-discrimination * (ability - difficulty)))
+
+    def levelCards(self, deck, user="", size=20, target=TARGET):
+        """
+        This function is used to pick the cards of a deck that are nearest a
+        learner's level: the ones they're most likely to get right target of
+        the time.
+
+        :param self: The calibration.
+        :param deck: The deck.
+        :param user: The learner.
+        :param size: The most cards picked.
+        :param target: The chance of getting a card right to aim for.
+        :return: A list of card indices.
+        """
+        import numpy as np
+
+        chances = self.probability(user, deck.name, range(len(deck)))
+        order = np.argsort(np.abs(chances - target), kind="stable")[:size]
+        return sorted(int(i) for i in order)
+
+    def hardest(self, deck=None, count=10):
+        """
+        This function is used to find the hardest cards.
+
+        :param self: The calibration.
+        :param deck: Only cards of this deck (None for every deck).
+        :param count: How many cards to return.
+        :return: A list of ((deck, card), difficulty, answers), the hardest first.
+        """
+        import numpy as np
+
+        answers = np.bincount(self.pairItems, self.maxPoints, len(self.items))
+        found = [i for (i, item) in enumerate(self.items) if deck is None or item[0] == deck]
+        found.sort(key=lambda i: -self.difficulty[i])
+        return [(self.items[i], float(self.difficulty[i]), int(answers[i])) for i in found[:count]]
+
+    def save(self, path, signature, last):
+        """
+        This function is used to save the answer totals and the model.
+
+        :param self: The calibration.
+        :param path: Where to save them (.npz).
+        :param signature: Saved with them, to tell whether they still match the log.
+        :param last: The id of the last review counted.
+        :return: None
+        """
+        import numpy as np
+
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, signature=np.array(signature), last=np.array(last), model=np.array(self.model),
+                 users=np.array(self.users, dtype=str), decks=np.array([d for (d, _) in self.items], dtype=str),
+                 cards=np.array([c for (_, c) in self.items], dtype=np.int64), pairUsers=self.pairUsers,
+                 pairItems=self.pairItems, points=self.points, maxPoints=self.maxPoints, ability=self.ability,
+                 difficulty=self.difficulty, discrimination=self.discrimination)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, signature):
+        """
+        This function is used to load a saved calibration.
+
+        :param path: Where it was saved.
+        :param signature: The signature it has to have been saved with.
+        :return: (the Calibration, the id of the last review counted), or None if it wasn't saved or doesn't match.
+        """
+        import numpy as np
+
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as saved:
+            if str(saved["signature"]) != signature:
+                return None
+            calibration = cls(str(saved["model"]))
+            calibration.users = [str(user) for user in saved["users"]]
+            calibration.items = [(str(d), int(c)) for (d, c) in zip(saved["decks"], saved["cards"])]
+            calibration.userIndex = {user: i for (i, user) in enumerate(calibration.users)}
+            calibration.itemIndex = {item: i for (i, item) in enumerate(calibration.items)}
+            for name in ("pairUsers", "pairItems", "points", "maxPoints", "ability", "difficulty", "discrimination"):
+                setattr(calibration, name, saved[name].copy())
+            return (calibration, int(saved["last"]))
+
+def fromLog(log, model="1pl", path=None):
+    """
+    This function is used to get the model fitted to every answer in the
+    review log, starting from the saved one and only reading the answers
+    logged since it was saved.
+
+    :param log: The ReviewLog.
+    :param model: "1pl" or "2pl".
+    :param path: Where the calibration is saved (defaults to CACHE_PATH).
+    :return: The Calibration.
+    """
+    path = path or CACHE_PATH.format(model)
+    signature = "{}:{}".format(os.path.abspath(log.path), model)
+    loaded = Calibration.load(path, signature)
+    # A log with fewer answers than were counted was started over.
+    if loaded is None or loaded[1] > log.query("SELECT COALESCE(MAX(id), 0) FROM reviews")[0][0]:
+        loaded = (Calibration(model), 0)
+    (calibration, since) = loaded
+    last = calibration.addLog(log, since)
+    if last != since:
+        calibration.fit()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        calibration.save(path, signature, last)
+    return calibration
+
+def simulate(answers, users=300, items=2000, seed=0):
+    """
+    This function is used to make up answers from a known model.
+
+    :param answers: How many answers.
+    :param users: How many learners.
+    :param items: How many cards.
+    :param seed: The seed of the random numbers.
+    :return: (learner of every answer, card of every answer, points of every answer, the abilities, the difficulties)
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(0, 1, users)
+    difficulty = rng.normal(0, 1, items)
+    u = rng.integers(0, users, answers)
+    i = rng.integers(0, items, answers)
+    points = (rng.random(answers) < 1 / (1 + np.exp(-(ability[u] - difficulty[i])))).astype(np.int64)
+    return (u, i, points, ability, difficulty)
+
+def benchmark(answers=2000000, model="1pl"):
+    """
+    This function is used to measure how long fitting the model to a
+    review log of made up answers takes, from scratch and after more
+    answers are logged.
+
+    :param answers: How many answers are logged.
+    :param model: "1pl" or "2pl".
+    :return: None
+    """
+    import tempfile
+    import numpy as np
+    import reviewlog
+
+    (u, i, points, ability, difficulty) = simulate(answers + answers // 100)
+    with tempfile.TemporaryDirectory() as directory:
+        log = reviewlog.ReviewLog(os.path.join(directory, "reviews.db"), batchSize=50000)
+        start = time.perf_counter()
+        for n in range(answers):
+            log.record("deck", int(i[n]), "forward", "", int(points[n]), 1, "", "user{}".format(u[n]), n)
+        log.flush()
+        logged = time.perf_counter() - start
+
+        path = os.path.join(directory, "calibration.npz")
+        start = time.perf_counter()
+        calibration = fromLog(log, model, path)
+        elapsed = time.perf_counter() - start
+        for n in range(answers, len(points)):
+            log.record("deck", int(i[n]), "forward", "", int(points[n]), 1, "", "user{}".format(u[n]), n)
+        start = time.perf_counter()
+        calibration = fromLog(log, model, path)
+        refit = time.perf_counter() - start
+        log.close()
+
+    fitted = calibration.difficulty[[calibration.itemIndex[("deck", n)] for n in range(len(difficulty))]]
+    abilities = calibration.ability[[calibration.userIndex["user{}".format(n)] for n in range(len(ability))]]
+    print("{} answers logged in {:.1f}s, {} model fitted to {} pairs in {:.2f}s (refitted after {} more answers in {:.2f}s)"
+          .format(answers, logged, model.upper(), len(calibration), elapsed, answers // 100, refit))
+    print("correlation with the true difficulties {:.3f}, abilities {:.3f}"
+          .format(np.corrcoef(fitted, difficulty)[0, 1], np.corrcoef(abilities, ability)[0, 1]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit card difficulties and learner abilities to the review log")
+    parser.add_argument("--model", choices=MODELS, default="1pl", help="1PL (Rasch) or 2PL")
+    parser.add_argument("--user", default="", help="the learner whose level is shown")
+    parser.add_argument("--deck", help="only show the cards of this deck")
+    parser.add_argument("--top", type=int, default=10, help="how many of the hardest cards to show")
+    parser.add_argument("--benchmark", action="store_true", help="time fitting the model to millions of made up answers")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(model=args.model)
+    else:
+        import japanese_quiz
+        import reviewlog
+
+        start = time.perf_counter()
+        log = reviewlog.ReviewLog()
+        calibration = fromLog(log, args.model)
+        log.close()
+        print("[!] {} learners and {} cards from {} (learner, card) pairs in {:.2f}s."
+              .format(len(calibration.users), len(calibration.items), len(calibration), time.perf_counter() - start))
+        if args.user in calibration.userIndex:
+            print("[!] Ability of {}: {:+.2f}".format(args.user or "you", calibration.ability[calibration.userIndex[args.user]]))
+        for ((deck, card), difficulty, answers) in calibration.hardest(args.deck, args.top):
+            try:
+                question = japanese_quiz.openDeck(deck).fields(card)[0]
+            except (KeyError, IndexError):
+                question = "?"
+            print("{:+.2f}  {} #{} {} ({} points asked)".format(difficulty, deck, card, question, answers))
@@ -0,0 +1,271 @@
+"""
+desc: Kanji components, for drilling the Kanji that look alike (未/末, 土/士, 人/入). Every Kanji is broken down into
+        the parts it's written with, and its parts are kept as a bitset (one bit per part), so the Kanji sharing
+        at least k parts with another are found with a bitwise AND and a popcount over every Kanji at once.
+
+        A part written more than once counts once for every time (二 is 一 and 一×2), so 二 and 三 share two
+        parts. The built in table breaks the Kanji of the lesson decks (and their usual look-alikes) down to the
+        strokes that tell them apart. The full KRADFILE decomposition (roughly 13k Kanji) can be imported:
+            python3 importer.py kradfile kradfile.gz
+        and the built in table is laid over it.
+
+        python3 components.py 未 [--k 2]
+"""
+
+import argparse
+import collections
+import os
+import time
+
+import deckfile
+
+IMPORTED_PATH = os.path.join(deckfile.IMPORT_DIR, "components.tsv")     # One "kanji<TAB>parts" line per Kanji.
+SHARED = 2              # How many parts two Kanji share to look alike.
+CLOSENESS = 0.6         # How many of their parts (out of the parts of both) two Kanji share to look alike.
+GROUP_SIZE = 4          # The most Kanji in a look-alike group.
+
+# The parts of the Kanji in the lesson decks, and of the Kanji they're mistaken for.
+BUILT_IN = {
+    "一": "一", "二": "一一", "三": "一一一", "四": "囗儿", "五": "一丨口", "六": "亠八", "七": "一乙", "八": "丿乀",
+    "九": "丿乙", "十": "一丨", "百": "一白", "千": "丿一丨", "干": "一一丨", "午": "丿一一丨", "牛": "丿一一丨亅",
+    "万": "一丿勹", "円": "冂丨一", "時": "日土寸", "日": "冂一一", "目": "冂一一一", "白": "丿冂一一", "旦": "冂一一一",
+    "月": "冂一一亅", "人": "丿乀", "入": "丿乀", "大": "一丿乀", "犬": "一丿乀丶", "太": "一丿乀丶", "天": "一一丿乀",
+    "夫": "一一丿乀丨", "火": "丷丿乀", "水": "亅丿乀乛", "氷": "亅丿乀乛丶", "永": "亅丿乀乛丶", "木": "一丨丿乀",
+    "本": "一丨丿乀一", "未": "一一丨丿乀", "末": "一一丨丿乀", "休": "亻一丨丿乀", "体": "亻一丨丿乀一",
+    "金": "丿乀王丷", "土": "一丨一", "士": "一丨一", "上": "丨一一", "下": "一丨丶", "王": "一丨一一", "玉": "一丨一一丶",
+    "主": "丶一丨一一", "曜": "日羽隹", "中": "口丨", "半": "丷一一丨", "山": "凵丨", "川": "丿丨丨", "元": "一一儿",
+    "気": "气乂", "私": "禾厶", "今": "丿乀一乛", "令": "丿乀一丶乛", "会": "丿乀一一厶", "合": "丿乀一口", "田": "口十",
+    "由": "口十丨", "甲": "口十丨", "申": "口十丨", "男": "口十力", "町": "口十丁", "力": "丿乛", "刀": "丿乛",
+    "女": "く丿一", "子": "乛亅一", "了": "乛亅", "見": "目儿", "貝": "目八", "行": "彳亍", "食": "丿乀丶艮",
+    "飲": "丿乀丶艮欠", "右": "一丿口", "石": "一丿口", "左": "一丿工", "友": "一丿又", "反": "一丿又",
+    "小": "亅丶丶", "少": "亅丶丶丿", "口": "口", "回": "口口", "品": "口口口", "名": "夕口", "多": "夕夕", "外": "夕卜",
+    "夕": "夕", "文": "亠乂", "父": "丿乀乂", "交": "亠丿乀乂", "矢": "丿一一丿乀", "失": "丿一一丨丿乀",
+}
+
+index = None            # The ComponentIndex, built the first time it's needed.
+
+def tokensOf(parts):
+    """
+    This function is used to turn a Kanji's parts into the tokens its
+    bitset is made of (a part written n times is n tokens).
+
+    :param parts: The parts (a string or a list of parts).
+    :return: A list of tokens.
+    """
+    seen = collections.Counter()
+    tokens = []
+    for part in parts:
+        seen[part] += 1
+        tokens.append(part if seen[part] == 1 else "{}×{}".format(part, seen[part]))
+    return tokens
+
+class ComponentIndex:
+    """
+    Used to find the Kanji that share parts with a Kanji.
+    """
+    def __init__(self, table):
+        """
+        This function is used to build the bitset of every Kanji.
+
+        :param self: The object.
+        :param table: A dict of Kanji to their parts.
+        """
+        self.kanji = list(table)
+        self.positions = {ch: i for (i, ch) in enumerate(self.kanji)}
+        self.bits = {}
+        self.masks = []
+        for ch in self.kanji:
+            mask = 0
+            for token in tokensOf(table[ch]):
+                mask |= 1 << self.bits.setdefault(token, len(self.bits))
+            self.masks.append(mask)
+        self.matrix = None
+        self.sizes = None
+
+    def __len__(self):
+        return len(self.kanji)
+
+    def __contains__(self, ch):
+        return ch in self.positions
+
+    def words(self):
+        """
+        This function is used to get every bitset as a NumPy array (built
+        the first time). Each row is a 64 bit word of every Kanji's bitset,
+        so a query only reads the words its Kanji has parts in.
+
+        :param self: The index.
+        :return: A (words, Kanji) uint64 array.
+        """
+        import numpy as np
+
+        if self.matrix is None:
+            width = max(1, (len(self.bits) + 63) // 64)
+            data = b"".join(mask.to_bytes(width * 8, "little") for mask in self.masks)
+            self.matrix = np.ascontiguousarray(np.frombuffer(data, dtype="<u8").reshape(len(self.masks), width).T)
+            self.sizes = np.array([mask.bit_count() for mask in self.masks], dtype=np.int32)
+        return self.matrix
+
+    def shared(self, ch):
+        """
+        This function is used to count the parts every Kanji shares with one.
+
+        :param self: The index.
+        :param ch: The Kanji.
+        :return: A NumPy array of counts, by position (None without NumPy).
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+
+        matrix = self.words()
+        mask = self.masks[self.positions[ch]]
+        counts = np.zeros(len(self.masks), dtype=np.int32)
+        word = 0
+        while mask:
+            bits = mask & 0xFFFFFFFFFFFFFFFF
+            if bits:
+                both = matrix[word] & np.uint64(bits)
+                if hasattr(np, "bitwise_count"):
+                    counts += np.bitwise_count(both)
+                else:
+                    counts += np.unpackbits(both.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1, dtype=np.int32)
+            mask >>= 64
+            word += 1
+        return counts
+
+    def similar(self, ch, k=SHARED, limit=None, closeness=0.0):
+        """
+        This function is used to find the Kanji that share at least k parts
+        with a Kanji, the most alike first (the most parts in common out of
+        the parts of both).
+
+        :param self: The index.
+        :param ch: The Kanji.
+        :param k: The fewest parts shared.
+        :param limit: The most Kanji returned (None for all of them).
+        :param closeness: The fewest parts in common out of the parts of both (0 - 1).
+        :return: A list of (Kanji, parts shared) pairs (empty if the Kanji isn't known).
+        """
+        if ch not in self.positions:
+            return []
+        position = self.positions[ch]
+        mask = self.masks[position]
+        counts = self.shared(ch)
+        if counts is None:
+            found = []
+            for (i, other) in enumerate(self.masks):
+                n = (mask & other).bit_count()
+                if n >= k and i != position:
+                    alike = n / (mask | other).bit_count()
+                    if alike >= closeness:
+                        found.append((-alike, -n, i))
+            found.sort()
+            return [(self.kanji[i], -n) for (_, n, i) in found[:limit]]
+
+        import numpy as np
+        counts[position] = 0
+        found = np.flatnonzero(counts >= max(k, 1))
+        shared = counts[found]
+        alike = shared / (self.sizes[found] + mask.bit_count() - shared)
+        keep = alike >= closeness
+        (found, shared, alike) = (found[keep], shared[keep], alike[keep])
+        order = np.lexsort((found, -shared, -alike))[:limit]
+        return [(self.kanji[i], n) for (i, n) in zip(found[order].tolist(), shared[order].tolist())]
+
+def readImported(path=IMPORTED_PATH):
+    """
+    This function is used to read the imported KRADFILE table.
+
+    :param path: The path of the table.
+    :return: A dict of Kanji to a list of parts (empty if nothing was imported).
+    """
+    table = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                (ch, _, parts) = line.rstrip("\n").partition("\t")
+                if parts:
+                    table[ch] = parts.split(" ")
+    return table
+
+def load():
+    """
+    This function is used to get the component index (the imported table
+    with the built in one laid over it).
+
+    :return: The ComponentIndex.
+    """
+    global index
+    if index is None:
+        table = readImported()
+        table.update(BUILT_IN)
+        index = ComponentIndex(table)
+    return index
+
+def lookAlikeGroups(deck, size=20, k=SHARED, rng=None):
+    """
+    This function is used to group the cards of a Kanji deck whose Kanji
+    look alike, for a lesson that asks each group together.
+
+    :param deck: The Kanji deck.
+    :param size: The most cards in the lesson.
+    :param k: The fewest parts two Kanji share to look alike.
+    :param rng: Shuffles which Kanji the groups are built around (None keeps the deck's order).
+    :return: A list of groups of card indices (empty if no two Kanji in the deck look alike).
+    """
+    components = load()
+    cards = {}
+    for i in range(len(deck)):
+        cards.setdefault(deck.fields(i)[0], i)
+    order = list(cards)
+    if rng is not None:
+        rng.shuffle(order)
+
+    groups = []
+    used = set()
+    count = 0
+    for ch in order:
+        if ch in used:
+            continue
+        found = components.similar(ch, k, closeness=CLOSENESS)
+        group = [ch] + [other for (other, _) in found if other in cards and other not in used]
+        group = group[:min(GROUP_SIZE, size - count)]
+        if len(group) > 1:
+            groups.append([cards[other] for other in group])
+            used.update(group)
+            count += len(group)
+        if count >= size - 1:
+            break
+    return groups
+
+def benchmark(components=None, rounds=1000):
+    """
+    This function is used to measure how fast look-alikes are found.
+
+    :param components: The ComponentIndex (defaults to load()).
+    :param rounds: How many queries are timed.
+    :return: The number of microseconds a query takes.
+    """
+    components = components or load()
+    kanji = [components.kanji[i % len(components)] for i in range(rounds)]
+    components.similar(kanji[0])
+    start = time.perf_counter()
+    for ch in kanji:
+        components.similar(ch)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the Kanji that look alike")
+    parser.add_argument("kanji", nargs="*", help="the Kanji to look up")
+    parser.add_argument("--k", type=int, default=SHARED, help="the fewest parts shared")
+    parser.add_argument("--benchmark", action="store_true", help="time the look-alike query")
+    args = parser.parse_args()
+
+    components = load()
+    for ch in args.kanji:
+        found = components.similar(ch, args.k)
+        print("{}: {}".format(ch, " ".join("{}({})".format(other, n) for (other, n) in found) if found else "-"))
+    if args.benchmark:
+        print("[!] {} Kanji, {} parts: {:.1f}us a query.".format(len(components), len(components.bits), benchmark()))
@@ -0,0 +1,342 @@
+"""
+desc: Kana confusion matrices: which kana a learner gets wrong, and what they answer instead (the romaji "me" for ぬ
+        means ぬ was read as め). Every kana is a row and every kana it can be answered as is a column, plus a
+        column for answers that aren't a single kana at all. Each learner has their own matrix and every learner
+        adds to a global one. They're NumPy arrays, updated in place after every answer.
+
+        The matrices are built from the review log (reviews.db) with SQLite doing the counting, so only the
+        distinct (learner, card, answer) groups reach Python and millions of logged answers take a second or two.
+
+        A drill is the cards of a kana deck the learner mixes up the most: every kana they got wrong and every
+        kana they answered instead, weighted by how often.
+
+        python3 confusion.py [--user NAME] [--top 20]
+"""
+
+import argparse
+import hashlib
+import os
+import time
+
+import deckfile
+import romaji
+
+# Every kana a card can ask (ぁ - ゖ and ァ - ヺ). The last column counts answers that aren't one of them.
+ALPHABET = [chr(c) for c in range(0x3041, 0x3097)] + [chr(c) for c in range(0x30A1, 0x30FB)]
+INDEX = {c: i for (i, c) in enumerate(ALPHABET)}
+OTHER = len(ALPHABET)
+
+HIRAGANA_TO_KATAKANA = {cp - 0x60: cp for cp in range(0x30A1, 0x30F7)}
+CACHE_PATH = os.path.join(deckfile.HERE, "cache", "confusions.npz")
+
+def answeredAs(character, response):
+    """
+    This function is used to find the kana a wrong answer was taken for.
+    Romaji is read as kana in the same script as the character.
+
+    :param character: The kana that was asked.
+    :param response: The learner's answer.
+    :return: The column of the answer (OTHER if it isn't a single kana).
+    """
+    response = response.strip().lower()
+    kana = response if romaji.isKana(response) else romaji.toKana(response)
+    if "ァ" <= character <= "ヺ":
+        kana = kana.translate(HIRAGANA_TO_KATAKANA)
+    return INDEX.get(kana, OTHER)
+
+class Confusions:
+    """
+    Used to keep the global and per learner confusion matrices.
+    """
+    def __init__(self):
+        """
+        This function is used to create empty matrices.
+
+        :param self: The object.
+        """
+        import numpy as np
+
+        self.counts = np.zeros((len(ALPHABET), OTHER + 1), dtype=np.int64)    # Every learner's wrong answers.
+        self.asked = np.zeros(len(ALPHABET), dtype=np.int64)                   # How often every kana was asked.
+        self.users = {}     # learner: (counts, asked).
+
+    def matrices(self, user):
+        """
+        This function is used to get a learner's matrices (made empty the first time).
+
+        :param self: The matrices.
+        :param user: The learner.
+        :return: (counts, asked)
+        """
+        import numpy as np
+
+        matrices = self.users.get(user)
+        if matrices is None:
+            matrices = (np.zeros_like(self.counts), np.zeros_like(self.asked))
+            self.users[user] = matrices
+        return matrices
+
+    def record(self, user, character, response, correct):
+        """
+        This function is used to add a single answer.
+
+        :param self: The matrices.
+        :param user: The learner.
+        :param character: The kana that was asked.
+        :param response: The learner's answer.
+        :param correct: Whether the answer was right.
+        :return: None
+        """
+        row = INDEX.get(character)
+        if row is None:
+            return
+        (counts, asked) = self.matrices(user)
+        self.asked[row] += 1
+        asked[row] += 1
+        if not correct:
+            column = answeredAs(character, response)
+            self.counts[row, column] += 1
+            counts[row, column] += 1
+
+    def addLog(self, log, decks, since=0):
+        """
+        This function is used to add the kana answers in the review log.
+        SQLite counts them (grouped by learner, card, and wrong answer) and
+        the counts are added to the matrices all at once.
+
+        :param self: The matrices.
+        :param log: The ReviewLog.
+        :param decks: The kana decks, by name.
+        :param since: Only answers logged after this review id are added.
+        :return: The id of the last review added.
+        """
+        import numpy as np
+
+        last = log.query("SELECT COALESCE(MAX(id), 0) FROM reviews")[0][0]
+        names = sorted(decks)
+        if not names:
+            return last
+
+        # Scanning the table is a lot faster than going through the card index for every answer.
+        where = "deck IN ({}) AND id > ? AND id <= ?".format(", ".join("?" * len(names)))
+        parameters = names + [since, last]
+        asked = log.query("SELECT user, deck, card, -1, COUNT(*) FROM reviews NOT INDEXED WHERE {} GROUP BY 1, 2, 3"
+                          .format(where), parameters)
+        wrong = log.query("""SELECT user, deck, card, response, COUNT(*) FROM reviews NOT INDEXED
+                             WHERE points < maxPoints AND {} GROUP BY 1, 2, 3, 4""".format(where), parameters)
+
+        characters = {name: [deck.fields(i)[0] for i in range(len(deck))] for (name, deck) in decks.items()}
+        columns = {}
+        rows = {}
+        for (user, deck, card, response, count) in asked + wrong:
+            if not 0 <= card < len(characters[deck]) or characters[deck][card] not in INDEX:
+                continue
+            character = characters[deck][card]
+            column = columns.get((character, response))
+            if column is None:
+                column = columns[(character, response)] = -1 if response == -1 else answeredAs(character, response)
+            rows.setdefault(user, []).append((INDEX[character], column, count))
+
+        for (user, found) in rows.items():
+            (counts, askedCounts) = self.matrices(user)
+            (r, c, n) = (np.array(values, dtype=np.int64) for values in zip(*found))
+            isWrong = c >= 0
+            for (target, targetAsked) in ((counts, askedCounts), (self.counts, self.asked)):
+                np.add.at(targetAsked, r[~isWrong], n[~isWrong])
+                np.add.at(target, (r[isWrong], c[isWrong]), n[isWrong])
+        return last
+
+    def save(self, path, signature, last):
+        """
+        This function is used to save the matrices.
+
+        :param self: The matrices.
+        :param path: Where to save them (.npz).
+        :param signature: Saved with them, to tell whether they still match the log and the decks.
+        :param last: The id of the last review counted.
+        :return: None
+        """
+        import numpy as np
+
+        users = sorted(self.users)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, counts=self.counts, asked=self.asked, signature=np.array(signature), last=np.array(last), users=np.array(users, dtype=str),
+                 userCounts=np.array([self.users[u][0] for u in users]).reshape(len(users), *self.counts.shape),
+                 userAsked=np.array([self.users[u][1] for u in users]).reshape(len(users), len(ALPHABET)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, signature):
+        """
+        This function is used to load saved matrices.
+
+        :param path: Where they were saved.
+        :param signature: The signature they have to have been saved with.
+        :return: (the Confusions, the id of the last review counted), or None if they weren't saved or don't match.
+        """
+        import numpy as np
+
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as saved:
+            if str(saved["signature"]) != signature:
+                return None
+            confusions = cls()
+            confusions.counts = saved["counts"]
+            confusions.asked = saved["asked"]
+            for (user, counts, asked) in zip(saved["users"], saved["userCounts"], saved["userAsked"]):
+                confusions.users[str(user)] = (counts, asked)
+            return (confusions, int(saved["last"]))
+
+    def top(self, user=None, count=10):
+        """
+        This function is used to find the most common confusions.
+
+        :param self: The matrices.
+        :param user: The learner (None for everyone).
+        :param count: How many confusions to return.
+        :return: A list of (kana, answered as (None for anything else), times, share of the times it was asked).
+        """
+        import numpy as np
+
+        (counts, asked) = (self.counts, self.asked) if user is None else self.matrices(user)
+        flat = counts.ravel()
+        count = min(count, int(np.count_nonzero(flat)))
+        if count == 0:
+            return []
+        best = np.argpartition(-flat, count - 1)[:count]
+        best = best[np.argsort(-flat[best], kind="stable")]
+        found = []
+        for i in best:
+            (row, column) = divmod(int(i), OTHER + 1)
+            found.append((ALPHABET[row], ALPHABET[column] if column != OTHER else None, int(flat[i]), flat[i] / max(asked[row], 1)))
+        return found
+
+    def drillCards(self, deck, user=None, size=20):
+        """
+        This function is used to pick the cards of a kana deck for a drill on
+        a learner's confusions: the kana they got wrong and the kana they
+        answered instead, the ones they mix up the most first.
+
+        :param self: The matrices.
+        :param deck: The kana deck.
+        :param user: The learner (None for everyone's confusions).
+        :param size: The most cards in the drill.
+        :return: A list of card indices (empty if nothing was mixed up).
+        """
+        import numpy as np
+
+        counts = self.counts if user is None else self.matrices(user)[0]
+        weights = counts.sum(axis=1)[:OTHER] + counts.sum(axis=0)[:OTHER]
+        rows = np.array([INDEX.get(deck.fields(i)[0], -1) for i in range(len(deck))])
+        cardWeights = np.where(rows >= 0, weights[rows], 0)
+        order = np.argsort(-cardWeights, kind="stable")[:size]
+        return [int(i) for i in order if cardWeights[i] > 0]
+
+def fromLog(log, decks, path=CACHE_PATH):
+    """
+    This function is used to get the matrices of every kana answer in the
+    review log. The matrices are saved in cache/ along with the id of the
+    last answer counted, so only the answers logged since are read.
+
+    :param log: The ReviewLog.
+    :param decks: The kana decks, by name.
+    :param path: Where the matrices are saved.
+    :return: The Confusions.
+    """
+    cards = hashlib.sha1()
+    for name in sorted(decks):
+        cards.update("{}\0{}\0".format(name, "".join(decks[name].fields(i)[0] for i in range(len(decks[name])))).encode("utf-8"))
+    signature = "{}:{}".format(os.path.abspath(log.path), cards.hexdigest())
+
+    loaded = Confusions.load(path, signature)
+    # A log with fewer answers than were counted was started over.
+    if loaded is None or loaded[1] > log.query("SELECT COALESCE(MAX(id), 0) FROM reviews")[0][0]:
+        loaded = (Confusions(), 0)
+    (confusions, since) = loaded
+    last = confusions.addLog(log, decks, since)
+    if last != since:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        confusions.save(path, signature, last)
+    return confusions
+
+class Recorder:
+    """
+    Used by a QuizSession to add its answers to a learner's matrices.
+    """
+    def __init__(self, confusions, user=""):
+        """
+        This function is used to create a Recorder object.
+
+        :param self: The object.
+        :param confusions: The Confusions.
+        :param user: The learner.
+        """
+        self.confusions = confusions
+        self.user = user
+
+    def record(self, deck, card, response, correct):
+        if deck.kind == "kana":
+            self.confusions.record(self.user, deck[card].question, response, correct)
+
+def benchmark(answers=2000000):
+    """
+    This function is used to measure how long building the matrices from
+    a review log of made up kana answers takes.
+
+    :param answers: How many answers are logged.
+    :return: None
+    """
+    import random
+    import tempfile
+    import japanese_quiz
+    import reviewlog
+
+    decks = {name: japanese_quiz.openDeck(name) for name in ("hiragana", "katakana")}
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        log = reviewlog.ReviewLog(os.path.join(directory, "reviews.db"), batchSize=50000)
+        start = time.perf_counter()
+        for n in range(answers):
+            name = "hiragana" if n % 2 else "katakana"
+            card = rng.randrange(len(decks[name]))
+            wrong = rng.random() < 0.2
+            response = decks[name][rng.randrange(len(decks[name]))].correctAnswer if wrong else decks[name][card].correctAnswer
+            log.record(name, card, "forward", response, int(not wrong), 1, "", "user{}".format(n % 30), n)
+        log.flush()
+        logged = time.perf_counter() - start
+
+        path = os.path.join(directory, "confusions.npz")
+        start = time.perf_counter()
+        confusions = fromLog(log, decks, path)
+        elapsed = time.perf_counter() - start
+        log.record("hiragana", 0, "forward", "o", 0, 1, "", "user0")
+        start = time.perf_counter()
+        fromLog(log, decks, path)
+        synced = time.perf_counter() - start
+        log.close()
+    print("{} answers logged in {:.1f}s, matrices for {} learners built in {:.2f}s (then updated from the saved ones in {:.3f}s)"
+          .format(answers, logged, len(confusions.users), elapsed, synced))
+    for (kana, answer, times, share) in confusions.top(count=5):
+        print("{} read as {}: {} times ({:.1%})".format(kana, answer, times, share))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the kana learners mix up the most")
+    parser.add_argument("--user", help="only this learner's confusions")
+    parser.add_argument("--top", type=int, default=20, help="how many confusions to show")
+    parser.add_argument("--benchmark", action="store_true", help="time building the matrices from millions of made up answers")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+    else:
+        import japanese_quiz
+        import registry
+        import reviewlog
+
+        start = time.perf_counter()
+        log = reviewlog.ReviewLog()
+        confusions = fromLog(log, {info.name: japanese_quiz.openDeck(info.name) for info in registry.decksOfKind("kana")})
+        for (kana, answer, times, share) in confusions.top(args.user, args.top):
+            print("{} read as {}: {} times ({:.1%})".format(kana, answer if answer is not None else "something else", times, share))
+        print("[!] {} kana answers from {} learners in {:.2f}s.".format(int(confusions.asked.sum()), len(confusions.users), time.perf_counter() - start))
@@ -0,0 +1,302 @@
+"""
+desc: Conjugation drills built from the vocab decks. Verbs (the cards whose English starts with "To") are drilled
+        in the ます form, the て form, the past, the negative and the potential, and adjectives (い adjectives,
+        and the な adjectives whose alternate spells out the な) in the て form, the past and the negative.
+
+        Verbs are conjugated as ichidan (食べる), godan (飲む), or one of the irregulars (する and its compounds,
+        来る, and 行く and ある, which are godan except for one form each). A る verb after an i or e sound is
+        ichidan unless it's one of the godan exceptions (帰る, 入る, 知る, ...). The Kanji spelling is
+        conjugated along with the kana, and the colloquial potential (食べれる) is accepted too.
+
+        A drill deck is a view of a vocab deck: it only keeps the indices of the cards that conjugate, and a
+        drill card is built (from a memoized conjugation table) the first time it's asked, so a deck of
+        thousands of verbs never turns into a deck of every form of every verb. Drill decks are opened by name
+        like any other deck: "conjugations:vocab-chapter3".
+
+        python3 conjugation.py たべる [--kanji 食べる]
+"""
+
+import argparse
+import array
+import bisect
+import functools
+
+PREFIX = "conjugations:"    # Drill decks are named PREFIX + the name of the vocab deck.
+DRILL_SIZE = 20             # How many drill cards a drill asks.
+
+ICHIDAN = "ichidan"
+GODAN = "godan"
+SURU = "suru"
+KURU = "kuru"
+I_ADJECTIVE = "i-adjective"
+NA_ADJECTIVE = "na-adjective"
+
+VERB_FORMS = ("masu", "te", "past", "negative", "potential")
+ADJECTIVE_FORMS = ("te", "past", "negative")
+FORMS = { ICHIDAN: VERB_FORMS, GODAN: VERB_FORMS, SURU: VERB_FORMS, KURU: VERB_FORMS,
+          I_ADJECTIVE: ADJECTIVE_FORMS, NA_ADJECTIVE: ADJECTIVE_FORMS }
+NO_POTENTIAL = { "ある", "わかる", "できる", "いる" }     # Verbs whose potential isn't used.
+LABELS = { "masu": "ます Form", "te": "て Form", "past": "Past", "negative": "Negative", "potential": "Potential" }
+
+# The endings of godan verbs, and what they turn into.
+ENDINGS = "うくぐすつぬぶむる"
+I_ROW = dict(zip(ENDINGS, "いきぎしちにびみり"))
+A_ROW = dict(zip(ENDINGS, "わかがさたなばまら"))
+E_ROW = dict(zip(ENDINGS, "えけげせてねべめれ"))
+TE = dict(zip(ENDINGS, ["って", "いて", "いで", "して", "って", "んで", "んで", "んで", "って"]))
+
+# The kana an i or e sound ends with (a る verb after one of them is ichidan, unless it's an exception).
+I_OR_E = set("いきぎしじちぢにひびぴみりえけげせぜてでねへべぺめれ")
+
+# る verbs that look ichidan but are godan (by Kanji, or by kana for words usually written in kana).
+GODAN_RU = { "帰る", "入る", "知る", "切る", "走る", "要る", "減る", "喋る", "滑る", "握る", "蹴る", "限る", "参る", "焦る",
+             "練る", "覆る", "嘲る", "遮る", "罵る", "捻る", "湿る", "陥る", "翻る", "蘇る", "散る", "茂る", "混じる", "詰る",
+             "しゃべる", "はいる", "かえる", "しる", "はしる", "ける", "すべる", "にぎる", "まいる", "あせる" }
+
+# い adjectives usually written in kana (the others are recognized by their Kanji spelling).
+KANA_ADJECTIVES = { "いい", "かっこいい", "つまらない", "やさしい", "すごい", "かわいい", "おいしい", "うるさい", "すばらしい",
+                    "ひどい", "おもしろい", "きたない", "まずい", "おおきい", "ちいさい", "たかい", "やすい", "ない" }
+
+def wordClass(question, reading, alternates, kanji):
+    """
+    This function is used to find how a vocab card conjugates.
+
+    :param question: The English of the card.
+    :param reading: The kana of the card.
+    :param alternates: The alternate answers of the card (a list).
+    :param kanji: The Kanji spelling of the card (None if it has none).
+    :return: One of the word classes (None if the card doesn't conjugate).
+    """
+    english = question.split("/")[0].lower()
+    spelling = kanji or reading
+    if not reading:
+        return None
+    if (english.startswith("to ") or reading == "ある") and reading[-1] in ENDINGS:
+        if reading.endswith("する"):
+            return SURU
+        if reading == "くる" or reading.endswith("てくる") or spelling.endswith("来る"):
+            return KURU
+        if reading[-1] == "る" and len(reading) > 1 and reading[-2] in I_OR_E and spelling not in GODAN_RU:
+            return ICHIDAN
+        return GODAN
+    if reading + "な" in alternates:
+        return NA_ADJECTIVE
+    if reading.endswith("い") and (spelling.endswith("い") and kanji is not None or reading in KANA_ADJECTIVES or reading.endswith("いい")):
+        return I_ADJECTIVE
+    return None
+
+def formsOf(kind, reading):
+    """
+    This function is used to find the forms a word is drilled in.
+
+    :param kind: The word class.
+    :param reading: The kana of the word.
+    :return: A tuple of forms.
+    """
+    forms = FORMS[kind]
+    if reading in NO_POTENTIAL:
+        return forms[:-1]
+    return forms
+
+def endings(kind, reading):
+    """
+    This function is used to find how every form of a word is made: how
+    many kana are dropped from the end, and what's added in their place.
+
+    :param kind: The word class.
+    :param reading: The kana of the word.
+    :return: A dict of form to (kana dropped, kana added, other endings that are accepted in its place).
+    """
+    if kind == ICHIDAN:
+        return { "masu": (1, "ます", ()), "te": (1, "て", ()), "past": (1, "た", ()), "negative": (1, "ない", ()),
+                 "potential": (1, "られる", ("れる",)) }
+    if kind == SURU:
+        return { "masu": (2, "します", ()), "te": (2, "して", ()), "past": (2, "した", ()), "negative": (2, "しない", ()),
+                 "potential": (2, "できる", ()) }
+    if kind == KURU:
+        return { "masu": (2, "きます", ()), "te": (2, "きて", ()), "past": (2, "きた", ()), "negative": (2, "こない", ()),
+                 "potential": (2, "こられる", ("これる",)) }
+    if kind == I_ADJECTIVE:
+        # いい (and words ending in it) conjugate from よい.
+        (drop, stem) = (2, "よ") if reading.endswith("いい") else (1, "")
+        return { "te": (drop, stem + "くて", ()), "past": (drop, stem + "かった", ()), "negative": (drop, stem + "くない", ()) }
+    if kind == NA_ADJECTIVE:
+        return { "te": (0, "で", ()), "past": (0, "だった", ()), "negative": (0, "じゃない", ("ではない",)) }
+
+    last = reading[-1]
+    te = TE[last]
+    found = { "masu": (1, I_ROW[last] + "ます", ()), "te": (1, te, ()), "past": (1, te[:-1] + ("だ" if te[-1] == "で" else "た"), ()),
+              "negative": (1, A_ROW[last] + "ない", ()), "potential": (1, E_ROW[last] + "る", ()) }
+    if reading.endswith("いく"):
+        found.update(te=(1, "って", ()), past=(1, "った", ()))
+    if reading == "ある":
+        found["negative"] = (2, "ない", ())
+    return found
+
+def spell(word, drop, added, kind):
+    """
+    This function is used to put a conjugated ending on a word.
+
+    :param word: The kana or Kanji spelling of the word.
+    :param drop: How many kana are dropped from its end.
+    :param added: The kana added in their place.
+    :param kind: The word class.
+    :return: The conjugated word.
+    """
+    if kind == KURU and word.endswith("来る"):
+        return word[:-2] + "来" + added[1:]
+    return (word[:-drop] if drop else word) + added
+
+@functools.lru_cache(maxsize=4096)
+def conjugate(reading, kanji, kind):
+    """
+    This function is used to build the conjugation table of a word.
+
+    :param reading: The kana of the word.
+    :param kanji: The Kanji spelling of the word (None if it has none).
+    :param kind: The word class (see wordClass).
+    :return: A dict of form to (kana, Kanji spelling (None if the word has none), other accepted answers).
+    """
+    table = {}
+    found = endings(kind, reading)
+    for form in formsOf(kind, reading):
+        (drop, added, others) = found[form]
+        # The Kanji spelling is only conjugated when it ends with the kana that are dropped.
+        spelled = kanji if kanji is not None and (drop == 0 or kanji.endswith(reading[-drop:]) or kind == KURU) else None
+        accepted = []
+        for other in others:
+            accepted.append(spell(reading, drop, other, kind))
+            if spelled is not None:
+                accepted.append(spell(spelled, drop, other, kind))
+        table[form] = (spell(reading, drop, added, kind), spell(spelled, drop, added, kind) if spelled is not None else None, tuple(accepted))
+    return table
+
+def conjugatable(deck):
+    """
+    This function is used to go through the cards of a vocab deck that
+    conjugate (without building the cards).
+
+    :param deck: The vocab deck.
+    :return: A generator of (card index, word class, forms).
+    """
+    for i in range(len(deck)):
+        fields = deck.fields(i) + (None,) * 4
+        (question, reading, alternates, kanji) = fields[:4]
+        alternates = [alternates] if isinstance(alternates, str) else list(alternates or [])
+        kind = wordClass(question, reading, alternates, kanji)
+        if kind is not None:
+            yield (i, kind, formsOf(kind, reading))
+
+class ConjugationDeck:
+    """
+    Used to drill the conjugations of the words in a vocab deck. Works like
+    a Deck (see deckfile.py): cards are built when they're indexed. The
+    vocab deck is kept as source (multiple choice caches its options by it).
+    """
+    def __init__(self, deck, factory=None):
+        """
+        This function is used to create a drill deck over a vocab deck.
+
+        :param self: The object.
+        :param deck: The vocab deck.
+        :param factory: Called with a drill card's fields to build the card (None returns the field tuple).
+        """
+        self.source = deck
+        self.name = PREFIX + deck.name
+        self.kind = "vocab"
+        self.title = deck.title + " Conjugations"
+        self.factory = factory
+        self.cards = {}     # Cards built so far, by index.
+
+        # Card i is form i - offsets[w] of word w.
+        self.words = array.array("l")      # The index of every word in the vocab deck.
+        self.kinds = []
+        self.forms = []
+        self.offsets = array.array("l")    # The index of every word's first drill card.
+        self.count = 0
+        for (i, kind, forms) in conjugatable(deck):
+            self.words.append(i)
+            self.kinds.append(kind)
+            self.forms.append(forms)
+            self.offsets.append(self.count)
+            self.count += len(forms)
+
+    def __len__(self):
+        return self.count
+
+    def locate(self, index):
+        """
+        This function is used to find the word and form of a drill card.
+
+        :param self: The deck.
+        :param index: The index of the drill card.
+        :return: (the index of the word in the vocab deck, the word class, the form)
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("card index out of range")
+        w = bisect.bisect_right(self.offsets, index) - 1
+        return (self.words[w], self.kinds[w], self.forms[w][index - self.offsets[w]])
+
+    def fields(self, index):
+        """
+        This function is used to build a drill card's fields without
+        building the card.
+
+        :param self: The deck.
+        :param index: The index of the drill card.
+        :return: (question, correctAnswer, alternateAnswers, kanji, context)
+        """
+        (card, kind, form) = self.locate(index)
+        fields = self.source.fields(card) + (None,) * 4
+        (question, reading, _, kanji, context) = fields[:5]
+        (kana, spelled, others) = conjugate(reading, kanji, kind)[form]
+        label = LABELS[form] if context is None else "{}, {}".format(LABELS[form], context)
+        return ("{} - {}".format(question.split("/")[0], kanji or reading), kana, list(others) or None, spelled, label)
+
+    def __getitem__(self, index):
+        card = self.cards.get(index)
+        if card is None:
+            fields = self.fields(index)
+            if self.factory is None:
+                return fields
+            card = self.cards[index] = self.factory(*fields)
+        return card
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+def openDrill(name, openDeck, factory=None):
+    """
+    This function is used to open a drill deck by name.
+
+    :param name: The name of the drill deck (PREFIX + the name of a vocab deck).
+    :param openDeck: Called with the name of the vocab deck to open it.
+    :param factory: Called with a drill card's fields to build the card.
+    :return: The ConjugationDeck.
+    """
+    if not name.startswith(PREFIX):
+        raise KeyError(name)
+    deck = openDeck(name[len(PREFIX):])
+    if deck.kind != "vocab":
+        raise KeyError(name)
+    return ConjugationDeck(deck, factory)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conjugate a verb or adjective")
+    parser.add_argument("word", help="the kana of the word")
+    parser.add_argument("--kanji", help="the Kanji spelling of the word")
+    parser.add_argument("--adjective", action="store_true", help="the word is an い adjective")
+    parser.add_argument("--na", action="store_true", help="the word is a な adjective")
+    args = parser.parse_args()
+
+    english = "" if args.adjective or args.na else "To "
+    kind = wordClass(english, args.word, [args.word + "な"] if args.na else [], args.kanji)
+    if kind is None:
+        print("[!] {} doesn't conjugate.".format(args.word))
+    else:
+        print("{} ({})".format(args.kanji or args.word, kind))
+        for (form, (kana, spelled, others)) in conjugate(args.word, args.kanji, kind).items():
+            print("\t{:<10} {}".format(LABELS[form], " / ".join([kana] + ([spelled] if spelled else []) + list(others))))
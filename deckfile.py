@@ -0,0 +1,324 @@
+"""
+desc: Reads and writes the compiled deck file (decks.bin). The question banks in japanese_questions.py are
+        compiled into a single binary file made of a header, a deck directory, a string table, and fixed-width
+        card records. The quiz opens that file with mmap so choosing a deck only decodes the cards that are
+        actually asked instead of building every deck up front.
+
+        Layout (all integers are little endian):
+            header      magic, version, deck count, string count and the offset of every section below.
+            directory   one DECK_ENTRY per deck: name, kind and title string ids, first record, record count.
+            offsets     string count + 1 uint32 byte offsets into the string data.
+            strings     UTF-8 bytes of every string (a string repeated close by is only stored once).
+            records     one RECORD per card: five string ids and a flags byte.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+
+MAGIC = b"JQDK"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHIIIII")
+DECK_ENTRY = struct.Struct("<IIIII")
+OFFSET = struct.Struct("<I")
+RECORD = struct.Struct("<IIIIIB3x")
+
+NO_STRING = 0xFFFFFFFF      # String id used for None.
+STRING_CACHE = 65536        # How many recent strings compileDecks remembers to store repeats once.
+ALTERNATE_LIST = 0x01       # Record flag: the alternate answers field is a list, not a single string.
+SEPARATOR = "\x1f"          # Joins a list of alternate answers into a single string table entry.
+MAX_USER = 255              # The longest learner name (in UTF-8 bytes) a session snapshot holds (see session.py).
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(HERE, "decks.bin")
+SOURCE_PATH = os.path.join(HERE, "japanese_questions.py")
+IMPORT_DIR = os.path.join(HERE, "decks")        # Decks imported from dictionaries (see importer.py), one file each.
+
+class Deck:
+    """
+    A single deck inside a compiled deck file. Cards are decoded from
+    the memory map when they're indexed and never before. Cards can't be
+    changed, so a card is only built once and every quiz using the deck
+    shares it.
+    """
+    def __init__(self, deckFile, name, kind, title, first, count, factory=None):
+        """
+        This function is used to create a Deck object.
+
+        :param self: The object.
+        :param deckFile: The DeckFile the deck lives in.
+        :param name: The name of the deck (i.e. hiragana).
+        :param kind: The kind of cards in the deck (kana, kanji, or vocab).
+        :param title: The title shown in the quiz menus.
+        :param first: The index of the deck's first record.
+        :param count: The number of cards in the deck.
+        :param factory: Called with a card's fields to build the card (None returns the field tuple).
+        """
+        self.deckFile = deckFile
+        self.name = name
+        self.kind = kind
+        self.title = title
+        self.first = first
+        self.count = count
+        self.factory = factory
+        self.cards = {}     # Cards built so far, by index.
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """
+        This function is used to decode a single card.
+
+        :param self: The deck.
+        :param index: The index of the card in the deck.
+        :return: The card built by the deck's factory.
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("card index out of range")
+
+        card = self.cards.get(index)
+        if card is None:
+            fields = self.deckFile.record(self.first + index)
+            if self.factory is None:
+                return fields
+            card = self.factory(*fields)
+            self.cards[index] = card
+        return card
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def fields(self, index):
+        """
+        This function is used to decode a card's fields without building the card.
+
+        :param self: The deck.
+        :param index: The index of the card in the deck.
+        :return: The card's field tuple.
+        """
+        if not 0 <= index < self.count:
+            raise IndexError("card index out of range")
+        return self.deckFile.record(self.first + index)
+
+class DeckFile:
+    """
+    Used to open a compiled deck file.
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        This function is used to memory map a compiled deck file and read
+        its header. Only the header is read here.
+
+        :param self: The object.
+        :param path: The path of the compiled deck file.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self.deckCount, self.stringCount, self.directoryOffset, self.offsetsOffset,
+            self.stringsOffset, self.recordsOffset) = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError("{} is not a version {} deck file".format(path, VERSION))
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def string(self, stringId):
+        """
+        This function is used to decode a single entry of the string table.
+
+        :param self: The deck file.
+        :param stringId: The id of the string (NO_STRING for None).
+        :return: The string (None if NO_STRING was given).
+        """
+        if stringId == NO_STRING:
+            return None
+        (start,) = OFFSET.unpack_from(self.data, self.offsetsOffset + stringId * OFFSET.size)
+        (end,) = OFFSET.unpack_from(self.data, self.offsetsOffset + (stringId + 1) * OFFSET.size)
+        return self.data[self.stringsOffset + start:self.stringsOffset + end].decode("utf-8")
+
+    def record(self, recordIndex):
+        """
+        This function is used to decode the fields of a single card record.
+
+        :param self: The deck file.
+        :param recordIndex: The index of the record in the file.
+        :return: A tuple of the card's fields (trailing None fields are left off, just like the question banks).
+        """
+        *ids, flags = RECORD.unpack_from(self.data, self.recordsOffset + recordIndex * RECORD.size)
+        fields = [self.string(i) for i in ids]
+
+        # The third field is always the alternate answers.
+        if fields[2] is not None and flags & ALTERNATE_LIST:
+            fields[2] = fields[2].split(SEPARATOR)
+
+        while fields and fields[-1] is None:
+            fields.pop()
+        return tuple(fields)
+
+    def decks(self):
+        """
+        This function is used to list every deck in the file without
+        decoding any cards.
+
+        :param self: The deck file.
+        :return: A list of Deck objects (in the order they were compiled).
+        """
+        decks = []
+        for i in range(self.deckCount):
+            nameId, kindId, titleId, first, count = DECK_ENTRY.unpack_from(self.data, self.directoryOffset + i * DECK_ENTRY.size)
+            decks.append(Deck(self, self.string(nameId), self.string(kindId), self.string(titleId), first, count))
+        return decks
+
+    def deck(self, name, factory=None):
+        """
+        This function is used to open a single deck by name.
+
+        :param self: The deck file.
+        :param name: The name of the deck.
+        :param factory: Called with a card's fields to build the card.
+        :return: The Deck object.
+        """
+        for deck in self.decks():
+            if deck.name == name:
+                deck.factory = factory
+                return deck
+        raise KeyError(name)
+
+def compileDecks(decks, path=DEFAULT_PATH):
+    """
+    This function is used to compile question banks into a deck file.
+    Records and strings are streamed into temporary files as the cards
+    come in, so a deck of any size is compiled in the same memory, and the
+    sections are joined once every card is read. The file is written to a
+    temporary file next to the target (its own one, so quizzes compiling at
+    the same time don't trip over each other) and then moved into place so
+    a running quiz never sees a half written file.
+
+    :param decks: A list of (name, kind, title, cards) tuples (see japanese_questions.py). The cards can be
+                  any iterable (i.e. a generator streaming them from a dictionary).
+    :param path: Where to write the compiled deck file.
+    :return: None
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=folder) as offsets, tempfile.TemporaryFile(dir=folder) as data, \
+            tempfile.TemporaryFile(dir=folder) as records:
+        recent = {}         # The ids of the last STRING_CACHE strings, so repeats are only stored once.
+        strings = [0, 0]    # How many strings and string bytes have been written.
+        offsets.write(OFFSET.pack(0))
+
+        def intern(s):
+            if s is None:
+                return NO_STRING
+            stringId = recent.get(s)
+            if stringId is None:
+                if len(recent) >= STRING_CACHE:
+                    recent.clear()
+                encoded = s.encode("utf-8")
+                data.write(encoded)
+                strings[1] += len(encoded)
+                offsets.write(OFFSET.pack(strings[1]))
+                stringId = recent[s] = strings[0]
+                strings[0] += 1
+            return stringId
+
+        directory = []
+        count = 0
+        for (name, kind, title, cards) in decks:
+            first = count
+            for card in cards:
+                fields = list(card) + [None] * (5 - len(card))
+                flags = 0
+                if type(fields[2]) == list:
+                    if any(SEPARATOR in a for a in fields[2]):
+                        raise ValueError("alternate answers can't contain the separator: {}".format(card))
+                    fields[2] = SEPARATOR.join(fields[2])
+                    flags |= ALTERNATE_LIST
+                records.write(RECORD.pack(*[intern(f) for f in fields], flags))
+                count += 1
+            directory.append((intern(name), intern(kind), intern(title), first, count - first))
+
+        (stringCount, stringSize) = strings
+        directoryOffset = HEADER.size
+        offsetsOffset = directoryOffset + len(directory) * DECK_ENTRY.size
+        stringsOffset = offsetsOffset + (stringCount + 1) * OFFSET.size
+        recordsOffset = stringsOffset + stringSize
+        recordsOffset += -recordsOffset % 8     # Keep the records aligned.
+
+        (handle, tmp) = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, len(directory), stringCount, directoryOffset, offsetsOffset,
+                                    stringsOffset, recordsOffset))
+                for entry in directory:
+                    f.write(DECK_ENTRY.pack(*entry))
+                for section in (offsets, data):
+                    section.seek(0)
+                    shutil.copyfileobj(section, f)
+                f.write(b"\0" * (recordsOffset - stringsOffset - stringSize))
+                records.seek(0)
+                shutil.copyfileobj(records, f)
+            os.chmod(tmp, 0o644)        # mkstemp only lets the owner read it.
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+def openDeckFile(path=DEFAULT_PATH, source=SOURCE_PATH):
+    """
+    This function is used to open the compiled deck file. If the file is
+    missing or older than the question banks it's recompiled first, which
+    is the only time japanese_questions.py is imported.
+
+    :param path: The path of the compiled deck file.
+    :param source: The path of the question banks.
+    :return: The DeckFile object.
+    """
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source):
+        import japanese_questions
+        compileDecks(japanese_questions.DECKS, path)
+    return DeckFile(path)
+
+def importedPath(name):
+    """
+    This function is used to find where an imported deck is stored.
+
+    :param name: The name of the deck (letters, digits, "-" and "_" only).
+    :return: The path of the deck's file.
+    """
+    if not re.fullmatch(r"[\w-]+", name):
+        raise KeyError(name)
+    return os.path.join(IMPORT_DIR, name + ".bin")
+
+def importedDecks():
+    """
+    This function is used to list the decks that have been imported.
+
+    :return: A sorted list of deck names.
+    """
+    if not os.path.isdir(IMPORT_DIR):
+        return []
+    return sorted(f[:-4] for f in os.listdir(IMPORT_DIR) if f.endswith(".bin"))
+
+if __name__ == "__main__":
+    import japanese_questions
+    compileDecks(japanese_questions.DECKS)
+    with DeckFile() as deckFile:
+        for deck in deckFile.decks():
+            print("{:<16} {:<6} {:>4} cards".format(deck.name, deck.kind, len(deck)))
@@ -0,0 +1,181 @@
+"""
+desc: Picks the wrong options of a multiple choice prompt. The wrong options should be easy to confuse with the
+        right one (ぬ/め, シ/ツ, words that share a Kanji or are a kana or two apart), so every card of a deck is
+        turned into a vector of hashed features (its characters, character bigrams, romaji, and the group of
+        look-alike kana each character belongs to) and the nearest neighbours of every card are found with a
+        cosine similarity matrix computed in blocks with NumPy.
+
+        Only the NEIGHBOURS closest cards of each card are kept, and they're cached in cache/ next to the decks.
+        Building a prompt is then a lookup in that table. NumPy is only needed when a table has to be built.
+"""
+
+import os
+import random
+import unicodedata
+import zlib
+
+import deckfile
+import romaji
+
+CACHE_DIR = os.path.join(deckfile.HERE, "cache")
+NEIGHBOURS = 8          # How many of the closest cards are kept for every card.
+DIMENSIONS = 256        # The size of the hashed feature vectors.
+BLOCK = 1024            # How many rows of the similarity matrix are computed at a time.
+
+# Kana that are easy to mistake for each other.
+LOOK_ALIKES = ["ぬめ", "ねれわ", "るろ", "さちき", "はほけ", "いり", "こに", "あおめ", "くへ", "うつ", "まも", "しつ", "そん", "たな",
+               "シツ", "ソンリ", "ノメ", "クタケ", "ウワフヲ", "コユロ", "セヤ", "チテ", "ルレ", "ラフヲ", "マアム", "ナメ", "ハへ", "オホ",
+               "カヤ", "エニ", "スヌ"]
+LOOK_ALIKE_GROUPS = {}
+for (group, characters) in enumerate(LOOK_ALIKES):
+    for c in characters:
+        LOOK_ALIKE_GROUPS.setdefault(c, []).append(group)
+
+tables = {}             # Neighbour tables loaded so far, by deck name.
+
+def baseOf(c):
+    """
+    This function is used to strip the dakuten or handakuten off a kana (が becomes か).
+
+    :param c: The character.
+    :return: The base character.
+    """
+    return unicodedata.normalize("NFD", c)[0]
+
+def featuresOf(text):
+    """
+    This function is used to list the features of the Japanese side of a card.
+
+    :param text: The card's Japanese (kana and Kanji).
+    :return: A list of (feature, weight) pairs.
+    """
+    features = []
+    for c in text:
+        features.append(("c" + c, 1.0))
+        base = baseOf(c)
+        features.append(("b" + romaji.toHiragana(base), 1.0))
+        for group in LOOK_ALIKE_GROUPS.get(base, []):
+            features.append(("v{}".format(group), 2.0))
+    for i in range(len(text) - 1):
+        features.append(("2" + text[i:i + 2], 1.0))
+
+    kana = romaji.toHiragana(text)
+    if romaji.isKana(kana):
+        spelling = romaji.toRomaji(kana)
+        for i in range(len(spelling)):
+            features.append(("r" + spelling[i:i + 2], 0.5))
+    return features
+
+def japaneseOf(deck, fields):
+    """
+    This function is used to get the Japanese side of a card from its fields.
+
+    :param deck: The deck.
+    :param fields: The card's fields.
+    :return: The Japanese text.
+    """
+    if deck.kind == "kana":
+        return fields[0]
+    kanji = fields[3] if len(fields) > 3 and fields[3] else ""
+    return fields[1] + kanji
+
+def neighbourTable(deck):
+    """
+    This function is used to compute the closest cards of every card in a
+    deck (cosine similarity of hashed feature vectors, in blocks of rows).
+
+    :param deck: The deck.
+    :return: A NumPy int32 array of shape (cards, NEIGHBOURS), -1 where a card has fewer neighbours.
+    """
+    import numpy as np
+
+    n = len(deck)
+    vectors = np.zeros((n, DIMENSIONS), dtype=np.float32)
+    answers = []
+    for i in range(n):
+        fields = deck.fields(i)
+        answers.append(fields[1])
+        for (feature, weight) in featuresOf(japaneseOf(deck, fields)):
+            vectors[i, zlib.crc32(feature.encode("utf-8")) % DIMENSIONS] += weight
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.maximum(norms, 1e-9)
+
+    # Cards with the same answer can't be each other's wrong options.
+    answerIds = np.unique(np.array(answers, dtype=str), return_inverse=True)[1]
+
+    k = min(NEIGHBOURS, n - 1)
+    table = np.full((n, NEIGHBOURS), -1, dtype=np.int32)
+    if k <= 0:
+        return table
+    for start in range(0, n, BLOCK):
+        rows = slice(start, min(start + BLOCK, n))
+        similarity = vectors[rows] @ vectors.T
+        similarity[answerIds[rows, None] == answerIds[None, :]] = -np.inf
+        nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(similarity, nearest, axis=1), axis=1)
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        valid = np.take_along_axis(similarity, nearest, axis=1) > -np.inf
+        table[rows, :k] = np.where(valid, nearest, -1)
+    return table
+
+def signatureOf(deck):
+    """
+    This function is used to tell whether a cached table still matches a deck.
+
+    :param deck: The deck.
+    :return: A string that changes whenever the deck's file does.
+    """
+    source = getattr(deck, "source", None)
+    if source is not None:
+        # A drill deck (see conjugation.py) is built from a vocab deck, so it changes when that deck does.
+        return "{}:{}".format(signatureOf(source), len(deck))
+    return "{}:{}:{}:{}".format(os.path.getmtime(deck.deckFile.path), deck.first, len(deck), NEIGHBOURS)
+
+def neighboursOf(deck):
+    """
+    This function is used to get the neighbour table of a deck. It's loaded
+    from cache/ if the deck hasn't changed, otherwise it's built and cached.
+
+    :param deck: The deck.
+    :return: The neighbour table.
+    """
+    table = tables.get(deck.name)
+    if table is not None:
+        return table
+
+    import numpy as np
+
+    # Drill deck names have a colon in them, which Windows doesn't allow in a file name.
+    path = os.path.join(CACHE_DIR, deck.name.replace(":", "_") + ".npz")
+    signature = signatureOf(deck)
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            if str(cached["signature"]) == signature:
+                table = cached["neighbours"]
+    if table is None:
+        table = neighbourTable(deck)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, neighbours=table, signature=np.array(signature))
+        os.replace(tmp, path)
+    tables[deck.name] = table
+    return table
+
+def choices(deck, i, count=4, rng=random):
+    """
+    This function is used to pick the cards shown as options for a card:
+    the card itself and count - 1 of the cards it's most easily confused
+    with (a random pick from its closest neighbours, so the options change
+    from prompt to prompt).
+
+    :param deck: The deck.
+    :param i: The index of the card.
+    :param count: How many options to show.
+    :param rng: The random number generator.
+    :return: A shuffled list of card indices (including i).
+    """
+    neighbours = [int(j) for j in neighboursOf(deck)[i] if j >= 0]
+    picked = neighbours[:count - 1 + (len(neighbours) - count + 1) // 2]
+    options = rng.sample(picked, min(count - 1, len(picked))) + [i]
+    rng.shuffle(options)
+    return options
@@ -0,0 +1,267 @@
+"""
+desc: Typo tolerant grading for English answers. Every deck gets a symmetric deletion index (the SymSpell idea):
+        each accepted answer is stored under every string that's left after deleting up to MAX_DISTANCE of the
+        first PREFIX_LENGTH characters. Looking up a response only generates the deletions of the response and
+        checks the few answers stored under them, so a lookup costs the same no matter how big the deck is.
+
+        A response is "almost" correct when it isn't an accepted answer, but the closest answers in the whole
+        deck (by Damerau-Levenshtein distance) include one of the card's answers. A response that's closer
+        to another card's answer (or is another card's answer) is still wrong.
+"""
+
+import random
+import time
+
+import grading
+
+MAX_DISTANCE = 2        # The most edits the index can find.
+PREFIX_LENGTH = 7       # Only the start of an answer is indexed, longer answers are checked in full.
+
+indexes = {}            # Deletion indices built so far, by deck name.
+
+def allowedDistance(answer):
+    """
+    This function is used to decide how many typos an answer can have.
+    Short answers can't have any (a typo in "cat" is usually another word).
+
+    :param answer: The answer.
+    :return: The most edits allowed.
+    """
+    n = len(answer)
+    if n <= 3:
+        return 0
+    if n <= 7:
+        return 1
+    return MAX_DISTANCE
+
+def deletes(term, distance, prefixLength=PREFIX_LENGTH):
+    """
+    This function is used to list every string left after deleting up to
+    distance characters from the start of a term.
+
+    :param term: The term.
+    :param distance: The most characters deleted.
+    :param prefixLength: How much of the term is used.
+    :return: A set of strings (including the prefix itself).
+    """
+    found = {term[:prefixLength]}
+    level = found
+    for _ in range(distance):
+        nextLevel = set()
+        for s in level:
+            for i in range(len(s)):
+                nextLevel.add(s[:i] + s[i + 1:])
+        nextLevel -= found
+        found |= nextLevel
+        level = nextLevel
+    return found
+
+def distance(a, b, limit):
+    """
+    This function is used to find the Damerau-Levenshtein (optimal string
+    alignment) distance between two strings. It gives up as soon as the
+    distance is known to be more than limit.
+
+    :param a: The first string.
+    :param b: The second string.
+    :param limit: The largest distance that matters.
+    :return: The distance (limit + 1 if it's more than limit).
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        best = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d = min(d, previous2[j - 2] + 1)
+            current[j] = d
+            if d < best:
+                best = d
+        if best > limit:
+            return limit + 1
+        (previous2, previous) = (previous, current)
+    return min(previous[len(b)], limit + 1)
+
+class DeletionIndex:
+    """
+    Used to find the answers closest to a response.
+    """
+    def __init__(self, maxDistance=MAX_DISTANCE, prefixLength=PREFIX_LENGTH):
+        """
+        This function is used to create an empty DeletionIndex object.
+
+        :param self: The object.
+        :param maxDistance: The most edits a lookup can find.
+        :param prefixLength: How much of every answer is indexed.
+        """
+        self.maxDistance = maxDistance
+        self.prefixLength = prefixLength
+        self.terms = set()
+        self.deletes = {}
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term):
+        """
+        This function is used to add an answer to the index.
+
+        :param self: The index.
+        :param term: The (normalized) answer.
+        :return: None
+        """
+        if term in self.terms:
+            return
+        self.terms.add(term)
+        for d in deletes(term, self.maxDistance, self.prefixLength):
+            self.deletes.setdefault(d, []).append(term)
+
+    def lookup(self, response, maxDistance=None):
+        """
+        This function is used to find the answers closest to a response.
+
+        :param self: The index.
+        :param response: The (normalized) response.
+        :param maxDistance: The most edits allowed (defaults to the index's).
+        :return: (the distance, a list of the answers that far away), or (None, []) if nothing is close enough.
+        """
+        if response in self.terms:
+            return (0, [response])
+        if maxDistance is None or maxDistance > self.maxDistance:
+            maxDistance = self.maxDistance
+
+        best = maxDistance + 1
+        closest = []
+        seen = set()
+        for d in deletes(response, maxDistance, self.prefixLength):
+            for term in self.deletes.get(d, ()):
+                if term in seen:
+                    continue
+                seen.add(term)
+                found = distance(response, term, min(best, maxDistance))
+                if found < best:
+                    best = found
+                    closest = [term]
+                elif found == best:
+                    closest.append(term)
+        if best > maxDistance:
+            return (None, [])
+        return (best, closest)
+
+def englishAnswers(card):
+    """
+    This function is used to get the English answers a card accepts.
+
+    :param card: A Question or KanjiQuestion.
+    :return: A frozenset of normalized answers.
+    """
+    key = card.answerKey
+    return key[grading.MEANING] if grading.MEANING in key else key[grading.REVERSE]
+
+def deckIndex(deck):
+    """
+    This function is used to get the deletion index of a deck. It's built
+    the first time it's needed and kept.
+
+    :param deck: The deck.
+    :return: The DeletionIndex.
+    """
+    index = indexes.get(deck.name)
+    if index is None:
+        index = DeletionIndex()
+        for card in deck:
+            for answer in englishAnswers(card):
+                index.add(answer)
+        indexes[deck.name] = index
+    return index
+
+def almost(deck, card, response):
+    """
+    This function is used to determine whether a wrong English answer
+    was a near miss of one of the card's answers.
+
+    :param deck: The deck the card is from.
+    :param card: The card.
+    :param response: The user's response.
+    :return: The answer the user was most likely trying to type (None if it wasn't a near miss).
+    """
+    response = grading.normalize(response).strip()
+    limit = allowedDistance(response)
+    if limit == 0:
+        return None
+
+    (found, closest) = deckIndex(deck).lookup(response, limit)
+    if not found:
+        return None
+    accepted = englishAnswers(card)
+    for answer in closest:
+        if answer in accepted and found <= allowedDistance(answer):
+            return answer
+    return None
+
+def spellingOf(text, answer):
+    """
+    This function is used to find how a card spells one of its answers
+    (answers are normalized in the index).
+
+    :param text: The card's answer text (i.e. "Yen/Money/Currency").
+    :param answer: The normalized answer.
+    :return: The answer as it's written on the card.
+    """
+    for variant in text.split("/"):
+        if grading.normalize(variant) == answer:
+            return variant
+    return answer
+
+def benchmark(rounds=20000):
+    """
+    This function is used to measure how long a lookup takes in an index
+    of every English answer in every deck (and the same index padded with
+    made up words to dictionary size).
+
+    :param rounds: How many lookups are timed.
+    :return: None
+    """
+    import japanese_questions
+    import japanese_quiz
+
+    answers = set()
+    for (name, kind, _, _) in japanese_questions.DECKS:
+        if kind != "kana":
+            answers |= {a for card in japanese_quiz.openDeck(name) for a in englishAnswers(card)}
+    answers = sorted(answers)
+
+    rng = random.Random(0)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    padding = ["".join(rng.choice(letters) for _ in range(rng.randint(4, 12))) for _ in range(200000)]
+
+    for (name, terms) in (("deck answers", answers), ("dictionary size", answers + padding)):
+        start = time.perf_counter()
+        index = DeletionIndex()
+        for term in terms:
+            index.add(term)
+        built = time.perf_counter() - start
+
+        typos = []
+        for _ in range(rounds):
+            term = list(rng.choice(answers))
+            i = rng.randrange(len(term))
+            term[i] = rng.choice(letters)
+            typos.append("".join(term))
+        start = time.perf_counter()
+        for typo in typos:
+            index.lookup(typo, allowedDistance(typo))
+        elapsed = time.perf_counter() - start
+        print("{}: {} answers indexed in {:.2f}s, {:.1f} microseconds per lookup"
+              .format(name, len(index), built, elapsed / rounds * 1e6))
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,198 @@
+"""
+desc: Compiles the answers a card accepts into normalized sets, one for each direction the card can be asked
+        in. The sets are built once when the card is created so grading an answer is a single set lookup
+        instead of re-splitting and lowercasing the card's answers every time.
+
+        Kana answers also get a set of romaji keys (see romaji.py) so a FORWARD answer can be typed in any
+        valid romaji spelling without listing every spelling on the card. The kana of a kana card is kept as
+        the kana it spells instead, so the romaji of a different kana that reads the same (o for を) is wrong.
+
+        Answers and responses are normalized by the same pipeline of steps (PIPELINE): full width and half
+        width text is made regular (Ｔシャツ and Tｼｬﾂ are Tシャツ), case and stray whitespace are dropped, Katakana is
+        read as Hiragana, and long vowels are written one way (こうこう, こおこお and コーコー are all こーこー,
+        tōkyō is toukyou). Responses go through an LRU cache, since the same few are typed over and over.
+"""
+
+import functools
+import re
+import unicodedata
+
+import romaji
+import scripts
+
+FORWARD = "forward"         # The question is given and the correct answer, an alternate, or the Kanji is expected.
+REVERSE = "reverse"         # The Japanese is given and one of the English meanings is expected.
+ALTERNATE = "alternate"     # Only the alternate answers (used by Question.isAlternate).
+READING = "reading"         # A Kanji is given and its hiragana (or an alternate reading) is expected.
+MEANING = "meaning"         # A Kanji is given and one of its meanings is expected.
+KANJI = "kanji"             # A Kanji's meaning is given and the Kanji is expected.
+ROMAJI = "romaji"           # The romaji keys of the kana answers (checked for FORWARD answers).
+SPELLING = "spelling"       # The kana of a kana card, spelled exactly (checked for FORWARD answers).
+
+PIPELINE = ("width", "case", "whitespace", "kana", "longVowels")     # The steps every answer goes through, in order.
+CACHE_SIZE = 4096           # How many normalized responses are kept.
+
+# A vowel followed by the same vowel (or お followed by う and え by い) is a long vowel, written with ー.
+VOWEL_ROWS = {vowel: "".join(chr(cp) for cp in range(0x3041, 0x3097) if romaji.toRomaji(chr(cp)).endswith(vowel)) for vowel in "aiueo"}
+LONG_VOWEL = re.compile("(?<=[{}])あ|(?<=[{}])い|(?<=[{}])う|(?<=[{}])[えい]|(?<=[{}])[おう]".format(*VOWEL_ROWS.values()))
+
+def foldLongVowels(text):
+    """
+    This function is used to write every long vowel the same way: kana
+    long vowels with ー, and romaji vowels with macrons spelled out.
+
+    :param text: The answer.
+    :return: The answer with long vowels folded.
+    """
+    return LONG_VOWEL.sub("ー", text.translate(romaji.MACRONS))
+
+STEPS = { "width": lambda text: unicodedata.normalize("NFKC", text),
+          "case": str.lower,
+          "whitespace": lambda text: " ".join(text.split()),
+          "kana": romaji.toHiragana,
+          "longVowels": foldLongVowels }
+
+steps = [STEPS[name] for name in PIPELINE]
+
+def fold(answer):
+    """
+    This function is used to run an answer through every step of the
+    pipeline (uncached, for the answers of a card).
+
+    :param answer: The answer.
+    :return: The normalized answer.
+    """
+    for step in steps:
+        answer = step(answer)
+    return answer
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def normalize(response):
+    """
+    This function is used to put an answer into the form stored in the
+    answer sets. Both the user's response and the card's answers go
+    through the same steps (see fold).
+
+    :param response: The answer.
+    :return: The normalized answer.
+    """
+    return fold(response)
+
+def configure(pipeline):
+    """
+    This function is used to change the steps answers are normalized with.
+    Cards built before it's called keep the answers they were built with.
+
+    :param pipeline: The names of the steps, in order (see STEPS).
+    :return: None
+    """
+    global PIPELINE
+    unknown = [name for name in pipeline if name not in STEPS]
+    if unknown:
+        raise ValueError("unknown normalization step(s) {} (expected {})".format(", ".join(unknown), ", ".join(STEPS)))
+    PIPELINE = tuple(pipeline)
+    steps[:] = [STEPS[name] for name in PIPELINE]
+    normalize.cache_clear()
+
+def alternatesOf(alternateAnswers):
+    """
+    This function is used to turn a card's alternate answers (None, a
+    single string, or a list) into a list.
+
+    :param alternateAnswers: The alternate answers of a card.
+    :return: A list of alternate answers.
+    """
+    if alternateAnswers is None:
+        return []
+    if type(alternateAnswers) == list:
+        return alternateAnswers
+    return [alternateAnswers]
+
+def variants(answer):
+    """
+    This function is used to split an answer such as "Yen/Money/Currency"
+    into each of the accepted answers.
+
+    :param answer: The answer.
+    :return: A frozenset of normalized answers.
+    """
+    return frozenset(fold(a) for a in answer.split("/"))
+
+def compileQuestion(question):
+    """
+    This function is used to build the answer key of a Question. It has
+    to be built before the question is reversed.
+
+    :param question: The Question object.
+    :return: A dict mapping each direction to a frozenset of accepted answers.
+    """
+    alternates = frozenset(fold(a) for a in alternatesOf(question.alternateAnswers))
+
+    forward = {fold(question.correctAnswer)} | alternates
+    if question.kanji is not None:
+        forward.add(fold(question.kanji))
+
+    # Kana quizzes ask the kana and expect its romaji, vocab quizzes expect the kana (or an alternate).
+    kana = [question.correctAnswer] + alternatesOf(question.alternateAnswers)
+    keys = frozenset(romaji.key(k) for k in kana if romaji.isKana(k))
+    spellings = frozenset([romaji.spelling(question.question)] if romaji.isKana(question.question) else [])
+
+    return { FORWARD: frozenset(forward), REVERSE: variants(question.question), ALTERNATE: alternates, ROMAJI: keys,
+             SPELLING: spellings }
+
+def compileKanjiQuestion(question):
+    """
+    This function is used to build the answer key of a KanjiQuestion.
+
+    :param question: The KanjiQuestion object.
+    :return: A dict mapping each direction to a frozenset of accepted answers.
+    """
+    reading = {fold(question.hiragana)} | {fold(a) for a in alternatesOf(question.alternateAnswers)}
+
+    return { READING: frozenset(reading), MEANING: variants(question.meaning), KANJI: frozenset([fold(question.kanji)]) }
+
+def grade(answerKey, direction, response):
+    """
+    This function is used to grade a single response.
+
+    :param answerKey: The answer key of the card (see compileQuestion and compileKanjiQuestion).
+    :param direction: The direction the card was asked in.
+    :param response: The user's response.
+    :return: Boolean Flag (True = Correct)
+    """
+    response = normalize(response)
+    if response in answerKey[direction]:
+        return True
+    return direction == FORWARD and isRomaji(answerKey, response)
+
+def isRomaji(answerKey, response):
+    """
+    This function is used to determine whether a response is a romaji
+    spelling of one of the card's kana answers (or of the kana of a kana card).
+
+    :param answerKey: The answer key of the card.
+    :param response: The normalized response.
+    :return: Boolean Flag (True = Correct)
+    """
+    keys = answerKey.get(ROMAJI)
+    spellings = answerKey.get(SPELLING)
+    if not (keys or spellings) or not scripts.isScript(response, scripts.LATIN):
+        return False
+    return bool(keys) and romaji.key(response) in keys or bool(spellings) and romaji.spelling(response) in spellings
+
+def gradeMany(answerKeys, directions, responses):
+    """
+    This function is used to grade a batch of responses at once. The
+    three arguments are read in lockstep.
+
+    :param answerKeys: The answer key of each card.
+    :param directions: The direction each card was asked in.
+    :param responses: The user's responses.
+    :return: A list of Boolean Flags (True = Correct)
+    """
+    norm = normalize
+    results = []
+    for (answerKey, direction, response) in zip(answerKeys, directions, responses):
+        response = norm(response)
+        results.append(response in answerKey[direction] or (direction == FORWARD and isRomaji(answerKey, response)))
+    return results
@@ -0,0 +1,267 @@
+"""
+desc: Imports decks from local copies of JMdict (words) and KANJIDIC2 (kanji), the dictionaries published by the
+        Electronic Dictionary Research and Development Group. Nothing is downloaded: point it at the XML file
+        (or the .gz it comes in).
+
+        The XML is streamed with iterparse and every entry is thrown away as soon as it's been turned into a
+        card, and every card is streamed to disk as it's compiled, so memory doesn't grow with the size of the
+        dictionary. Cards are written straight into a compiled deck file in decks/ (see deckfile.py), which the
+        quiz opens like any other deck.
+
+        Words become vocab cards: the English of the first sense is the question, the first reading is the
+        answer, the other readings and spellings are alternates, and the first spelling is the Kanji. Kanji
+        become Kanji cards: the first kun reading (or on reading, in hiragana) is the answer and the English
+        meanings are the meaning.
+
+        KRADFILE (the parts every Kanji is written with) isn't a deck: it's turned into the table of Kanji
+        components the look-alike quiz uses (see components.py).
+
+        Examples:
+            python3 importer.py jmdict JMdict_e.gz --name hard-vocab --common
+            python3 importer.py kanjidic kanjidic2.xml.gz --name kanji-n3 --jlpt 3
+            python3 importer.py kradfile kradfile.gz
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import deckfile
+import romaji
+
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+COMMON = ("news1", "ichi1", "spec1", "spec2", "gai1")   # The priority tags JMdict counts as common words.
+MAX_GLOSSES = 3         # The most English meanings put on a card.
+
+def openXml(path):
+    """
+    This function is used to open a dictionary file (gzipped or not).
+
+    :param path: The path of the file.
+    :return: A binary file object.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+def streamEntries(path, tag):
+    """
+    This function is used to stream the entries of a dictionary. Every
+    entry is cleared out of the tree once the caller is done with it.
+
+    :param path: The path of the dictionary.
+    :param tag: The tag of an entry ("entry" for JMdict, "character" for KANJIDIC2).
+    :return: A generator of Elements.
+    """
+    with openXml(path) as f:
+        root = None
+        for (event, element) in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = element
+            elif event == "end" and element.tag == tag:
+                yield element
+                root.clear()
+
+def english(elements):
+    """
+    This function is used to join the English text of glosses or meanings.
+
+    :param elements: The gloss (or meaning) elements.
+    :return: The meanings joined with "/" (None if there aren't any).
+    """
+    meanings = []
+    for element in elements:
+        if element.get(XML_LANG, "eng") in ("eng", "en") and element.get("m_lang", "en") == "en" and element.text:
+            text = element.text.strip()
+            if "/" not in text and text not in meanings:
+                meanings.append(text)
+        if len(meanings) == MAX_GLOSSES:
+            break
+    return "/".join(meanings) if meanings else None
+
+def jmdictCards(path, priorities=None, maxNf=None, tag=None, limit=None):
+    """
+    This function is used to stream JMdict entries as vocab cards.
+
+    :param path: The path of JMdict (or JMdict_e).
+    :param priorities: Only keep words with one of these priority tags (i.e. ichi1, news1).
+    :param maxNf: Only keep words in the nfXX frequency bands up to this one (nf01 is the 500 most common).
+    :param tag: Only keep words with a part of speech, field, or misc tag containing this text (i.e. "Ichidan verb").
+    :param limit: The most cards to import.
+    :return: A generator of (question, correctAnswer, alternateAnswers, kanji) tuples.
+    """
+    count = 0
+    tag = tag.lower() if tag else None
+    for entry in streamEntries(path, "entry"):
+        spellings = [k.text for k in entry.iter("keb")]
+        readings = [r.text for r in entry.iter("reb")]
+        sense = entry.find("sense")
+        if not readings or sense is None:
+            continue
+
+        if priorities or maxNf:
+            tags = {p.text for p in entry.iter("ke_pri")} | {p.text for p in entry.iter("re_pri")}
+            if priorities and not tags & priorities:
+                continue
+            if maxNf and not any(t.startswith("nf") and int(t[2:]) <= maxNf for t in tags):
+                continue
+        if tag:
+            labels = [e.text or "" for s in entry.iter("sense") for e in s if e.tag in ("pos", "field", "misc", "dial")]
+            if not any(tag in label.lower() for label in labels):
+                continue
+
+        question = english(sense.iter("gloss"))
+        if question is None:
+            continue
+        alternates = [a for a in readings[1:] + spellings[1:] if a != readings[0]]
+        yield (question, readings[0], alternates or None, spellings[0] if spellings else None)
+
+        count += 1
+        if limit and count >= limit:
+            return
+
+def kanjiReading(reading):
+    """
+    This function is used to turn a KANJIDIC reading into hiragana
+    (み.る becomes みる, on readings go from katakana to hiragana).
+
+    :param reading: The reading.
+    :return: The reading in hiragana.
+    """
+    return romaji.toHiragana(reading.replace(".", "").replace("-", ""))
+
+def kanjidicCards(path, jlpt=None, grades=None, maxFrequency=None, limit=None):
+    """
+    This function is used to stream KANJIDIC2 characters as Kanji cards.
+
+    :param path: The path of KANJIDIC2.
+    :param jlpt: Only keep Kanji from these (old, 1 - 4) JLPT levels.
+    :param grades: Only keep Kanji from these school grades.
+    :param maxFrequency: Only keep Kanji ranked at least this common in newspapers.
+    :param limit: The most cards to import.
+    :return: A generator of (kanji, hiragana, alternateAnswers, meaning) tuples.
+    """
+    count = 0
+    for character in streamEntries(path, "character"):
+        misc = character.find("misc")
+        if misc is not None:
+            level = misc.findtext("jlpt")
+            grade = misc.findtext("grade")
+            frequency = misc.findtext("freq")
+        else:
+            level = grade = frequency = None
+        if jlpt and (level is None or int(level) not in jlpt):
+            continue
+        if grades and (grade is None or int(grade) not in grades):
+            continue
+        if maxFrequency and (frequency is None or int(frequency) > maxFrequency):
+            continue
+
+        readings = []
+        for kind in ("ja_kun", "ja_on"):
+            for r in character.iter("reading"):
+                if r.get("r_type") == kind and r.text:
+                    reading = kanjiReading(r.text)
+                    if reading not in readings:
+                        readings.append(reading)
+        meaning = english(character.iter("meaning"))
+        if not readings or meaning is None:
+            continue
+        yield (character.findtext("literal"), readings[0], readings[1:] or None, meaning)
+
+        count += 1
+        if limit and count >= limit:
+            return
+
+def importComponents(path, output=None):
+    """
+    This function is used to import the parts of every Kanji from KRADFILE
+    (EUC-JP lines like "亜 : ｜ 一 口") into decks/components.tsv.
+
+    :param path: The path of KRADFILE (or KRADFILE2, or the .gz either comes in).
+    :param output: The path the table is written to (defaults to components.IMPORTED_PATH).
+    :return: The number of Kanji imported.
+    """
+    import components
+
+    output = output or components.IMPORTED_PATH
+    output = os.path.abspath(output)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    count = 0
+    (handle, tmp) = tempfile.mkstemp(dir=os.path.dirname(output), suffix=".tmp")
+    try:
+        with openXml(path) as f, os.fdopen(handle, "w", encoding="utf-8") as table:
+            for line in f:
+                line = line.decode("euc_jis_2004", errors="replace").strip()
+                (kanji, _, parts) = line.partition(" : ")
+                if line.startswith("#") or not parts:
+                    continue
+                table.write("{}\t{}\n".format(kanji, " ".join(parts.split())))
+                count += 1
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return count
+
+def importDeck(name, kind, title, cards):
+    """
+    This function is used to compile imported cards into decks/NAME.bin.
+
+    :param name: The name of the deck.
+    :param kind: The kind of deck ("vocab" or "kanji").
+    :param title: The title shown in the quiz menus.
+    :param cards: The cards (any iterable).
+    :return: The number of cards imported.
+    """
+    path = deckfile.importedPath(name)
+    os.makedirs(deckfile.IMPORT_DIR, exist_ok=True)
+    deckfile.compileDecks([(name, kind, title, cards)], path)
+    with deckfile.DeckFile(path) as imported:
+        return len(imported.deck(name))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a deck from JMdict or KANJIDIC2 (or Kanji parts from KRADFILE)")
+    dictionaries = parser.add_subparsers(dest="dictionary", required=True)
+
+    words = dictionaries.add_parser("jmdict", help="import words from JMdict")
+    words.add_argument("path", help="JMdict or JMdict_e (.xml or .gz)")
+    words.add_argument("--name", default="hard-vocab", help="the name of the deck")
+    words.add_argument("--title", default="Hard Vocab", help="the title of the deck")
+    words.add_argument("--common", action="store_true", help="only import common words (news1, ichi1, spec1/2, gai1)")
+    words.add_argument("--priority", action="append", help="only import words with this priority tag (repeatable)")
+    words.add_argument("--max-nf", type=int, help="only import words in frequency bands nf01 - nfN")
+    words.add_argument("--tag", help="only import words with a tag containing this text (i.e. \"Ichidan verb\")")
+    words.add_argument("--limit", type=int, help="the most words to import")
+
+    kanji = dictionaries.add_parser("kanjidic", help="import Kanji from KANJIDIC2")
+    kanji.add_argument("path", help="kanjidic2 (.xml or .gz)")
+    kanji.add_argument("--name", default="kanji", help="the name of the deck")
+    kanji.add_argument("--title", default="Kanji", help="the title of the deck")
+    kanji.add_argument("--jlpt", type=int, action="append", help="only import Kanji from this (old, 1 - 4) JLPT level (repeatable)")
+    kanji.add_argument("--grade", type=int, action="append", help="only import Kanji from this school grade (repeatable)")
+    kanji.add_argument("--max-frequency", type=int, help="only import the N most common Kanji")
+    kanji.add_argument("--limit", type=int, help="the most Kanji to import")
+
+    parts = dictionaries.add_parser("kradfile", help="import the parts of every Kanji from KRADFILE")
+    parts.add_argument("path", help="kradfile or kradfile2 (or .gz)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.dictionary == "kradfile":
+        import components
+        count = importComponents(args.path)
+        print("[!] Imported the parts of {} Kanji into {} in {:.1f}s.".format(count, components.IMPORTED_PATH, time.perf_counter() - start))
+    else:
+        if args.dictionary == "jmdict":
+            priorities = set(args.priority or []) | (set(COMMON) if args.common else set())
+            cards = jmdictCards(args.path, priorities, args.max_nf, args.tag, args.limit)
+            count = importDeck(args.name, "vocab", args.title, cards)
+        else:
+            cards = kanjidicCards(args.path, set(args.jlpt or []), set(args.grade or []), args.max_frequency, args.limit)
+            count = importDeck(args.name, "kanji", args.title, cards)
+        print("[!] Imported {} cards into {} in {:.1f}s.".format(count, deckfile.importedPath(args.name), time.perf_counter() - start))
@@ -0,0 +1,420 @@
+"""
+desc: The question banks used by the quizzes. Every card is written as a tuple of the arguments its question
+        type is built with. Kana and vocab cards are (question, correctAnswer, alternateAnswers, kanji, context)
+        and Kanji cards are (kanji, hiragana, alternateAnswers, meaning). Trailing arguments can be left off.
+
+        These lists are never used directly while quizzing. They're compiled into decks.bin (see deckfile.py)
+        the first time the quiz is run after this file changes, and the quiz only reads the cards it asks.
+"""
+
+# Hiragana characters including Dakuten, or diacritic marks.
+HIRAGANA = [
+    ("あ", "a"), ("い", "i"), ("う", "u"), ("え", "e"), ("お", "o"),
+    ("か", "ka"), ("き", "ki"), ("く", "ku"), ("け", "ke"), ("こ", "ko"),
+    ("が", "ga"), ("ぎ", "gi"), ("ぐ", "gu"), ("げ", "ge"), ("ご", "go"),
+    ("さ", "sa"), ("し", "shi"), ("す", "su"), ("せ", "se"), ("そ", "so"),
+    ("ざ", "za"), ("じ", "ji"), ("ず", "zu"), ("ぜ", "ze"), ("ぞ", "zo"),
+    ("た", "ta"), ("ち", "chi"), ("つ", "tsu"), ("て", "te"), ("と", "to"),
+    ("だ", "da"), ("ぢ", "ji"), ("づ", "zu"), ("で", "de"), ("ど", "do"),
+    ("な", "na"), ("に", "ni"), ("ぬ", "nu"), ("ね", "ne"), ("の", "no"),
+    ("は", "ha"), ("ひ", "hi"), ("ふ", "fu"), ("へ", "he"), ("ほ", "ho"),
+    ("ば", "ba"), ("び", "bi"), ("ぶ", "bu"), ("べ", "be"), ("ぼ", "bo"),
+    ("ぱ", "pa"), ("ぴ", "pi"), ("ぷ", "pu"), ("ぺ", "pe"), ("ぽ", "po"),
+    ("ま", "ma"), ("み", "mi"), ("む", "mu"), ("め", "me"), ("も", "mo"),
+    ("や", "ya"), ("ゆ", "yu"), ("よ", "yo"),
+    ("ら", "ra"), ("り", "ri"), ("る", "ru"), ("れ", "re"), ("ろ", "ro"),
+    ("わ", "wa"), ("を", "wo"),
+    ("ん", "n")
+]
+
+# Katakana characters including Dakuten, or diacritic marks.
+KATAKANA = [
+    ("ア", "a"), ("イ", "i"), ("ウ", "u"), ("エ", "e"), ("オ", "o"),
+    ("カ", "ka"), ("キ", "ki"), ("ク", "ku"), ("ケ", "ke"), ("コ", "ko"),
+    ("ガ", "ga"), ("ギ", "gi"), ("グ", "gu"), ("ゲ", "ge"), ("ゴ", "go"),
+    ("サ", "sa"), ("シ", "shi"), ("ス", "su"), ("セ", "se"), ("ソ", "so"),
+    ("ザ", "za"), ("ジ", "ji"), ("ズ", "zu"), ("ゼ", "ze"), ("ゾ", "zo"),
+    ("タ", "ta"), ("チ", "chi"), ("ツ", "tsu"), ("テ", "te"), ("ト", "to"),
+    ("ダ", "da"), ("ヂ", "ji"), ("ヅ", "zu"), ("デ", "de"), ("ド", "do"),
+    ("ナ", "na"), ("ニ", "ni"), ("ヌ", "nu"), ("ネ", "ne"), ("ノ", "no"),
+    ("ハ", "ha"), ("ヒ", "hi"), ("フ", "fu"), ("ヘ", "he"), ("ホ", "ho"),
+    ("バ", "ba"), ("ビ", "bi"), ("ブ", "bu"), ("ベ", "be"), ("ボ", "bo"),
+    ("パ", "pa"), ("ピ", "pi"), ("プ", "pu"), ("ペ", "pe"), ("ポ", "po"),
+    ("マ", "ma"), ("ミ", "mi"), ("ム", "mu"), ("メ", "me"), ("モ", "mo"),
+    ("ヤ", "ya"), ("ユ", "yu"), ("ヨ", "yo"),
+    ("ラ", "ra"), ("リ", "ri"), ("ル", "ru"), ("レ", "re"), ("ロ", "ro"),
+    ("ワ", "wa"), ("ヲ", "wo"),
+    ("ン", "n")
+]
+
+# Lesson 3 Kanji. Taken from http://genki.japantimes.co.jp/self/genki-kanji-list-linked-to-wwkanji
+KANJI_LESSON3 = [
+    ("一", "いち", None, "One"),
+    ("二", "に", None, "Two"),
+    ("三", "さん", None, "Three"),
+    ("四", "よん", "し", "Four"),
+    ("五", "ご", None, "Five"),
+    ("六", "ろく", None, "Six"),
+    ("七", "なな", "しち", "Seven"),
+    ("八", "はち", None, "Eight"),
+    ("九", "きゅう", None, "Nine"),
+    ("十", "じゅう", None, "Ten"),
+    ("百", "ひゃく", ["びゃく", "ぴゃく"], "Hundred"),
+    ("千", "せん", "ぜん", "Thousand"),
+    ("万", "まん", None, "Ten Thousand"),
+    ("円", "えん", None, "Yen/Money/Currency"),
+    ("時", "じ", "とき", "Time")
+]
+
+# Lesson 4 Kanji.
+KANJI_LESSON4 = [
+    ("日", "にち", "に", "Day"),
+    ("本", "ほん", "もと", "Book"),
+    ("人", "じん", "ひと", "Person/People"),
+    ("月", "げつ", "つき", "Month/Moon"),
+    ("火", "か", "ひ", "Fire"),
+    ("水", "みず", "すい", "Water"),
+    ("木", "き", "もく", "Tree"),
+    ("金", "きん", "かね", "Money/Gold"),
+    ("土", "ど", "つち", "Ground/Soil"),
+    ("曜", "よう", None, "Weekday"),
+    ("上", "うえ", None, "Above/On"),
+    ("下", "した", None, "Below/Under"),
+    ("中", "なか", "ちゅう", "Inside"),
+    ("半", "はん", None, "Half")
+]
+
+# Lesson 5 Kanji.
+KANJI_LESSON5 = [
+    ("山", "やま", "さん", "Mountain"),
+    ("川", "かわ", "がわ", "River"),
+    ("元", "げん", ["がん", "もと"], "Origin"),
+    ("気", "き", None, "Spirit"),
+    ("天", "てん", None, "Heaven"),
+    ("私", "わたし", "し", "I/Private"),
+    ("今", "いま", "こん", "Now"),
+    ("田", "た", "だ", "Rice Field"),
+    ("女", "おんな", "じょ", "Woman"),
+    ("男", "おとこ", "だん", "Man"),
+    ("見", "み", "けん", "To See"),
+    ("行", "い", ["こう", "ぎょう"], "To Go"),
+    ("食", "た", "しょく", "To Eat"),
+    ("飲", "の", "いん", "To Drink")
+]
+
+# Chapter 1 Vocab. Located on Genki page 38-39.
+VOCAB_CHAPTER1 = [
+    ("College/University", "だいがく", None, "大学"),
+    ("High School", "こうこう", None, "高校"),
+    ("Student", "がくせい", None, "学生"),
+    ("College Student", "だいがくせい", None, "大学生"),
+    ("International Student", "りゅうがくせい", None, "留学生"),
+    ("Teacher/Professor", "せんせい", None, "先生"),
+    ("First Year Student", "いちねんせい", None, "一年生"),
+    ("Major", "せんこう", None, "専攻"),
+    ("I", "わたし", None, "私"),
+    ("Friend", "ともだち", None, "友達"),
+    ("Mr/Ms", "さん"),
+    ("Japanese People", "にほんじん", None, "日本人"),
+    ("Now", "いま", None, "今"),
+    ("AM", "ごぜん", None, "午前"),
+    ("PM", "ごご", None, "午後"),
+    ("O'Clock", "じ", None, "時"),
+    ("One O'Clock", "いちじ", None, "一時"),
+    ("Half", "はん", None, "半"),
+    ("2:30", "にじはん", None, "二時半"),
+    ("Japan", "にほん", None, "日本"),
+    ("America/USA", "アメリカ"),
+    ("Language", "ご", None, "語"),
+    ("Japanese Language", "にほんご", None, "日本語"),
+    ("Years Old", "さい", None, "歳"),
+    ("Telephone/Phone", "でんわ", None, "電話"),
+    ("Number", "ばんごう", None, "番号"),
+    ("Name", "なまえ", None, "名前"),
+    ("What", "なん", "なに", "何"),
+    ("Um", "あの"),
+    ("Yes", "はい"),
+    ("That's Right", "そうです"),
+    ("I See/Is That So", "そうですか"),
+    ("Britain", "イギリス"),
+    ("Australia", "オーストラリア"),
+    ("Korea", "かんこく", None, "韓国"),
+    ("China", "ちゅうごく", None, "中国"),
+    ("India", "インド"),
+    ("Egypt", "エジプト"),
+    ("Philippines", "フィリピン"),
+    ("Asian Studies", "アジアけんきゅう", None, "アジア研究"),
+    ("Economics", "けいざい", None, "経済"),
+    ("Engineering", "こうがく"),
+    ("International Relations", "こくさいかんけい", None, "国際関係"),
+    ("Computer", "コンピュータ"),
+    ("Politics", "せいじ", None, "政治"),
+    ("Biology", "せいぶつがく", None, "生物学"),
+    ("Business", "ビジネス"),
+    ("Literature", "ぶんがく", None, "文学"),
+    ("History", "れきし", None, "歴史"),
+    ("Doctor", "いしゃ", None, "医者"),
+    ("Office Worker", "かいしゃいん", None, "会社員"),
+    ("Nurse", "かんごし", None, "看護師"),
+    ("High School Student", "こうこうせい", None, "高校生"),
+    ("Housewife", "しゅふ", None, "主婦"),
+    ("Graduate Student", "だいがくいんせい", None, "大学院生"),
+    ("Lawyer", "べんごし", None, "弁護士"),
+    ("Mother", "おかあさん", None, "お母さん"),
+    ("Father", "おとうさん", None, "お父さん"),
+    ("Older Sister", "おねえさん", None, "お姉さん"),
+    ("Older Brother", "おにいさん", None, "お兄さん"),
+    ("Younger Sister", "いもうと", None, "妹"),
+    ("Younger Brother", "おとうと", None, "弟")
+]
+
+# Chapter 2 Vocab. Located on Genki page 58-69.
+VOCAB_CHAPTER2 = [
+    ("This One", "これ"),
+    ("That One", "それ"),
+    ("That One Over There", "あれ"),
+    ("Which One", "どれ"),
+    ("This", "この"),
+    ("That", "その"),
+    ("That Over There", "あの"),
+    ("Which", "どの"),
+    ("Here", "ここ"),
+    ("There", "そこ"),
+    ("Over There", "あそこ"),
+    ("Where", "どこ"),
+    ("Who", "だれ"),
+    ("Delicious", "おいしい", None, "美味しい"),
+    ("Fish", "さかな", None, "魚"),
+    ("Pork Cutlet", "とんかつ"),
+    ("Meat", "にく", None, "肉"),
+    ("Menu", "メニュー"),
+    ("Vegetables", "やさい", None, "野菜"),
+    ("Umbrella", "かさ", None, "傘"),
+    ("Bag", "かばん", None, "鞄"),
+    ("Shoes", "くつ", None, "靴"),
+    ("Wallet", "さいふ", None, "財布"),
+    ("Jeans", "ジーンズ"),
+    ("Bicycle", "じてんしゃ", None, "自転車"),
+    ("Newspaper", "しんぶん", None, "新聞"),
+    ("Smartphone/Mobile", "スマホ"),
+    ("T-Shirt", "Ｔシャツ", ["Tシャツ", "tiishatsu"]),
+    ("Watch/Clock", "とけい", None, "時計"),
+    ("Notebook", "ノート"),
+    ("Pen", "ペン"),
+    ("Hat/Cap", "ぼうし", None, "帽子"),
+    ("Book", "ほん", None, "本"),
+    ("Bank", "ぎんこう", None, "銀行"),
+    ("Convenience Store", "コンビニ"),
+    ("Toilet/Restroom", "トイレ"),
+    ("Library", "としょかん", None, "図書館"),
+    ("Post Office", "ゆうびんきょく", None, "郵便局"),
+    ("Britain", "イギリス"),
+    ("Korea", "かんこく", None, "韓国"),
+    ("China", "ちゅうごく", None, "中国"),
+    ("English", "えいご", None, "英語"),
+    ("Economics", "けいざい", None, "経済"),
+    ("Computer", "コンピュータ"),
+    ("Business", "ビジネス"),
+    ("History", "れきし", None, "歴史"),
+    ("Mother", "おかあさん", None, "お母さん"),
+    ("Father", "おとうさん", None, "お父さん"),
+    ("Welcome", "いらっしゃいませ", None, None, "To A Store"),
+    ("Please", "おねがいします", None, "お願いします"),
+    ("Please Give Me", "ください"),
+    ("Then/If That Is The Case", "じゃあ"),
+    ("Here It Is", "どうぞ"),
+    ("Thank-you", "どうも", None, None, "Informal Version")
+]
+
+# Chapter 3 Vocab. Located on Genki page 84-85.
+VOCAB_CHAPTER3 = [
+    ("Movie", "えいが", None, "映画"),
+    ("Music", "おんがく", None, "音楽"),
+    ("Magazine", "ざっし", None, "雑誌"),
+    ("Sports", "スポーツ"),
+    ("Date", "デート", None, None, "Romantic Date"),
+    ("Tennis", "テニス"),
+    ("TV", "テレビ"),
+    ("Ice Cream", "アイスクリーム"),
+    ("Hamburger", "ハンバーガー"),
+    ("Sake/Alcohol", "おさけ", None, "お酒"),
+    ("Green Tea/Tea", "おちゃ", None, "お茶"),
+    ("Coffee", "コーヒー"),
+    ("Water", "みず", None, "水"),
+    ("Breakfast", "あさごはん", None, "朝ご飯"),
+    ("Lunch", "ひるごはん", None, "昼ご飯"),
+    ("Dinner", "ばんごはん", None, "晩ご飯"),
+    ("Home/House/My Place", "いえ", "うち", "家"),
+    ("School", "がっこう", None, "学校"),
+    ("Cafe", "カフェ"),
+    ("Tomorrow", "あした", None, "明日"),
+    ("Today", "きょう", None, "今日"),
+    ("Morning", "あさ", None, "朝"),
+    ("Tonight", "こんばん", None, "今晩"),
+    ("Every Day", "まいにち", None, "毎日"),
+    ("Every Night", "まいばん", None, "毎晩"),
+    ("Weekend", "しゅうまつ", None, "週末"),
+    ("Saturday", "どようび", None, "土曜日"),
+    ("Sunday", "にちようび", None, "日曜日"),
+    ("When", "いつ"),
+    ("At About/Around", "ごろ"),
+    ("To Go", "いく", None, "行く"),
+    ("To Go Back/To Return", "かえる", None, "帰る"),
+    ("To Listen/To Hear", "きく", None, "聞く"),
+    ("To Drink", "のむ", None, "飲む"),
+    ("To Speak/To Talk", "はなす", None, "話す"),
+    ("To Read", "よむ", None, "読む"),
+    ("To Get Up", "おきる", None, "起きる"),
+    ("To Eat", "たべる", None, "食べる"),
+    ("To Sleep/To Go To Sleep", "ねる", None, "寝る"),
+    ("To See/To Look At/To Watch", "みる", None, "見る"),
+    ("To Come", "くる", None, "来る"),
+    ("To Do", "する"),
+    ("To Study", "べんきょうする", None, "勉強する"),
+    ("Good", "いい"),
+    ("Early", "はやい", None, "早い"),
+    ("Not Much", "あまり"),
+    ("Not At All", "ぜんぜん", None, "全然"),
+    ("Usually", "たいてい", None, "大抵"),
+    ("A Little", "ちょっと"),
+    ("Sometimes", "ときどき", None, "時々"),
+    ("Often/Much", "よく"),
+    ("That's Right/Let Me See", "そうですね"),
+    ("But", "でも"),
+    ("How About/How Is", "どうですか"),
+    ("Yes", "ええ", None, None, "Informal Version")
+]
+
+# Chapter 4 Vocab. Located on Genki page 104-106.
+VOCAB_CHAPTER4 = [
+    ("Game", "ゲーム"),
+    ("Part-Time Job", "アルバイト", "バイト"),
+    ("Shopping", "かいもの", None, "買い物"),
+    ("Class", "クラス"),
+    ("Dog", "いぬ", None, "犬"),
+    ("Cat", "ねこ", None, "猫"),
+    ("Person", "ひと", None, "人"),
+    ("Child", "こども", None, "子供"),
+    ("You", "あなた"),
+    ("Chair", "いす", None, "椅子"),
+    ("Desk", "つくえ", None, "机"),
+    ("Picture/Photograph", "しゃしん", None, "写真"),
+    ("Flower", "はな", None, "花"),
+    ("Term Paper", "レポート"),
+    ("Rice/Meal", "ごはん", None, "ご飯"),
+    ("Bread", "パン"),
+    ("Temple", "おてら", None, "お寺"),
+    ("Park", "こうえん", None, "公園"),
+    ("Supermarket", "スーパー"),
+    ("Bus Stop", "バスてい", None, "バス停"),
+    ("Hospital", "びょういん", None, "病院"),
+    ("Hotel", "ホテル"),
+    ("Bookstore", "ほんや", None, "本屋"),
+    ("Town/City", "まち", None, "町"),
+    ("Restaurant", "レストラン"),
+    ("Yesterday", "きのう", None, "昨日"),
+    ("Hours", "じかん", None, "時間"),
+    ("One Hour", "いちじかん", None, "一時間"),
+    ("Last Week", "せんしゅう", None, "先週"),
+    ("When/At The Time Of", "とき", None, "時"),
+    ("Monday", "げつようび", None, "月曜日"),
+    ("Tuesday", "かようび", None, "火曜日"),
+    ("Wednesday", "すいようび", None, "水曜日"),
+    ("Thursday", "もくようび", None, "木曜日"),
+    ("Friday", "きんようび", None, "金曜日"),
+    ("To Meet/To See", "あう", None, "会う", "To Meet A Person"),
+    ("There Is", "ある"),
+    ("To Buy", "かう", None, "買う"),
+    ("To Write", "かく", None, "書く"),
+    ("To Take", "とる", None, "撮る", "To Take a Picture"),
+    ("To Wait", "まつ", None, "待つ"),
+    ("To Understand", "わかる"),
+    ("About", "ぐらい"),
+    ("I'm Sorry", "ごめんなさい"),
+    ("And Then", "それから"),
+    ("So/Therefore", "だから"),
+    ("Many/A Lot", "たくさん"),
+    ("Together With/And", "と"),
+    ("Why", "どうして"),
+    ("Alone", "ひとりで", None, "一人で"),
+    ("Hello", "もしもし", None, None, "Phone"),
+    ("Right", "みぎ", None, "右"),
+    ("Left", "ひだり", None, "左"),
+    ("Front", "まえ", None, "前"),
+    ("Back", "うしろ", None, "後ろ"),
+    ("Inside", "なか", None, "中"),
+    ("On", "うえ", None, "上"),
+    ("Under/Below", "した", None, "下"),
+    ("Near/Nearby", "ちかく", None, "近く"),
+    ("Next", "となり", None, "隣"),
+    ("Between", "あいだ", None, "間")
+]
+
+# Chapter 5 Vocab. Located on Genki page 130-131.
+VOCAB_CHAPTER5 = [
+    ("Food", "たべもの", None, "食べ物"),
+    ("Drink", "のみもの", None, "飲み物"),
+    ("Fruit", "くだもの", None, "果物"),
+    ("Holiday/Day Off/Absence", "やすみ", None, "休み"),
+    ("Sea", "うみ", None, "海"),
+    ("Surfing", "サーフィン"),
+    ("Souvenir", "おみやげ", None, "お土産"),
+    ("Bus", "バス"),
+    ("Weather", "てんき", None, "天気"),
+    ("Homework", "しゅくだい", None, "宿題"),
+    ("Test", "テスト"),
+    ("Birthday", "たんじょうび", None, "誕生日"),
+    ("Room", "へや", None, "部屋"),
+    ("I", "ぼく", None, "僕", "Used By Men"),
+    ("Size L", "Lサイズ", ["lsaizu", "エルサイズ", "erusaizu"]),
+    ("New", "あたらしい", None, "新しい"),
+    ("Old", "ふるい", None, "古い", "Things - Not Used For People"),
+    ("Hot", "あつい", None, "暑い", "Weather"),
+    ("Cold", "さむい", None, "寒い", "Weather"),
+    ("Hot", "あつい", None, "熱い", "Thing"),
+    ("Busy", "いそがしい", None, "忙しい", "People/Days"),
+    ("Large", "おおきい", None, "大きい"),
+    ("Small", "ちいさい", None, "小さい"),
+    ("Interesting/Funny", "おもしろい", None, "面白い"),
+    ("Boring", "つまらない"),
+    ("Kind/Easy", "やさしい", None, None, "Person/Problem"),
+    ("Difficult", "むずかしい", None, "難しい"),
+    ("Good-Looking", "かっこいい"),
+    ("Frightening", "こわい", None, "怖い"),
+    ("Fun", "たのしい", None, "楽しい"),
+    ("Inexpensive/Cheap", "やすい", None, "安い", "Thing"),
+    ("Fond Of/To Like", "すき", "すきな", "好き"),
+    ("Disgusted With/To Dislike", "きらい", "きらいな", "嫌い"),
+    ("Very Fond Of/To Love", "だいすき", "だいすきな", "大好き"),
+    ("To Hate", "だいきらい", "だいきらいな", "大嫌い"),
+    ("Beautiful/Clean", "きれい", "きれいな"),
+    ("Healthy/Energetic", "げんき", "げんきな", "元気"),
+    ("Quiet", "しずか", "しずかな", "静か"),
+    ("Lively", "にぎやか", "にぎやかな"),
+    ("Not Busy/Free", "ひま", "ひまな", "暇", "Time"),
+    ("To Swim", "およぐ", None, "泳ぐ"),
+    ("To Ask", "きく", None, "聞く"),
+    ("To Ride/To Board", "のる", None, "乗る"),
+    ("To Do/To Perform", "やる"),
+    ("To Go Out", "でかける", None, "出かける"),
+    ("Together", "いっしょに", None, "一緒に"),
+    ("Extremely", "すごく"),
+    ("It's Okay/Not To Worry", "だいじょうぶ", None, "大丈夫"),
+    ("Very", "とても"),
+    ("What Kind Of", "どんな"),
+    ("Counter For Flat Objects", "まい", None, "枚")
+]
+
+# Every deck the quiz knows about. Each entry is (name, kind, title, cards).
+DECKS = [
+    ("hiragana", "kana", "ひらがな", HIRAGANA),
+    ("katakana", "kana", "かたかな", KATAKANA),
+    ("kanji-lesson3", "kanji", "Lesson 3", KANJI_LESSON3),
+    ("kanji-lesson4", "kanji", "Lesson 4", KANJI_LESSON4),
+    ("kanji-lesson5", "kanji", "Lesson 5", KANJI_LESSON5),
+    ("vocab-chapter1", "vocab", "Chapter 1 Vocabulary", VOCAB_CHAPTER1),
+    ("vocab-chapter2", "vocab", "Chapter 2 Vocabulary", VOCAB_CHAPTER2),
+    ("vocab-chapter3", "vocab", "Chapter 3 Vocabulary", VOCAB_CHAPTER3),
+    ("vocab-chapter4", "vocab", "Chapter 4 Vocabulary", VOCAB_CHAPTER4),
+    ("vocab-chapter5", "vocab", "Chapter 5 Vocabulary", VOCAB_CHAPTER5),
+]
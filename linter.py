@@ -0,0 +1,384 @@
+"""
+desc: Checks every deck for the mistakes grading can't notice: a card written in the wrong script (a hiragana
+        card in the katakana deck, Kanji in a reading), romaji alternates that don't spell the card's kana,
+        readings that can't belong to the card's Kanji, and duplicate cards.
+
+        Decks are split into chunks that are checked by a pool of worker processes, so a dictionary sized
+        deck imported with importer.py is checked in seconds. Workers only decode field tuples (no card objects
+        are built). Duplicates are found by hashing every card's key and comparing the hashes once every chunk
+        is done, both within a deck (an error) and across decks (a warning, chapters repeat a few words).
+
+        Readings are checked against the readings of every Kanji the kanji decks know. Words with a Kanji
+        none of the decks know are only checked for their shape (their okurigana, and a few kana per Kanji).
+
+        Examples:
+            python3 linter.py
+            python3 linter.py hard-vocab --workers 4
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import hashlib
+import os
+import re
+import sys
+
+import registry
+import romaji
+import scripts
+
+ERROR = "error"
+WARNING = "warning"
+
+CHUNK_SIZE = 20000          # How many cards each worker checks at a time.
+MAX_KANA_PER_KANJI = 4      # The longest reading a single Kanji is allowed in a word.
+COUNTERS = "ヶヵゖゕ"        # Small ke/ka as in 一ヶ月, read like a Kanji.
+
+# Dakuten and handakuten versions of each kana, for readings that change inside a word (rendaku).
+VOICED = {ch: chr(ord(ch) + 1) for ch in "かきくけこさしすせそたちつてと"}
+VOICED.update({ch: chr(ord(ch) + 1) + chr(ord(ch) + 2) for ch in "はひふへほ"})
+
+# A problem found in a card. The card is its index in the deck.
+Problem = collections.namedtuple("Problem", ["deck", "card", "severity", "check", "message"])
+
+readings = {}       # Every known reading of each Kanji (in hiragana), set in every worker by setReadings.
+spellings = {}      # What spellingsOf found, by Kanji.
+
+def setReadings(known):
+    """
+    This function is used to hand the known Kanji readings to a worker.
+
+    :param known: A dict of Kanji to a set of readings.
+    :return: None
+    """
+    global readings
+    readings = known
+    spellings.clear()
+
+def knownReadings(infos):
+    """
+    This function is used to collect the readings of every Kanji card.
+
+    :param infos: The DeckInfo of every deck.
+    :return: A dict of Kanji to a set of readings (in hiragana).
+    """
+    import grading
+
+    known = collections.defaultdict(set)
+    for info in infos:
+        if info.kind != "kanji":
+            continue
+        deck = registry.openDeckFile(info.path).deck(info.name)
+        for i in range(len(deck)):
+            fields = deck.fields(i) + (None,) * 4
+            if len(fields[0]) == 1:
+                for reading in [fields[1]] + grading.alternatesOf(fields[2]):
+                    if reading:
+                        known[fields[0]].add(romaji.toHiragana(reading))
+    return dict(known)
+
+def characterClass(script, extra=""):
+    """
+    This function is used to build a regular expression matching any
+    character that only belongs to a script (see scripts.py).
+
+    :param script: The script (i.e. scripts.KANJI).
+    :param extra: More characters to match.
+    :return: The compiled regular expression.
+    """
+    ranges = []
+    for (cp, mask) in enumerate(scripts.TABLE):
+        if mask == script:
+            if ranges and ranges[-1][1] == cp - 1:
+                ranges[-1][1] = cp
+            else:
+                ranges.append([cp, cp])
+    if script == scripts.KANJI:
+        ranges.append(list(scripts.ASTRAL_KANJI))
+    return re.compile("[{}{}]".format("".join("{}-{}".format(re.escape(chr(a)), re.escape(chr(b))) for (a, b) in ranges),
+                                      re.escape(extra)))
+
+KANJI = characterClass(scripts.KANJI, COUNTERS)
+NOT_KANJI = re.compile(KANJI.pattern.replace("[", "[^", 1))
+HIRAGANA = characterClass(scripts.HIRAGANA)
+KATAKANA = characterClass(scripts.KATAKANA)
+LATIN = characterClass(scripts.LATIN)
+JAPANESE = re.compile("|".join([KANJI.pattern, HIRAGANA.pattern, KATAKANA.pattern]))
+
+KANJI_RUN = re.compile("({}+)".format(KANJI.pattern))
+LETTER = re.compile("[a-zA-Z]")
+
+def hasKanji(text):
+    return KANJI.search(text) is not None
+
+def spellingsOf(ch):
+    """
+    This function is used to list every way a known Kanji can be read in
+    a word: its readings, voiced (rendaku), and cut short before a double
+    consonant (sokuon).
+
+    :param ch: The Kanji.
+    :return: A set of readings (empty if the Kanji isn't known).
+    """
+    found = set()
+    for reading in readings.get(ch, ()):
+        forms = {reading} | {voiced + reading[1:] for voiced in VOICED.get(reading[0], "")}
+        for form in forms:
+            found.add(form)
+            if len(form) > 1 and form[-1] in "つくちき":
+                found.add(form[:-1] + "っ")
+    return found
+
+def fits(parts, reading, position=0, part=0):
+    """
+    This function is used to match a reading against the parts of a
+    spelling (see readingProblem), trying every way to split it.
+
+    :param parts: The parts: kana (a string), a run of Kanji (the most kana it can be read as), or a single
+                  known Kanji (a set of its spellings).
+    :param reading: The reading.
+    :param position: Where in the reading to start.
+    :param part: Which part to start with.
+    :return: Boolean Flag (True = The reading fits).
+    """
+    if part == len(parts):
+        return position == len(reading)
+    current = parts[part]
+    if type(current) == str:
+        return reading.startswith(current, position) and fits(parts, reading, position + len(current), part + 1)
+    if type(current) == int:
+        return any(fits(parts, reading, end, part + 1) for end in range(position + 1, min(position + current, len(reading)) + 1))
+    return any(reading.startswith(s, position) and fits(parts, reading, position + len(s), part + 1) for s in current)
+
+def readingProblem(spelling, reading):
+    """
+    This function is used to check whether a reading can belong to a word
+    written with Kanji.
+
+    :param spelling: How the word is written (i.e. 食べる).
+    :param reading: Its reading (i.e. たべる).
+    :return: What's wrong (None if the reading is plausible).
+    """
+    shape = []
+    known = []
+    for (n, run) in enumerate(KANJI_RUN.split(spelling)):
+        if n % 2:
+            shape.append(MAX_KANA_PER_KANJI * len(run))
+            if known is not None:
+                for ch in run:
+                    found = spellings.get(ch)
+                    if found is None:
+                        found = spellings[ch] = spellingsOf(ch)
+                    if not found:
+                        known = None
+                        break
+                    known.append(found)
+        elif run:
+            run = romaji.toHiragana(run)
+            shape.append(run)
+            if known is not None:
+                known.append(run)
+
+    reading = romaji.toHiragana(reading)
+    if not fits(shape, reading):
+        return "the reading {} doesn't fit {}".format(reading, spelling)
+    if known is not None and not fits(known, reading):
+        return "the reading {} doesn't fit the known readings of {} (an irregular reading?)".format(reading, spelling)
+    return None
+
+def cardKey(kind, fields):
+    """
+    This function is used to build the key two copies of a card share.
+
+    :param kind: The kind of the deck.
+    :param fields: The card's fields.
+    :return: The key.
+    """
+    if kind in ("kana", "kanji"):
+        return fields[0]
+    return "\x1f".join([fields[0].lower(), romaji.toHiragana(fields[1]), fields[3] or ""])
+
+def checkKana(fields):
+    """
+    This function is used to check a kana card (question, romaji).
+
+    :param fields: The card's fields.
+    :return: A list of (severity, check, message).
+    """
+    (question, answer) = fields[:2]
+    problems = []
+    if not romaji.isKana(question):
+        problems.append((ERROR, "script", "{} isn't kana".format(question)))
+    elif romaji.key(question) != romaji.key(answer):
+        problems.append((ERROR, "romaji", "{} is read {}, not {}".format(question, romaji.toRomaji(question), answer)))
+    return problems
+
+def checkKanji(fields):
+    """
+    This function is used to check a Kanji card (kanji, hiragana, alternates, meaning).
+
+    :param fields: The card's fields.
+    :return: A list of (severity, check, message).
+    """
+    import grading
+
+    (kanji, reading, alternates, meaning) = fields[:4]
+    problems = []
+    if NOT_KANJI.search(kanji):
+        problems.append((ERROR, "script", "{} isn't a Kanji ({})".format(kanji, scripts.name(scripts.classify(kanji)))))
+    for text in [reading] + grading.alternatesOf(alternates):
+        if not scripts.isScript(text, scripts.HIRAGANA):
+            problems.append((ERROR, "script", "the reading {} isn't hiragana".format(text)))
+        elif len(text) > MAX_KANA_PER_KANJI * len(kanji) + 3:
+            problems.append((WARNING, "reading", "the reading {} is too long for {}".format(text, kanji)))
+    if meaning is None or JAPANESE.search(meaning):
+        problems.append((ERROR, "script", "the meaning {} isn't English".format(meaning)))
+    return problems
+
+def checkVocab(fields):
+    """
+    This function is used to check a vocab card (question, kana, alternates, kanji, context).
+
+    :param fields: The card's fields.
+    :return: A list of (severity, check, message).
+    """
+    import grading
+
+    (question, answer, alternates, kanji) = fields[:4]
+    alternates = grading.alternatesOf(alternates)
+    problems = []
+    if JAPANESE.search(question):
+        problems.append((ERROR, "script", "the question {} isn't English".format(question)))
+    if hasKanji(answer):
+        problems.append((ERROR, "script", "the answer {} should be kana, not Kanji".format(answer)))
+    elif not (HIRAGANA.search(answer) or KATAKANA.search(answer) or "ー" in answer):
+        problems.append((ERROR, "script", "the answer {} has no kana".format(answer)))
+
+    if kanji is not None:
+        if not hasKanji(kanji):
+            problems.append((ERROR, "script", "the Kanji {} has no Kanji".format(kanji)))
+        elif LATIN.search(kanji) and not LATIN.search(answer):
+            problems.append((ERROR, "script", "the Kanji {} has romaji in it".format(kanji)))
+        elif not hasKanji(answer):
+            problem = readingProblem(kanji, answer)
+            if problem is not None:
+                problems.append((WARNING, "reading", problem))
+
+    keys = None
+    for alternate in alternates:
+        latin = LETTER.search(alternate) is not None
+        if alternate == answer:
+            problems.append((WARNING, "alternate", "the alternate {} is the answer".format(alternate)))
+        elif latin and hasKanji(alternate):
+            problems.append((ERROR, "script", "the alternate {} mixes romaji and Japanese".format(alternate)))
+        elif latin and romaji.isKana(answer) and scripts.isScript(alternate, scripts.LATIN):
+            # Romaji can only be checked against answers written in kana alone (the letters in Ｔシャツ are spelled out).
+            if keys is None:
+                keys = {romaji.key(text) for text in [answer] + alternates if romaji.isKana(text)}
+            if romaji.key(alternate) in keys:
+                continue
+            problems.append((WARNING, "romaji", "the alternate {} doesn't spell {}".format(alternate, answer)))
+        elif hasKanji(alternate) and kanji is None:
+            problems.append((WARNING, "alternate", "the Kanji alternate {} should be the card's Kanji".format(alternate)))
+    return problems
+
+CHECKS = {"kana": checkKana, "kanji": checkKanji, "vocab": checkVocab}
+
+def lintChunk(path, name, kind, start, stop):
+    """
+    This function is used to check a chunk of a deck (in a worker).
+
+    :param path: The path of the deck file.
+    :param name: The name of the deck.
+    :param kind: The kind of the deck.
+    :param start: The index of the first card.
+    :param stop: The index after the last card.
+    :return: (problems, hashes, masks): a list of Problem, (hash, card) pairs, and the cards of kana decks by script.
+    """
+    deck = registry.openDeckFile(path).deck(name)
+    check = CHECKS[kind]
+    problems = []
+    hashes = []
+    masks = collections.defaultdict(list)
+    for i in range(start, stop):
+        fields = deck.fields(i) + (None,) * 4
+        if not fields[0] or not fields[1]:
+            problems.append(Problem(name, i, ERROR, "missing", "a card needs a question and an answer"))
+            continue
+        for (severity, kindOfCheck, message) in check(fields):
+            problems.append(Problem(name, i, severity, kindOfCheck, message))
+        hashes.append((hashlib.blake2b(cardKey(kind, fields).encode("utf-8"), digest_size=8).digest(), i))
+        if kind == "kana":
+            masks[scripts.classify(fields[0])].append(i)
+    return (problems, hashes, dict(masks))
+
+def lint(names=None, workers=None, chunkSize=CHUNK_SIZE):
+    """
+    This function is used to check decks.
+
+    :param names: The names of the decks to check (None checks every deck).
+    :param workers: How many worker processes to use (0 checks in this process, None uses every CPU).
+    :param chunkSize: How many cards each worker checks at a time.
+    :return: A list of Problem, sorted by deck and card.
+    """
+    infos = registry.decks()       # Compiles decks.bin (if it's out of date) before any worker opens it.
+    setReadings(knownReadings(infos))
+    if names:
+        infos = [registry.find(name) for name in names]
+
+    chunks = [(info.path, info.name, info.kind, start, min(start + chunkSize, info.size))
+              for info in infos for start in range(0, info.size, chunkSize)]
+    if workers == 0 or len(chunks) <= 1:
+        results = [lintChunk(*chunk) for chunk in chunks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                                    initializer=setReadings, initargs=(readings,)) as pool:
+            results = list(pool.map(lintChunk, *zip(*chunks)))
+
+    problems = []
+    seen = {}
+    masks = collections.defaultdict(lambda: collections.defaultdict(list))
+    for (chunk, (found, hashes, chunkMasks)) in zip(chunks, results):
+        name = chunk[1]
+        problems.extend(found)
+        for (digest, i) in hashes:
+            first = seen.setdefault(digest, (name, i))
+            if first == (name, i):
+                continue
+            if first[0] == name:
+                problems.append(Problem(name, i, ERROR, "duplicate", "the same card as #{}".format(first[1])))
+            else:
+                problems.append(Problem(name, i, WARNING, "duplicate", "the same card as {} #{}".format(*first)))
+        for (mask, cards) in chunkMasks.items():
+            masks[name][mask].extend(cards)
+
+    # A kana deck is written in the script most of its cards are in.
+    for (name, byMask) in masks.items():
+        main = max(byMask, key=lambda mask: len(byMask[mask]))
+        for (mask, cards) in byMask.items():
+            if mask != main and mask & scripts.KANA:
+                for i in cards:
+                    problems.append(Problem(name, i, ERROR, "script", "the card is {}, the deck is {}".format(
+                        scripts.name(mask), scripts.name(main))))
+
+    problems.sort(key=lambda problem: (problem.deck, problem.card, problem.check))
+    return problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check decks for mistakes")
+    parser.add_argument("decks", nargs="*", help="the decks to check (every deck by default)")
+    parser.add_argument("--workers", type=int, help="how many processes check cards (0 checks in this process)")
+    parser.add_argument("--errors", action="store_true", help="only show errors, not warnings")
+    args = parser.parse_args()
+
+    problems = lint(args.decks, args.workers)
+    errors = 0
+    for problem in problems:
+        errors += problem.severity == ERROR
+        if problem.severity == ERROR or not args.errors:
+            fields = registry.openDeckFile(registry.find(problem.deck).path).deck(problem.deck).fields(problem.card)
+            print("{}#{} {}: [{}] {}  {}".format(problem.deck, problem.card, problem.severity, problem.check,
+                                                 problem.message, fields))
+    print("[!] {} errors, {} warnings.".format(errors, len(problems) - errors))
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,274 @@
+"""
+desc: Timing histograms. How long a learner takes to answer is the best sign of how well they know a card, so every
+        prompt is timed (with a monotonic clock) from the moment it's asked to the moment it's answered, and the
+        time goes into a histogram for its card and one for its deck. Grading and rendering are timed the same
+        way, to show where a session's time goes.
+
+        The histograms are HDR style: every power of two is split into SUB_BUCKETS/2 linear buckets, so any time
+        from a microsecond to hours is kept within about 3% with a few hundred counters, and recording a time
+        is a couple of integer operations. They're exported in the Prometheus text format (or as JSON).
+
+        Recording is a no-op while enabled is False.
+"""
+
+import json
+import os
+import time
+
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS     # Times under this many microseconds get a bucket each.
+HALF = SUB_BUCKETS // 2
+
+enabled = True
+clock = time.perf_counter_ns    # Every timing starts with a reading of this clock.
+histograms = {}                 # (name, labels): Histogram or Family.
+
+def bucketOf(value):
+    """
+    This function is used to find the bucket a value is counted in.
+
+    :param value: The value (a whole number of microseconds).
+    :return: The index of the bucket.
+    """
+    if value < SUB_BUCKETS:
+        return max(value, 0)
+    shift = value.bit_length() - SUB_BITS
+    return shift * HALF + (value >> shift)
+
+def bucketBounds(index):
+    """
+    This function is used to find the values a bucket holds.
+
+    :param index: The index of the bucket.
+    :return: (the lowest value, the lowest value of the next bucket).
+    """
+    if index < SUB_BUCKETS:
+        return (index, index + 1)
+    shift = index // HALF - 1
+    low = (index % HALF + HALF) << shift
+    return (low, low + (1 << shift))
+
+class Histogram:
+    """
+    Used to count values (microseconds) in log-linear buckets.
+    """
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        """
+        This function is used to create an empty Histogram object.
+
+        :param self: The object.
+        """
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        """
+        This function is used to count a value.
+
+        :param self: The histogram.
+        :param value: The value (a whole number of microseconds).
+        :return: None
+        """
+        if value < SUB_BUCKETS:
+            i = max(value, 0)
+        else:
+            shift = value.bit_length() - SUB_BITS
+            i = shift * HALF + (value >> shift)
+        counts = self.counts
+        if i >= len(counts):
+            counts.extend([0] * (i + 1 - len(counts)))
+        counts[i] += 1
+        if not self.count:
+            self.min = self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other):
+        """
+        This function is used to add another histogram's counts to this one.
+
+        :param self: The histogram.
+        :param other: The other histogram.
+        :return: None
+        """
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for (i, n) in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """
+        This function is used to estimate a percentile.
+
+        :param self: The histogram.
+        :param p: The percentile (0 - 100).
+        :return: The value (the middle of its bucket, None if nothing was counted).
+        """
+        if not self.count:
+            return None
+        rank = max(1, round(p / 100 * self.count))
+        seen = 0
+        for (i, n) in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                (low, high) = bucketBounds(i)
+                return min(max((low + high - 1) // 2, self.min), self.max)
+        return self.max
+
+    def buckets(self):
+        """
+        This function is used to list the buckets that aren't empty.
+
+        :param self: The histogram.
+        :return: A list of (the lowest value of the next bucket, count) pairs.
+        """
+        return [(bucketBounds(i)[1], n) for (i, n) in enumerate(self.counts) if n]
+
+class Family(dict):
+    """
+    Used to keep a histogram for every value of a label (i.e. one for every
+    card of a deck), made the first time it's looked up.
+    """
+    __slots__ = ("label",)
+
+    def __init__(self, label):
+        """
+        This function is used to create an empty Family object.
+
+        :param self: The object.
+        :param label: The name of the label the histograms are kept by.
+        """
+        super().__init__()
+        self.label = label
+
+    def __missing__(self, value):
+        found = self[value] = Histogram()
+        return found
+
+def histogram(name, **labels):
+    """
+    This function is used to get a histogram (it's made the first time).
+
+    :param name: The name of the metric (i.e. quiz_prompt_seconds).
+    :param labels: What the histogram is for (i.e. deck="hiragana").
+    :return: The Histogram.
+    """
+    key = (name, tuple(sorted(labels.items())))
+    found = histograms.get(key)
+    if found is None:
+        found = histograms[key] = Histogram()
+    return found
+
+def family(name, label, **labels):
+    """
+    This function is used to get a family of histograms (it's made the
+    first time).
+
+    :param name: The name of the metric (i.e. quiz_card_prompt_seconds).
+    :param label: The label the histograms are kept by (i.e. card).
+    :param labels: What the family is for (i.e. deck="hiragana").
+    :return: The Family, a dict of Histogram by the value of the label.
+    """
+    key = (name, tuple(sorted(labels.items())))
+    found = histograms.get(key)
+    if found is None:
+        found = histograms[key] = Family(label)
+    return found
+
+def series():
+    """
+    This function is used to list every histogram that isn't empty.
+
+    :return: A sorted list of (name, labels, Histogram), with the histograms of a family each on their own.
+    """
+    found = []
+    for ((name, labels), h) in histograms.items():
+        if isinstance(h, Family):
+            found.extend((name, labels + ((h.label, value),), member) for (value, member) in h.items() if member.count)
+        elif h.count:
+            found.append((name, labels, h))
+    found.sort(key=lambda entry: (entry[0], entry[1]))
+    return found
+
+def since(target, start):
+    """
+    This function is used to record the time since a clock reading.
+
+    :param target: The Histogram.
+    :param start: The clock() reading the timing started at.
+    :return: The time in microseconds.
+    """
+    elapsed = (clock() - start) // 1000
+    if enabled:
+        target.record(elapsed)
+    return elapsed
+
+def labelText(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for (k, v) in pairs) + "}"
+
+def prometheus():
+    """
+    This function is used to export every histogram in the Prometheus
+    text format (times in seconds, only the buckets that aren't empty).
+
+    :return: The text.
+    """
+    lines = []
+    named = None
+    for (name, labels, found) in series():
+        if name != named:
+            lines.append("# TYPE {} histogram".format(name))
+            named = name
+        seen = 0
+        for (upper, n) in found.buckets():
+            seen += n
+            lines.append("{}_bucket{} {}".format(name, labelText(labels, [("le", upper / 1e6)]), seen))
+        lines.append("{}_bucket{} {}".format(name, labelText(labels, [("le", "+Inf")]), found.count))
+        lines.append("{}_sum{} {}".format(name, labelText(labels), found.total / 1e6))
+        lines.append("{}_count{} {}".format(name, labelText(labels), found.count))
+    return "\n".join(lines) + "\n"
+
+def summary():
+    """
+    This function is used to export every histogram as a JSON friendly
+    list (times in seconds).
+
+    :return: A list of dicts.
+    """
+    return [{"name": name, "labels": dict(labels), "count": h.count, "sum": h.total / 1e6, "min": h.min / 1e6,
+             "max": h.max / 1e6, "p50": h.percentile(50) / 1e6, "p90": h.percentile(90) / 1e6,
+             "p99": h.percentile(99) / 1e6, "buckets": [[upper / 1e6, n] for (upper, n) in h.buckets()]}
+            for (name, labels, h) in series()]
+
+def export(path):
+    """
+    This function is used to write every histogram to a file (JSON if
+    the path ends in .json, the Prometheus text format otherwise).
+
+    :param path: The path of the file.
+    :return: None
+    """
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump(summary(), f, ensure_ascii=False, indent=1)
+        else:
+            f.write(prometheus())
+    os.replace(path + ".tmp", path)
@@ -0,0 +1,89 @@
+"""
+desc: The deck registry. It lists every deck the quiz can open, the compiled ones in decks.bin and the ones
+        imported into decks/, with each deck's name, kind, title, and size. All of that is read from the deck
+        files' directories, so no card is decoded. The quiz menus are built from the registry, so a new deck
+        shows up in them without any code changes.
+
+        Deck files are opened once and shared by every deck in them.
+"""
+
+import collections
+import os
+
+import deckfile
+
+# What the menus need to know about a deck. The path is the deck file it lives in.
+DeckInfo = collections.namedtuple("DeckInfo", ["name", "kind", "title", "size", "path"])
+
+entries = None          # Every DeckInfo, by name (in menu order), read the first time it's needed.
+deckFiles = {}          # Deck files opened so far, by path.
+
+def openDeckFile(path):
+    """
+    This function is used to open a deck file (or get the one that's
+    already open). decks.bin is recompiled first if it's out of date.
+
+    :param path: The path of the deck file.
+    :return: The DeckFile object.
+    """
+    deckFile = deckFiles.get(path)
+    if deckFile is None:
+        if path == deckfile.DEFAULT_PATH:
+            deckFile = deckfile.openDeckFile()
+        else:
+            deckFile = deckfile.DeckFile(path)
+        deckFiles[path] = deckFile
+    return deckFile
+
+def scan():
+    """
+    This function is used to read the directory of every deck file.
+
+    :return: A dict of DeckInfo, by name.
+    """
+    found = {}
+    paths = [deckfile.DEFAULT_PATH] + [deckfile.importedPath(name) for name in deckfile.importedDecks()]
+    for path in paths:
+        for deck in openDeckFile(path).decks():
+            # A compiled deck can't be replaced by an imported deck with the same name.
+            if deck.name not in found:
+                found[deck.name] = DeckInfo(deck.name, deck.kind, deck.title, len(deck), path)
+    return found
+
+def decks():
+    """
+    This function is used to list every deck.
+
+    :return: A list of DeckInfo (the compiled decks, then the imported ones).
+    """
+    global entries
+    if entries is None:
+        entries = scan()
+    return list(entries.values())
+
+def decksOfKind(kind):
+    """
+    This function is used to list every deck of a kind.
+
+    :param kind: kana, kanji, or vocab.
+    :return: A list of DeckInfo.
+    """
+    return [info for info in decks() if info.kind == kind]
+
+def find(name):
+    """
+    This function is used to look up a single deck. Decks imported since
+    the registry was read are found too.
+
+    :param name: The name of the deck.
+    :return: The DeckInfo.
+    """
+    global entries
+    decks()
+    if name not in entries and os.path.exists(deckfile.importedPath(name)):
+        entries = scan()
+    return entries[name]
+
+if __name__ == "__main__":
+    for info in decks():
+        print("{:<16} {:<6} {:>6} cards  {}".format(info.name, info.kind, info.size, info.title))
@@ -0,0 +1,301 @@
+"""
+desc: Shows quiz sessions without colors and without blocking. A renderer collects everything a session shows (the
+        prompts, the answers, how each answer was graded, and the score) into a buffer that's written out in one
+        go, either as plain text or as JSON lines. The terminal quiz uses a PlainRenderer with --plain, which
+        only writes when it's waiting for an answer, so a slow SSH link gets one write per prompt.
+
+        replaySession runs a session to the end from answers that are already known instead of asking for
+        them, which is how whole sessions are played from an answer file:
+            python3 japanese_quiz.py --play sessions.jsonl --format json
+        Each line of a .jsonl answer file is a session: {"deck": "hiragana", "answers": ["a", "ka"], "seed": 1}
+        ("keyboard", "fuzzy", and "choices" can be given too). Any other file is a single session (--deck) with
+        one answer per line.
+"""
+
+import io
+import json
+import random
+import sys
+
+import fuzzy
+import grading
+import metrics
+import reviewlog
+import romaji
+
+FLUSH_SIZE = 1 << 16    # Buffered output is written once it's grown to about this many characters.
+ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+# The verdicts feedback starts with.
+CORRECT = "そのとおりです。"
+ALMOST = "Almost! :/"
+INCORRECT = "Incorrect! :("
+VERDICTS = (CORRECT, ALMOST, INCORRECT)
+
+def feedback(element, prompt, result):
+    """
+    This function is used to tell the learner how their answer was graded.
+    Every renderer (the terminal's too) shows these lines, the first of
+    which is the verdict (see VERDICTS).
+
+    :param element: The card.
+    :param prompt: The prompt that was answered.
+    :param result: The Result.
+    :return: A list of lines.
+    """
+    if result.almost is not None and result.points == result.maxPoints:
+        text = element.question if prompt.direction == grading.REVERSE else element.meaning
+        return [ALMOST, "Watch your spelling, it's {}!".format(fuzzy.spellingOf(text, result.almost))]
+
+    if prompt.direction == reviewlog.READING_AND_MEANING:
+        if result.points == result.maxPoints:
+            return [CORRECT]
+        if result.points:
+            if result.wrong == element.hiragana:
+                return [ALMOST, "You got the ひらがな wrong!", "{} was the correct answer!".format(element.hiragana)]
+            return [ALMOST, "You got the meaning wrong!", "{} was the correct answer!".format(element.meaning)]
+        return [INCORRECT, "The correct ひらがな is {}".format(element.hiragana), "This Kanji means {}".format(element.meaning)]
+    if prompt.direction == grading.KANJI:
+        if result.points:
+            return [CORRECT]
+        return [INCORRECT, "The correct answer was {}".format(element.kanji),
+                "The ひらがな for this Kanji is {}!".format(element.hiragana)]
+
+    if result.points:
+        # A vocab word answered in kana is shown with its Kanji.
+        if (prompt.direction == grading.FORWARD and prompt.labels != [""] and element.kanji is not None
+                and romaji.isKana(result.answers[0])):
+            return [CORRECT, "The Kanji (漢字) for this word is {}".format(element.kanji)]
+        return [CORRECT]
+
+    if prompt.direction == grading.REVERSE:
+        return [INCORRECT, "The correct answer was {}".format(element.question)]
+    lines = [INCORRECT]
+    if romaji.isKana(element.correctAnswer):
+        lines.append("The correct answer was {} ({})".format(element.correctAnswer, romaji.toRomaji(element.correctAnswer)))
+    else:
+        lines.append("The correct answer was {}".format(element.correctAnswer))
+    alternates = grading.alternatesOf(element.alternateAnswers)
+    if len(alternates) > 1:
+        lines.append("{} were also accepted answers!".format(", ".join(alternates)))
+    elif alternates:
+        lines.append("{} was also an accepted answer!".format(alternates[0]))
+    return lines
+
+class PlainRenderer:
+    """
+    Used to show sessions as plain text (no colors), buffered.
+    """
+    def __init__(self, stream=None):
+        """
+        This function is used to create a PlainRenderer object.
+
+        :param self: The object.
+        :param stream: Where the output is written (defaults to stdout).
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer = []
+        self.size = 0
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        This function is used to write out everything buffered so far.
+
+        :param self: The renderer.
+        :return: None
+        """
+        if self.buffer:
+            self.stream.write("".join(self.buffer))
+            self.buffer.clear()
+            self.size = 0
+        self.stream.flush()
+
+    def ask(self, label):
+        """
+        This function is used to ask the learner for an answer (the buffer
+        is written out first).
+
+        :param self: The renderer.
+        :param label: What the answer is for.
+        :return: What the learner typed.
+        """
+        self.flush()
+        return input(label + ": ")
+
+    def start(self, quiz):
+        self.write("\n{}\n".format(quiz.deck.title))
+
+    def prompt(self, prompt):
+        if prompt.choices:
+            self.write("\n" + prompt.text + "\n" + "".join("\t{} {}\n".format(n + 1, c) for (n, c) in enumerate(prompt.choices)))
+        elif prompt.labels == [""]:
+            self.write("\n" + prompt.text)
+        else:
+            self.write("\n" + prompt.text + "\n")
+
+    def answered(self, label, answer):
+        self.write("{}: {}\n".format(label, answer))
+
+    def result(self, element, prompt, result):
+        self.write("\n".join(feedback(element, prompt, result)) + "\n")
+
+    def score(self, score, maxScore):
+        self.write("[!] {}/ {} 正解しました。\n".format(score, maxScore))
+
+    def stopped(self, quiz):
+        self.write("\n[!] The answers ran out ({}/ {} so far).\n".format(quiz.score, quiz.maxScore))
+
+class JsonRenderer(PlainRenderer):
+    """
+    Used to show sessions as JSON lines (buffered): a line when a session
+    starts, one for every answered prompt, and one for every score.
+    """
+    def __init__(self, stream=None):
+        """
+        This function is used to create a JsonRenderer object.
+
+        :param self: The object.
+        :param stream: Where the output is written (defaults to stdout).
+        """
+        super().__init__(stream)
+        self.answers = []
+
+    def event(self, fields):
+        self.write(ENCODER.encode(fields) + "\n")
+
+    def start(self, quiz):
+        self.event({"type": "session", "deck": quiz.deck.name, "session": quiz.id})
+
+    def prompt(self, prompt):
+        pass
+
+    def answered(self, label, answer):
+        self.answers.append(answer)
+
+    def result(self, element, prompt, result):
+        self.event({"type": "answer", "card": prompt.card, "direction": prompt.direction, "text": prompt.text,
+                    "choices": prompt.choices, "answers": self.answers, "points": result.points,
+                    "maxPoints": result.maxPoints, "feedback": feedback(element, prompt, result)})
+        self.answers = []
+
+    def score(self, score, maxScore):
+        self.event({"type": "score", "score": score, "maxScore": maxScore})
+
+    def stopped(self, quiz):
+        self.event({"type": "stopped", "score": quiz.score, "maxScore": quiz.maxScore})
+
+RENDERERS = {"plain": PlainRenderer, "json": JsonRenderer}
+
+def playSession(quiz, renderer, answer, saved=None):
+    """
+    This function is used to run a session with a renderer. The kana
+    quizzes show the score after the first pass, then keep drilling the
+    missed cards. How long the renderer takes is timed (see metrics.py).
+
+    :param quiz: The QuizSession.
+    :param renderer: The renderer.
+    :param answer: Called with a prompt's label to get the answer (None stops the session).
+    :param saved: Called with the session after every answer (i.e. to save it).
+    :return: Whether the session was finished.
+    """
+    scored = quiz.deck.kind == "kana" and quiz.firstPassDone and quiz.prompt is None
+    rendering = metrics.histogram("quiz_render_seconds", renderer=type(renderer).__name__)
+    while True:
+        prompt = quiz.nextPrompt()
+        if prompt is None:
+            break
+
+        start = metrics.clock()
+        renderer.prompt(prompt)
+        drawn = metrics.clock() - start
+        answers = []
+        for label in prompt.labels:
+            given = answer(label)
+            if given is None:
+                return False
+            answers.append(given)
+
+        result = quiz.submit(*answers)
+        start = metrics.clock()
+        renderer.result(quiz.deck[prompt.card], prompt, result)
+        metrics.since(rendering, start - drawn)    # Showing the prompt and its result, timed as one.
+        if saved is not None:
+            saved(quiz)
+
+        if quiz.deck.kind == "kana" and not scored and quiz.firstPassDone:
+            renderer.score(quiz.score, quiz.maxScore)
+            scored = True
+
+    if not scored:
+        renderer.score(quiz.score, quiz.maxScore)
+    return True
+
+def replaySession(quiz, answers, renderer):
+    """
+    This function is used to run a session from a list of answers without
+    asking for anything. The session stops early if the answers run out.
+
+    :param quiz: The QuizSession.
+    :param answers: The answers, one for every label of every prompt, in order.
+    :param renderer: The renderer.
+    :return: Whether the session was finished.
+    """
+    remaining = iter(answers)
+
+    def answer(label):
+        given = next(remaining, None)
+        if given is not None:
+            renderer.answered(label, given)
+        return given
+
+    renderer.start(quiz)
+    finished = playSession(quiz, renderer, answer)
+    if not finished:
+        renderer.stopped(quiz)
+    return finished
+
+def readSessions(path, deckName=None):
+    """
+    This function is used to read an answer file.
+
+    :param path: The path of the file (.jsonl, or one answer per line).
+    :param deckName: The deck of a file with one answer per line.
+    :return: A generator of session dicts (deck, answers, and optionally seed, keyboard, fuzzy, choices).
+    """
+    with io.open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            if deckName is None:
+                raise ValueError("a deck is needed to play {}".format(path))
+            yield {"deck": deckName, "answers": f.read().splitlines()}
+
+def playFile(path, openDeck, renderer, deckName=None):
+    """
+    This function is used to play every session in an answer file.
+
+    :param path: The path of the answer file.
+    :param openDeck: Called with a deck's name to open it.
+    :param renderer: The renderer.
+    :param deckName: The deck of a file with one answer per line.
+    :return: (the number of sessions, how many of them were finished).
+    """
+    import session
+
+    played = 0
+    finished = 0
+    for entry in readSessions(path, deckName):
+        quiz = session.QuizSession(openDeck(entry["deck"]), entry.get("keyboard", True), rng=random.Random(entry.get("seed", 0)),
+                                   fuzzy=entry.get("fuzzy", False), choices=entry.get("choices", 0))
+        played += 1
+        finished += replaySession(quiz, entry["answers"], renderer)
+    renderer.flush()
+    return (played, finished)
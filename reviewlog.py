@@ -0,0 +1,258 @@
+"""
+desc: Keeps a log of every graded answer in a local SQLite database (reviews.db). Answers are handed to a writer
+        thread which commits them in batches (group commits) with the database in WAL mode, so logging an answer
+        is just putting it on a queue and never holds up the next prompt. Readers use their own connection and
+        aren't blocked by the writer.
+
+        The log is indexed for the questions everything else asks of it: the history of a single card, the
+        totals of a single session, and a learner's history of a deck (which the scheduler is rebuilt from).
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(HERE, "reviews.db")
+POLL_INTERVAL = 0.5         # How often (in seconds) a flush checks that the writer thread is still running.
+
+# Direction logged for a Kanji prompt that asks for both the hiragana and the meaning (worth 2 points).
+READING_AND_MEANING = "reading+meaning"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    user TEXT NOT NULL,
+    deck TEXT NOT NULL,
+    card INTEGER NOT NULL,
+    direction TEXT NOT NULL,
+    response TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    maxPoints INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviewsByCard ON reviews (deck, card, timestamp);
+CREATE INDEX IF NOT EXISTS reviewsBySession ON reviews (session);
+CREATE INDEX IF NOT EXISTS reviewsByUser ON reviews (user, deck, timestamp);
+"""
+
+INSERT = """INSERT INTO reviews (session, user, deck, card, direction, response, points, maxPoints, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+def newSession():
+    """
+    This function is used to make a new session id.
+
+    :return: The session id.
+    """
+    return uuid.uuid4().hex
+
+def connect(path):
+    """
+    This function is used to open the database in WAL mode and make sure
+    the table and indices exist.
+
+    :param path: The path of the database.
+    :return: The sqlite3 connection.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+class ReviewLog:
+    """
+    Used to log graded answers.
+    """
+    def __init__(self, path=DEFAULT_PATH, batchSize=512, flushInterval=0.25):
+        """
+        This function is used to open the log and start its writer thread.
+
+        :param self: The object.
+        :param path: The path of the database.
+        :param batchSize: The most answers written in a single commit.
+        :param flushInterval: The longest an answer waits (in seconds) before it's committed.
+        """
+        self.path = path
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        self.pending = queue.Queue()
+        self.reader = None
+        self.reading = threading.Lock()     # Queries can come from more than one thread (i.e. the server's executor).
+        self.closed = False
+        self.error = None       # What stopped the writer thread (None while it's running).
+
+        connect(path).close()   # Create the database before anyone reads it.
+        self.writer = threading.Thread(target=self.write, name="ReviewLog", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def record(self, deck, card, direction, response, points, maxPoints=1, session="", user="", timestamp=None):
+        """
+        This function is used to log a single graded answer. It returns
+        right away, the answer is committed by the writer thread.
+
+        :param self: The log.
+        :param deck: The name of the deck.
+        :param card: The index of the card in the deck.
+        :param direction: The direction the card was asked in (see grading.py).
+        :param response: The user's response.
+        :param points: The points the answer earned.
+        :param maxPoints: The points the answer could have earned.
+        :param session: The id of the quiz session.
+        :param user: The user that answered.
+        :param timestamp: When the answer was given (defaults to now).
+        :return: None
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.pending.put((session, user, deck, card, direction, response, points, maxPoints, timestamp))
+
+    def write(self):
+        """
+        This function is the writer thread. It waits for an answer, gathers
+        everything else that arrives within the flush interval (up to a
+        batch), and commits the batch in a single transaction. If writing
+        fails the thread stops and the error is raised by the next flush.
+
+        :param self: The log.
+        :return: None
+        """
+        try:
+            self.writeBatches()
+        except Exception as error:
+            self.error = error
+
+    def writeBatches(self):
+        """
+        This function is used to write batches until the log is closed (see write).
+
+        :param self: The log.
+        :return: None
+        """
+        connection = connect(self.path)
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            waiters = []
+            deadline = time.monotonic() + self.flushInterval
+            # Someone waiting on a flush (or close) doesn't wait out the rest of the interval.
+            while len(batch) < self.batchSize and isinstance(batch[-1], tuple):
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self.pending.get(timeout=timeout) if timeout > 0 else self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = []
+            for item in batch:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    rows.append(item)
+
+            if rows:
+                with connection:
+                    connection.executemany(INSERT, rows)
+            for waiter in waiters:
+                waiter.set()
+        connection.close()
+
+    def flush(self):
+        """
+        This function is used to wait until every answer logged so far
+        has been committed.
+
+        :param self: The log.
+        :return: None
+        """
+        if self.closed:
+            return
+        done = threading.Event()
+        self.pending.put(done)
+        while not done.wait(POLL_INTERVAL):
+            if not self.writer.is_alive():
+                break
+        if not done.is_set():
+            raise self.error or RuntimeError("the review log writer stopped")
+
+    def close(self):
+        """
+        This function is used to commit everything that's still queued and
+        stop the writer thread.
+
+        :param self: The log.
+        :return: None
+        """
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            self.pending.put(None)
+            self.writer.join()
+            with self.reading:
+                if self.reader is not None:
+                    self.reader.close()
+                    self.reader = None
+
+    def query(self, sql, parameters=()):
+        """
+        This function is used to run a query on the reader connection. Queued
+        answers are committed first so they show up in the results.
+
+        :param self: The log.
+        :param sql: The query.
+        :param parameters: The parameters of the query.
+        :return: A list of rows.
+        """
+        self.flush()
+        with self.reading:
+            if self.reader is None:
+                self.reader = connect(self.path)
+            return self.reader.execute(sql, parameters).fetchall()
+
+    def cardHistory(self, deck, card):
+        """
+        This function is used to get every answer given for a card (oldest first).
+
+        :param self: The log.
+        :param deck: The name of the deck.
+        :param card: The index of the card in the deck.
+        :return: A list of (timestamp, direction, response, points, maxPoints, session, user) rows.
+        """
+        return self.query("""SELECT timestamp, direction, response, points, maxPoints, session, user FROM reviews
+                             WHERE deck = ? AND card = ? ORDER BY timestamp""", (deck, card))
+
+    def deckHistory(self, deck, user=""):
+        """
+        This function is used to get every answer a learner gave in a deck (oldest first).
+
+        :param self: The log.
+        :param deck: The name of the deck.
+        :param user: The learner.
+        :return: A list of (card, points, maxPoints, timestamp) rows.
+        """
+        return self.query("""SELECT card, points, maxPoints, timestamp FROM reviews
+                             WHERE user = ? AND deck = ? ORDER BY timestamp, id""", (user, deck))
+
+    def sessionTotals(self, session):
+        """
+        This function is used to total up a session.
+
+        :param self: The log.
+        :param session: The id of the session.
+        :return: (answers, points, maxPoints)
+        """
+        (answers, points, maxPoints) = self.query("""SELECT COUNT(*), COALESCE(SUM(points), 0), COALESCE(SUM(maxPoints), 0)
+                                                     FROM reviews WHERE session = ?""", (session,))[0]
+        return (answers, points, maxPoints)
@@ -0,0 +1,326 @@
+"""
+desc: Converts between romaji and kana so an answer can be typed in any valid romaji spelling. Romaji is
+        converted to Hiragana by walking a trie and always taking the longest match, which handles Hepburn,
+        Kunrei-shiki and Nihon-shiki spellings (shi/si, chi/ti, tsu/tu, fu/hu, ja/zya/jya, ...), sokuon (kitte,
+        matcha), ん (kon'ya, konnichiha, onna) and the small kana typed on a Japanese keyboard (xtsu, lya, ...).
+        Kana is converted back to Hepburn with the same kind of trie.
+
+        Two spellings are the same answer when their keys match. A key is the Hepburn romaji of the answer with
+        long vowels folded (aa, ā, ou, oo, ō, ei, ... are all written as the vowel followed by "-"), so "kouen",
+        "kooen" and "kōen" all match こうえん. Hepburn reads some kana the same (お/を, じ/ぢ, ず/づ), so when
+        the kana itself is the question its spelling is compared instead: the kana the romaji is typed as.
+"""
+
+import re
+
+import scripts
+
+VOWELS = "aeiou"
+SOKUON_CONSONANTS = "bcdfghjkmpqrstvwxz"
+
+# Hiragana to Hepburn romaji. Extended kana use the spellings typed on a Japanese keyboard
+# (thi, dhi, twu, ...) so converting them back to kana gives the same kana.
+KANA_TO_ROMAJI = {
+    "あ": "a", "い": "i", "う": "u", "え": "e", "お": "o",
+    "か": "ka", "き": "ki", "く": "ku", "け": "ke", "こ": "ko",
+    "が": "ga", "ぎ": "gi", "ぐ": "gu", "げ": "ge", "ご": "go",
+    "さ": "sa", "し": "shi", "す": "su", "せ": "se", "そ": "so",
+    "ざ": "za", "じ": "ji", "ず": "zu", "ぜ": "ze", "ぞ": "zo",
+    "た": "ta", "ち": "chi", "つ": "tsu", "て": "te", "と": "to",
+    "だ": "da", "ぢ": "ji", "づ": "zu", "で": "de", "ど": "do",
+    "な": "na", "に": "ni", "ぬ": "nu", "ね": "ne", "の": "no",
+    "は": "ha", "ひ": "hi", "ふ": "fu", "へ": "he", "ほ": "ho",
+    "ば": "ba", "び": "bi", "ぶ": "bu", "べ": "be", "ぼ": "bo",
+    "ぱ": "pa", "ぴ": "pi", "ぷ": "pu", "ぺ": "pe", "ぽ": "po",
+    "ま": "ma", "み": "mi", "む": "mu", "め": "me", "も": "mo",
+    "や": "ya", "ゆ": "yu", "よ": "yo",
+    "ら": "ra", "り": "ri", "る": "ru", "れ": "re", "ろ": "ro",
+    "わ": "wa", "ゐ": "i", "ゑ": "e", "を": "o",
+    "ん": "n", "ゔ": "vu",
+
+    # Small kana on their own.
+    "ぁ": "xa", "ぃ": "xi", "ぅ": "xu", "ぇ": "xe", "ぉ": "xo",
+    "ゃ": "xya", "ゅ": "xyu", "ょ": "xyo", "ゎ": "xwa", "っ": "xtsu",
+
+    # Combos
+    "きゃ": "kya", "きゅ": "kyu", "きょ": "kyo", "ぎゃ": "gya", "ぎゅ": "gyu", "ぎょ": "gyo",
+    "しゃ": "sha", "しゅ": "shu", "しょ": "sho", "じゃ": "ja", "じゅ": "ju", "じょ": "jo",
+    "ちゃ": "cha", "ちゅ": "chu", "ちょ": "cho", "ぢゃ": "ja", "ぢゅ": "ju", "ぢょ": "jo",
+    "にゃ": "nya", "にゅ": "nyu", "にょ": "nyo", "ひゃ": "hya", "ひゅ": "hyu", "ひょ": "hyo",
+    "びゃ": "bya", "びゅ": "byu", "びょ": "byo", "ぴゃ": "pya", "ぴゅ": "pyu", "ぴょ": "pyo",
+    "みゃ": "mya", "みゅ": "myu", "みょ": "myo", "りゃ": "rya", "りゅ": "ryu", "りょ": "ryo",
+
+    # Extended combos (mostly used in Katakana words).
+    "しぇ": "she", "じぇ": "je", "ちぇ": "che", "いぇ": "ye",
+    "ふぁ": "fa", "ふぃ": "fi", "ふぇ": "fe", "ふぉ": "fo", "ふゅ": "fyu",
+    "うぃ": "wi", "うぇ": "we", "うぉ": "who",
+    "ゔぁ": "va", "ゔぃ": "vi", "ゔぇ": "ve", "ゔぉ": "vo",
+    "てぃ": "thi", "でぃ": "dhi", "てゅ": "thu", "でゅ": "dhu", "とぅ": "twu", "どぅ": "dwu",
+    "つぁ": "tsa", "つぃ": "tsi", "つぇ": "tse", "つぉ": "tso",
+}
+
+# Romaji to Hiragana. Every Hepburn spelling above plus the Kunrei-shiki and Nihon-shiki spellings
+# and the small kana shortcuts typed on a Japanese keyboard.
+ROMAJI_TO_KANA = { romaji: kana for (kana, romaji) in KANA_TO_ROMAJI.items() }
+ROMAJI_TO_KANA.update({
+    "i": "い", "e": "え", "o": "お", "ji": "じ", "zu": "ず", "ja": "じゃ", "ju": "じゅ", "jo": "じょ",
+    "si": "し", "zi": "じ", "ti": "ち", "tu": "つ", "di": "ぢ", "du": "づ", "hu": "ふ", "wo": "を",
+    "sya": "しゃ", "syu": "しゅ", "syo": "しょ", "sye": "しぇ",
+    "zya": "じゃ", "zyu": "じゅ", "zyo": "じょ", "jya": "じゃ", "jyu": "じゅ", "jyo": "じょ",
+    "tya": "ちゃ", "tyu": "ちゅ", "tyo": "ちょ", "cya": "ちゃ", "cyu": "ちゅ", "cyo": "ちょ",
+    "dya": "ぢゃ", "dyu": "ぢゅ", "dyo": "ぢょ", "tye": "ちぇ", "zye": "じぇ", "jye": "じぇ",
+    "wu": "う", "whi": "うぃ", "whe": "うぇ", "vu": "ゔ",
+    "la": "ぁ", "li": "ぃ", "lu": "ぅ", "le": "ぇ", "lo": "ぉ",
+    "lya": "ゃ", "lyu": "ゅ", "lyo": "ょ", "lwa": "ゎ",
+    "xtu": "っ", "ltu": "っ", "ltsu": "っ", "xn": "ん", "-": "ー",
+})
+
+# Vowels with macrons (and circumflexes) are typed out in full before converting.
+MACRONS = str.maketrans({ "ā": "aa", "ī": "ii", "ū": "uu", "ē": "ee", "ō": "ou",
+                          "â": "aa", "î": "ii", "û": "uu", "ê": "ee", "ô": "ou" })
+
+# Katakana to Hiragana (ー has no Hiragana so it's left alone).
+KATAKANA_TO_HIRAGANA = { cp: cp - 0x60 for cp in range(0x30A1, 0x30F7) }
+KATAKANA_TO_HIRAGANA.update({ 0x30FD: 0x309D, 0x30FE: 0x309E })
+
+LONG_VOWEL = re.compile("aa|ii|uu|ee|ei|oo|ou")
+IGNORED = str.maketrans("", "", " '　")
+
+def buildTrie(table):
+    """
+    This function is used to build a trie from a conversion table. Each
+    node is a dict of characters, and the converted text of a complete
+    match is stored under the "" key.
+
+    :param table: A dict of text to its conversion.
+    :return: The root node of the trie.
+    """
+    root = {}
+    for (text, converted) in table.items():
+        node = root
+        for ch in text:
+            node = node.setdefault(ch, {})
+        node[""] = converted
+    return root
+
+ROMAJI_TRIE = buildTrie(ROMAJI_TO_KANA)
+KANA_TRIE = buildTrie(KANA_TO_ROMAJI)
+
+def longestMatch(trie, text, i):
+    """
+    This function is used to find the longest entry of a trie that starts
+    at text[i].
+
+    :param trie: The root node of the trie.
+    :param text: The text being converted.
+    :param i: Where the match starts.
+    :return: (converted text, index after the match) or None if nothing matched.
+    """
+    node = trie
+    match = None
+    n = len(text)
+    while i < n:
+        node = node.get(text[i])
+        if node is None:
+            break
+        i += 1
+        if "" in node:
+            match = (node[""], i)
+    return match
+
+def toHiragana(kana):
+    """
+    This function is used to convert Katakana into Hiragana.
+
+    :param kana: The kana.
+    :return: The kana with all Katakana written in Hiragana.
+    """
+    return kana.translate(KATAKANA_TO_HIRAGANA)
+
+def isKana(text):
+    """
+    This function is used to determine whether a string is written only in
+    kana (Hiragana, Katakana, or both).
+
+    :param text: The string.
+    :return: Boolean Flag (True = Only kana).
+    """
+    return text != "" and all(scripts.maskOf(ch) & scripts.KANA for ch in text)
+
+def toKana(romaji):
+    """
+    This function is used to convert romaji into Hiragana. Anything that
+    isn't romaji is copied as is.
+
+    :param romaji: The romaji.
+    :return: The Hiragana.
+    """
+    text = romaji.lower().translate(MACRONS)
+    n = len(text)
+    kana = []
+    i = 0
+    while i < n:
+        ch = text[i]
+        nxt = text[i + 1] if i + 1 < n else ""
+
+        if ch == "n" and (nxt == "" or nxt not in VOWELS + "y"):
+            # ん: "n'", "nn" (unless the second n starts the next syllable, as in onna) or n before a consonant.
+            kana.append("ん")
+            if nxt == "'" or (nxt == "n" and not (i + 2 < n and text[i + 2] in VOWELS + "y")):
+                i += 2
+            else:
+                i += 1
+            continue
+
+        if (ch == nxt and ch in SOKUON_CONSONANTS) or text.startswith("tch", i):
+            kana.append("っ")
+            i += 1
+            continue
+
+        match = longestMatch(ROMAJI_TRIE, text, i)
+        if match is None:
+            kana.append(ch)
+            i += 1
+        else:
+            kana.append(match[0])
+            i = match[1]
+    return "".join(kana)
+
+def toRomaji(kana, apostrophe=False):
+    """
+    This function is used to convert kana into Hepburn romaji. Anything
+    that isn't kana is copied as is.
+
+    :param kana: The kana (Hiragana and/or Katakana).
+    :param apostrophe: Whether to write ん as "n'" before a vowel or y (kin'youbi).
+    :return: The romaji.
+    """
+    text = toHiragana(kana)
+    n = len(text)
+    romaji = []
+    sokuon = False
+    i = 0
+    while i < n:
+        ch = text[i]
+        if ch == "っ" and i + 1 < n and text[i + 1] != "っ":
+            sokuon = True
+            i += 1
+            continue
+
+        if ch == "ー":
+            last = romaji[-1][-1] if romaji else ""
+            romaji.append(last if last in VOWELS else "-")
+            i += 1
+            continue
+
+        match = longestMatch(KANA_TRIE, text, i)
+        if match is None:
+            syllable, i = ch.lower(), i + 1
+        else:
+            syllable, i = match
+
+        if sokuon:
+            sokuon = False
+            if syllable.startswith("ch"):
+                syllable = "t" + syllable
+            elif syllable[0] in SOKUON_CONSONANTS:
+                syllable = syllable[0] + syllable
+            else:
+                romaji.append("xtsu")
+
+        if apostrophe and romaji and romaji[-1] == "n" and syllable[0] in VOWELS + "y":
+            romaji.append("'")
+        romaji.append(syllable)
+    return "".join(romaji)
+
+def foldLongVowels(romaji):
+    """
+    This function is used to write every long vowel the same way
+    (the vowel followed by "-").
+
+    :param romaji: The romaji.
+    :return: The romaji with long vowels folded.
+    """
+    return LONG_VOWEL.sub(lambda m: m.group(0)[0] + "-", romaji)
+
+def key(answer):
+    """
+    This function is used to build the key two spellings of the same answer
+    share. Kana is read as is and anything else is read as romaji.
+
+    :param answer: The answer (kana or romaji).
+    :return: The key.
+    """
+    answer = answer.lower().translate(IGNORED)
+    kana = answer if isKana(answer) else toKana(answer)
+    return foldLongVowels(toRomaji(kana))
+
+def spelling(answer):
+    """
+    This function is used to find the exact kana an answer spells, for a
+    kana card (so "wo" is を and not お, and "di" is ぢ and not じ).
+
+    :param answer: The answer (kana or romaji).
+    :return: The kana, in Hiragana.
+    """
+    answer = answer.lower().translate(IGNORED)
+    return toHiragana(answer if isKana(answer) else toKana(answer))
+
+def isReading(response, kana):
+    """
+    This function is used to determine whether a response is a valid
+    spelling of a kana answer.
+
+    :param response: The user's response (romaji or kana).
+    :param kana: The kana answer.
+    :return: Boolean Flag (True = Same reading).
+    """
+    return key(response) == key(kana)
+
+def benchmark(rounds=20):
+    """
+    This function is used to measure how fast every answer in the decks can
+    be converted. Each kana answer is converted to romaji, the romaji is
+    converted back to kana, and a key is built for both.
+
+    :param rounds: How many times to convert the decks.
+    :return: None
+    """
+    import time
+    import japanese_questions
+
+    answers = []
+    for (_, _, _, cards) in japanese_questions.DECKS:
+        for card in cards:
+            for field in card[:2]:
+                if isKana(field):
+                    answers.append(field)
+    spellings = [toRomaji(a) for a in answers]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for a in answers:
+            toRomaji(a)
+    toRomajiTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for r in spellings:
+            toKana(r)
+    toKanaTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for (a, r) in zip(answers, spellings):
+            key(a)
+            key(r)
+    keyTime = time.perf_counter() - start
+
+    count = len(answers) * rounds
+    print("{} kana answers x {} rounds".format(len(answers), rounds))
+    print("toRomaji: {:>10,.0f} answers/s".format(count / toRomajiTime))
+    print("toKana:   {:>10,.0f} answers/s".format(count / toKanaTime))
+    print("key:      {:>10,.0f} answers/s".format(2 * count / keyTime))
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,149 @@
+"""
+desc: Weighted random sampling in O(1). AliasTable is Vose's version of Walker's alias method: after an O(n) build
+        every sample costs one random index and one coin flip.
+
+        WeightedBag holds items whose weights change while they're being sampled (i.e. how often a card was
+        missed). Weights are small integers, and items with the same weight share a bucket. The alias table is
+        only built over the buckets, so changing a weight moves one item between buckets in O(1) and the table
+        that has to be rebuilt is never bigger than the largest weight, no matter how many items there are.
+"""
+
+import random
+
+class AliasTable:
+    """
+    Used to sample indices in proportion to their weights.
+    """
+    def __init__(self, weights):
+        """
+        This function is used to build the alias table (Vose's method).
+
+        :param self: The object.
+        :param weights: A list of non-negative weights (at least one has to be positive).
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("at least one weight has to be positive")
+
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # Anything left over is (up to rounding errors) exactly 1. Empty weights
+        # can only be left over through rounding, so they always take their alias.
+        positive = next(i for i in range(n) if weights[i] > 0)
+        for i in small + large:
+            if weights[i] > 0:
+                self.prob[i] = 1.0
+            else:
+                self.alias[i] = positive
+
+    def sample(self, rng=random):
+        """
+        This function is used to draw a single index.
+
+        :param self: The alias table.
+        :param rng: The random number generator.
+        :return: The index.
+        """
+        i = int(rng.random() * len(self.prob))
+        if rng.random() < self.prob[i]:
+            return i
+        return self.alias[i]
+
+class WeightedBag:
+    """
+    Used to sample items by integer weights that change over time.
+    """
+    def __init__(self, maxWeight=8, rng=random):
+        """
+        This function is used to create an empty WeightedBag object.
+
+        :param self: The object.
+        :param maxWeight: Weights are capped to 1 - maxWeight.
+        :param rng: The random number generator.
+        """
+        self.maxWeight = maxWeight
+        self.rng = rng
+        self.buckets = [[] for _ in range(maxWeight + 1)]
+        self.weights = {}
+        self.positions = {}
+        self.table = None       # Rebuilt the next time a sample is drawn after a change.
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __contains__(self, item):
+        return item in self.weights
+
+    def weight(self, item):
+        return self.weights[item]
+
+    def add(self, item, weight=1):
+        """
+        This function is used to add an item (or change its weight).
+
+        :param self: The bag.
+        :param item: The item.
+        :param weight: The weight of the item (capped to 1 - maxWeight).
+        :return: None
+        """
+        weight = min(max(int(weight), 1), self.maxWeight)
+        if item in self.weights:
+            if self.weights[item] == weight:
+                return
+            self.remove(item)
+
+        bucket = self.buckets[weight]
+        self.positions[item] = len(bucket)
+        bucket.append(item)
+        self.weights[item] = weight
+        self.table = None
+
+    setWeight = add
+
+    def remove(self, item):
+        """
+        This function is used to take an item out of the bag. The last item
+        of its bucket is swapped into its place so nothing is shifted.
+
+        :param self: The bag.
+        :param item: The item.
+        :return: None
+        """
+        bucket = self.buckets[self.weights.pop(item)]
+        i = self.positions.pop(item)
+        last = bucket.pop()
+        if last != item:
+            bucket[i] = last
+            self.positions[last] = i
+        self.table = None
+
+    def sample(self):
+        """
+        This function is used to draw an item in proportion to its weight.
+
+        :param self: The bag.
+        :return: The item (None if the bag is empty).
+        """
+        if not self.weights:
+            return None
+        if self.table is None:
+            self.table = AliasTable([w * len(bucket) for (w, bucket) in enumerate(self.buckets)])
+
+        bucket = self.buckets[self.table.sample(self.rng)]
+        return bucket[int(self.rng.random() * len(bucket))]
@@ -0,0 +1,236 @@
+"""
+desc: A spaced repetition scheduler based on SM-2. Every card keeps a stability (its current interval in days)
+        and a difficulty (the SM-2 ease factor). Cards waiting to be asked sit in a heap keyed on the time
+        they're due, so picking the next card is O(log n) no matter how many cards (or learners) are being
+        scheduled. Card ids can be anything hashable, i.e. a deck index or (user, deck, index).
+
+        Rescheduling a card doesn't search the heap. The new due time is pushed and the old entry is
+        skipped when it reaches the top (every entry carries the sequence number it was pushed with).
+
+        The state of every card is rebuilt from the review log (replay), so a learner's cards are due when
+        their past answers say they are, in every quiz.
+"""
+
+import heapq
+import itertools
+import time
+
+DAY = 86400.0
+LEARNING_STEP = 60.0        # Seconds before a missed card is due again.
+LEARN_AHEAD = 20 * 60.0     # Cards due within this many seconds can be asked early.
+
+# The SM-2 quality of an answer (0 - 5). Anything below 3 is a lapse.
+WRONG = 1
+HALF_CORRECT = 3
+CORRECT = 4
+
+def qualityOf(points, maxPoints):
+    """
+    This function is used to turn the points an answer earned into the
+    quality of the answer.
+
+    :param points: The points the answer earned.
+    :param maxPoints: The points it could have earned.
+    :return: CORRECT, HALF_CORRECT, or WRONG.
+    """
+    if points >= maxPoints:
+        return CORRECT
+    return HALF_CORRECT if points else WRONG
+
+class CardState:
+    """
+    Used to hold the scheduling state of a card.
+    """
+    __slots__ = ("stability", "difficulty", "due", "reps", "lapses", "seq")
+
+    def __init__(self, due):
+        """
+        This function is used to create the state of a new card.
+
+        :param self: The object.
+        :param due: When the card is first due (seconds since the epoch).
+        """
+        self.stability = 0.0        # The current interval in days (0 until the card is first remembered).
+        self.difficulty = 2.5       # The SM-2 ease factor.
+        self.due = due
+        self.reps = 0               # Correct answers in a row.
+        self.lapses = 0             # How many times the card has been forgotten.
+        self.seq = None             # The sequence number of the card's heap entry (None if not queued).
+
+class Scheduler:
+    """
+    Used to schedule cards and serve them in the order they're due.
+    """
+    def __init__(self):
+        """
+        This function is used to create an empty Scheduler object.
+
+        :param self: The object.
+        """
+        self.cards = {}
+        self.heap = []
+        self.counter = itertools.count()
+        self.queued = 0
+
+    def __len__(self):
+        return self.queued
+
+    def __contains__(self, cardId):
+        return cardId in self.cards
+
+    def state(self, cardId):
+        return self.cards[cardId]
+
+    def push(self, cardId, state):
+        """
+        This function is used to (re)queue a card at its due time.
+
+        :param self: The scheduler.
+        :param cardId: The id of the card.
+        :param state: The card's state.
+        :return: None
+        """
+        if state.seq is None:
+            self.queued += 1
+        state.seq = next(self.counter)
+        heapq.heappush(self.heap, (state.due, state.seq, cardId))
+
+    def add(self, cardId, due=None):
+        """
+        This function is used to add a new card. Cards that are already
+        scheduled are left alone.
+
+        :param self: The scheduler.
+        :param cardId: The id of the card.
+        :param due: When the card is due (defaults to now).
+        :return: The card's state.
+        """
+        if cardId not in self.cards:
+            state = CardState(time.time() if due is None else due)
+            self.cards[cardId] = state
+            self.push(cardId, state)
+        return self.cards[cardId]
+
+    def pop(self, now=None, ahead=LEARN_AHEAD):
+        """
+        This function is used to take the card that's due first out of
+        the queue. The card keeps its state and goes back into the queue
+        when it's reviewed.
+
+        :param self: The scheduler.
+        :param now: The current time (defaults to now).
+        :param ahead: How many seconds early a card can be taken.
+        :return: The id of the card (None if no card is due).
+        """
+        if now is None:
+            now = time.time()
+
+        heap = self.heap
+        while heap:
+            (due, seq, cardId) = heap[0]
+            state = self.cards.get(cardId)
+            if state is None or state.seq != seq:
+                heapq.heappop(heap)     # Stale entry, the card was rescheduled or removed.
+                continue
+            if due > now + ahead:
+                return None
+            heapq.heappop(heap)
+            state.seq = None
+            self.queued -= 1
+            return cardId
+        return None
+
+    def review(self, cardId, quality, now=None, requeue=True):
+        """
+        This function is used to update a card after it's been answered
+        (SM-2). A lapse sends the card back a learning step, otherwise its
+        interval grows by its ease factor.
+
+        :param self: The scheduler.
+        :param cardId: The id of the card.
+        :param quality: The quality of the answer (WRONG, HALF_CORRECT, CORRECT, or 0 - 5).
+        :param now: The current time (defaults to now).
+        :param requeue: Whether the card goes back into the queue at its new due time.
+        :return: The card's state.
+        """
+        if now is None:
+            now = time.time()
+        state = self.add(cardId, now)
+
+        if quality < 3:
+            state.reps = 0
+            state.lapses += 1
+            state.stability = 0.0
+            state.due = now + LEARNING_STEP
+        else:
+            state.reps += 1
+            if state.reps == 1:
+                state.stability = 1.0
+            elif state.reps == 2:
+                state.stability = 6.0
+            else:
+                state.stability *= state.difficulty
+            state.due = now + state.stability * DAY
+
+        state.difficulty = max(1.3, state.difficulty + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        if requeue:
+            self.push(cardId, state)
+        elif state.seq is not None:
+            state.seq = None
+            self.queued -= 1
+        return state
+
+    def replay(self, reviews):
+        """
+        This function is used to rebuild the state of cards from the answers
+        given for them (oldest first). The cards aren't queued.
+
+        :param self: The scheduler.
+        :param reviews: An iterable of (card id, quality, timestamp).
+        :return: None
+        """
+        for (cardId, quality, timestamp) in reviews:
+            self.review(cardId, quality, timestamp, requeue=False)
+
+    def load(self, cardId, stability, difficulty, reps, lapses):
+        """
+        This function is used to put back the saved state of a card (its
+        due time is left alone, and it isn't queued if it wasn't already).
+
+        :param self: The scheduler.
+        :param cardId: The id of the card.
+        :param stability: The card's interval in days.
+        :param difficulty: The card's ease factor.
+        :param reps: The card's correct answers in a row.
+        :param lapses: How many times the card has been forgotten.
+        :return: The card's state.
+        """
+        state = self.cards.get(cardId)
+        if state is None:
+            state = self.cards[cardId] = CardState(time.time())
+        (state.stability, state.difficulty, state.reps, state.lapses) = (stability, difficulty, reps, lapses)
+        return state
+
+    def queuedCards(self):
+        """
+        This function is used to list the queued cards in the order they're due.
+
+        :param self: The scheduler.
+        :return: A list of card ids.
+        """
+        queued = [(state.due, state.seq, cardId) for (cardId, state) in self.cards.items() if state.seq is not None]
+        queued.sort()
+        return [cardId for (_, _, cardId) in queued]
+
+    def remove(self, cardId):
+        """
+        This function is used to forget a card.
+
+        :param self: The scheduler.
+        :param cardId: The id of the card.
+        :return: None
+        """
+        state = self.cards.pop(cardId)
+        if state.seq is not None:
+            self.queued -= 1
@@ -0,0 +1,144 @@
+"""
+desc: Classifies strings by the writing script they're written in (Hiragana, Katakana, Kanji, or Latin) using
+        Unicode code point ranges. Every character in the Basic Multilingual Plane is looked up in a table that's
+        built once when the module is imported.
+
+        Each character maps to a mask of the scripts it can belong to. Characters that belong to every script
+        (spaces, Japanese punctuation) map to ANY and the prolonged sound mark ー maps to KANA since it's used in
+        both Hiragana and Katakana words. A string's script is the bitwise AND of the masks of its characters,
+        so a string mixing two scripts (or containing a character outside of all four) is MIXED.
+"""
+
+HIRAGANA = 0x01
+KATAKANA = 0x02
+KANJI = 0x04
+LATIN = 0x08
+KANA = HIRAGANA | KATAKANA
+ANY = HIRAGANA | KATAKANA | KANJI | LATIN
+MIXED = 0
+
+NAMES = { HIRAGANA: "hiragana", KATAKANA: "katakana", KANJI: "kanji", LATIN: "latin", KANA: "kana", ANY: "any", MIXED: "mixed" }
+
+# Kanji outside of the Basic Multilingual Plane (CJK Unified Ideographs Extension B and above).
+ASTRAL_KANJI = (0x20000, 0x323AF)
+
+# (first, last, mask) ranges of code points. Later ranges override earlier ones.
+RANGES = [
+    (0x0000, 0x0000, ANY),          # NUL, used to pad strings in classifyMany.
+    (0x0009, 0x000D, ANY),          # Tabs and newlines.
+    (0x0020, 0x0020, ANY),          # Space.
+    (0x0021, 0x007E, LATIN),        # ASCII letters, digits and punctuation.
+    (0x00C0, 0x024F, LATIN),        # Latin-1 Supplement and Latin Extended-A/B (ō, é, ...).
+    (0x1E00, 0x1EFF, LATIN),        # Latin Extended Additional.
+    (0x3000, 0x303F, ANY),          # CJK punctuation (、。「」 and the ideographic space).
+    (0x3005, 0x3007, KANJI),        # 々, 〆 and 〇.
+    (0x3041, 0x309F, HIRAGANA),     # Hiragana including small kana, ゐ/ゑ, ゔ and ゝ/ゞ.
+    (0x309B, 0x309C, KANA),         # Standalone dakuten and handakuten.
+    (0x30A0, 0x30FF, KATAKANA),     # Katakana including small kana, ヰ/ヱ, ヴ and ヽ/ヾ.
+    (0x30FB, 0x30FB, ANY),          # The middle dot ・.
+    (0x30FC, 0x30FC, KANA),         # The prolonged sound mark ー.
+    (0x31F0, 0x31FF, KATAKANA),     # Katakana Phonetic Extensions.
+    (0x3400, 0x4DBF, KANJI),        # CJK Unified Ideographs Extension A.
+    (0x4E00, 0x9FFF, KANJI),        # CJK Unified Ideographs.
+    (0xF900, 0xFAFF, KANJI),        # CJK Compatibility Ideographs.
+    (0xFF01, 0xFF5E, LATIN),        # Full-width ASCII (Ｔ, ＡＢＣ, １２３).
+    (0xFF61, 0xFF64, ANY),          # Half-width punctuation.
+    (0xFF65, 0xFF65, ANY),          # Half-width middle dot.
+    (0xFF66, 0xFF9F, KATAKANA),     # Half-width Katakana.
+    (0xFF70, 0xFF70, KANA),         # Half-width prolonged sound mark.
+]
+
+def buildTable():
+    """
+    This function is used to build the lookup table for every character
+    in the Basic Multilingual Plane.
+
+    :return: A bytearray of 0x10000 masks (unknown characters are MIXED).
+    """
+    table = bytearray(0x10000)
+    for (first, last, mask) in RANGES:
+        table[first:last + 1] = bytes([mask]) * (last - first + 1)
+    return table
+
+TABLE = buildTable()
+
+def maskOf(ch):
+    """
+    This function is used to look up the mask of a single character.
+
+    :param ch: The character.
+    :return: The mask of the scripts the character belongs to.
+    """
+    cp = ord(ch)
+    if cp < 0x10000:
+        return TABLE[cp]
+    if ASTRAL_KANJI[0] <= cp <= ASTRAL_KANJI[1]:
+        return KANJI
+    return MIXED
+
+def classify(text):
+    """
+    This function is used to determine which script a string is written in.
+
+    :param text: The string.
+    :return: A mask (HIRAGANA, KATAKANA, KANJI, LATIN, KANA, ANY for empty strings, or MIXED).
+    """
+    mask = ANY
+    table = TABLE
+    for ch in text:
+        cp = ord(ch)
+        mask &= table[cp] if cp < 0x10000 else maskOf(ch)
+        if not mask:
+            break
+    return mask
+
+def isScript(text, script):
+    """
+    This function is used to determine whether every character of a string
+    can be written in the given script.
+
+    :param text: The string.
+    :param script: The script (HIRAGANA, KATAKANA, KANJI, or LATIN).
+    :return: Boolean Flag (True = Written in the script).
+    """
+    return bool(classify(text) & script)
+
+def name(mask):
+    """
+    This function is used to get a printable name for a mask.
+
+    :param mask: The mask returned by classify or classifyMany.
+    :return: The name of the script.
+    """
+    return NAMES.get(mask, "mixed")
+
+def classifyMany(strings, chunkSize=65536):
+    """
+    This function is used to classify a whole array of strings at once with
+    NumPy. The strings are viewed as UTF-32 code points, looked up in the same
+    table used by classify, and reduced along each row. This is used for deck
+    validation and analytics, NumPy is only needed when it's called.
+
+    :param strings: A sequence (or NumPy array) of strings.
+    :param chunkSize: How many strings to classify at a time (bounds the memory used).
+    :return: A NumPy uint8 array with the mask of each string.
+    """
+    import numpy as np
+
+    table = np.frombuffer(bytes(TABLE), dtype=np.uint8)
+    strings = np.asarray(strings, dtype=str)
+    result = np.empty(len(strings), dtype=np.uint8)
+
+    for start in range(0, len(strings), chunkSize):
+        chunk = np.ascontiguousarray(strings[start:start + chunkSize])
+        width = chunk.dtype.itemsize // 4
+        codes = chunk.view(np.uint32).reshape(len(chunk), width)
+
+        masks = table[np.minimum(codes, 0xFFFF)]
+        astral = codes >= 0x10000
+        if astral.any():
+            kanji = (codes >= ASTRAL_KANJI[0]) & (codes <= ASTRAL_KANJI[1])
+            masks = np.where(astral, np.where(kanji, KANJI, MIXED), masks).astype(np.uint8)
+
+        result[start:start + len(chunk)] = np.bitwise_and.reduce(masks, axis=1)
+    return result
@@ -0,0 +1,273 @@
+"""
+desc: Searches every deck at once (i.e. "which decks have 聞く" or "every card meaning To Go"). The index is an
+        inverted index over every card: Japanese text is indexed by character unigrams and bigrams (with Katakana
+        folded into Hiragana), and English (and romaji) by word. A query only has to intersect a couple of
+        posting sets and check the few cards left, so it takes about a millisecond no matter how many decks
+        there are.
+
+        Japanese queries match anywhere in a field (or only at the start with prefix=True). English queries
+        match whole words, with the last word matched as a prefix so results show up while typing. Romaji
+        queries are also looked up as kana.
+
+        Decks are indexed card by card, so updating a deck that changed only touches the cards that changed.
+"""
+
+import argparse
+import bisect
+import re
+import time
+
+import romaji
+import scripts
+
+WORD = re.compile(r"[a-z0-9']+")
+
+def fold(text):
+    """
+    This function is used to put text into the form it's indexed in
+    (lowercase, with Katakana written in Hiragana).
+
+    :param text: The text.
+    :return: The folded text.
+    """
+    return romaji.toHiragana(text.lower())
+
+def textsOf(fields):
+    """
+    This function is used to get every piece of text on a card.
+
+    :param fields: The card's fields (see deckfile.py).
+    :return: A tuple of folded strings.
+    """
+    texts = []
+    for field in fields:
+        if field is None:
+            continue
+        for text in field if type(field) == list else [field]:
+            texts.extend(fold(t) for t in text.split("/"))
+    return tuple(texts)
+
+def gramsOf(text):
+    """
+    This function is used to get the unigrams and bigrams of the Japanese
+    characters in some text.
+
+    :param text: The folded text.
+    :return: A set of n-grams.
+    """
+    grams = set()
+    for run in re.split(r"[\x00-\x7f]+", text):
+        grams.update(run)
+        grams.update(run[i:i + 2] for i in range(len(run) - 1))
+    return grams
+
+class SearchIndex:
+    """
+    Used to search the cards of many decks.
+    """
+    def __init__(self):
+        """
+        This function is used to create an empty SearchIndex object.
+
+        :param self: The object.
+        """
+        self.grams = {}         # n-gram: set of card ids.
+        self.words = {}         # English (or romaji) word: set of card ids.
+        self.cards = {}         # card id (deck name, index): (fields, texts).
+        self.deckSizes = {}     # deck name: number of cards indexed.
+        self.vocabulary = None  # The words, sorted for prefix queries (rebuilt after new words are added).
+
+    def __len__(self):
+        return len(self.cards)
+
+    def addCard(self, cardId, fields):
+        """
+        This function is used to index a single card.
+
+        :param self: The index.
+        :param cardId: The card's id, (deck name, index).
+        :param fields: The card's fields.
+        :return: None
+        """
+        texts = textsOf(fields)
+        self.cards[cardId] = (fields, texts)
+        for text in texts:
+            for gram in gramsOf(text):
+                self.grams.setdefault(gram, set()).add(cardId)
+            for word in WORD.findall(text):
+                if word not in self.words:
+                    self.words[word] = set()
+                    self.vocabulary = None
+                self.words[word].add(cardId)
+
+    def removeCard(self, cardId):
+        """
+        This function is used to take a single card out of the index.
+
+        :param self: The index.
+        :param cardId: The card's id.
+        :return: None
+        """
+        (_, texts) = self.cards.pop(cardId)
+        for text in texts:
+            for (postings, keys) in ((self.grams, gramsOf(text)), (self.words, WORD.findall(text))):
+                for key in keys:
+                    cards = postings.get(key)
+                    if cards is not None:
+                        cards.discard(cardId)
+                        if not cards:
+                            del postings[key]
+                            if postings is self.words:
+                                self.vocabulary = None
+
+    def updateDeck(self, deck):
+        """
+        This function is used to (re)index a deck. Only the cards that were
+        added, changed, or removed since it was last indexed are touched.
+
+        :param self: The index.
+        :param deck: The deck.
+        :return: How many cards were (re)indexed or removed.
+        """
+        changed = 0
+        for i in range(len(deck)):
+            cardId = (deck.name, i)
+            fields = deck.fields(i)
+            indexed = self.cards.get(cardId)
+            if indexed is not None:
+                if indexed[0] == fields:
+                    continue
+                self.removeCard(cardId)
+            self.addCard(cardId, fields)
+            changed += 1
+        for i in range(len(deck), self.deckSizes.get(deck.name, 0)):
+            self.removeCard((deck.name, i))
+            changed += 1
+        self.deckSizes[deck.name] = len(deck)
+        return changed
+
+    def removeDeck(self, name):
+        """
+        This function is used to take a whole deck out of the index.
+
+        :param self: The index.
+        :param name: The name of the deck.
+        :return: None
+        """
+        for i in range(self.deckSizes.pop(name, 0)):
+            self.removeCard((name, i))
+
+    def wordsStartingWith(self, prefix):
+        """
+        This function is used to find every indexed word starting with a prefix.
+
+        :param self: The index.
+        :param prefix: The prefix.
+        :return: A list of words.
+        """
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.words)
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff")
+        return self.vocabulary[start:end]
+
+    def candidates(self, query):
+        """
+        This function is used to find the cards that could match a query
+        from the postings alone.
+
+        :param self: The index.
+        :param query: The folded query.
+        :return: A set of card ids (None if the query has nothing to look up).
+        """
+        postings = []
+        grams = {run[i:i + 2] for run in re.split(r"[\x00-\x7f]+", query) for i in range(len(run) - 1)}
+        if not grams:
+            grams = gramsOf(query)
+        for gram in grams:
+            postings.append(self.grams.get(gram, set()))
+
+        words = WORD.findall(query)
+        if words:
+            last = words.pop() if not query.endswith(" ") else None
+            for word in words:
+                postings.append(self.words.get(word, set()))
+            if last is not None:
+                matches = set()
+                for word in self.wordsStartingWith(last):
+                    matches |= self.words[word]
+                postings.append(matches)
+
+        if not postings:
+            return None
+        postings.sort(key=len)
+        found = set(postings[0])
+        for cards in postings[1:]:
+            found &= cards
+            if not found:
+                break
+        return found
+
+    def search(self, query, prefix=False, limit=None):
+        """
+        This function is used to find every card with some text.
+
+        :param self: The index.
+        :param query: The text (Japanese, English, or romaji).
+        :param prefix: Whether the text has to be at the start of a field.
+        :param limit: The most cards to return.
+        :return: A sorted list of card ids, (deck name, index).
+        """
+        queries = [fold(query).strip()]
+        if scripts.isScript(queries[0].replace(" ", ""), scripts.LATIN):
+            kana = romaji.toKana(queries[0])
+            if romaji.isKana(kana):
+                queries.append(kana)
+
+        found = set()
+        for q in queries:
+            candidates = self.candidates(q)
+            if not candidates:
+                continue
+            for cardId in candidates:
+                texts = self.cards[cardId][1]
+                if any(t.startswith(q) if prefix else q in t for t in texts):
+                    found.add(cardId)
+        found = sorted(found)
+        return found[:limit] if limit else found
+
+    def fields(self, cardId):
+        return self.cards[cardId][0]
+
+def buildIndex():
+    """
+    This function is used to index every deck (the compiled ones and the
+    imported ones).
+
+    :return: The SearchIndex.
+    """
+    import japanese_quiz
+
+    index = SearchIndex()
+    for deck in japanese_quiz.listDecks():
+        index.updateDeck(deck)
+    return index
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search every deck")
+    parser.add_argument("query", help="Japanese, English, or romaji")
+    parser.add_argument("--prefix", action="store_true", help="only match the start of a field")
+    parser.add_argument("--limit", type=int, default=50, help="the most cards to show")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = buildIndex()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    results = index.search(args.query, args.prefix)
+    searched = time.perf_counter() - start
+
+    for cardId in results[:args.limit]:
+        fields = [f for f in index.fields(cardId) if f is not None]
+        print("{:<16} {:>6}  {}".format(cardId[0], cardId[1], " | ".join(str(f) for f in fields)))
+    print("[!] {} cards found in {:.2f}ms ({} cards indexed in {:.2f}s).".format(len(results), searched * 1000, len(index), built))
@@ -0,0 +1,593 @@
+"""
+desc: Runs quizzes for many learners at once on a single asyncio event loop. Every learner gets a QuizSession
+        (see session.py) over a WebSocket, and a small page served over HTTP at / is enough to take a quiz in a
+        browser. Nothing here blocks: a session only holds a few indices into the shared decks, so thousands of
+        them can be open at the same time.
+
+        Every session is dropped after it's been idle for too long, and the server stops accepting new ones
+        once it's full. Each connection is answered one message at a time and every send waits for the
+        socket to drain, so a slow (or flooding) client only ever holds up itself.
+
+        The protocol is JSON text messages. The server sends {"type": "prompt", ...}, the client answers with
+        {"answers": [...]} (one per label), the server sends {"type": "result", ...} and the next prompt, and
+        finally {"type": "score", ...} before it closes the socket.
+
+        GET /metrics returns how long every prompt, grade and render has taken so far (see metrics.py).
+
+        QuizClient is a minimal WebSocket client used to test the server (python3 server.py --clients N).
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import struct
+import time
+import traceback
+import urllib.parse
+
+import deckfile
+import metrics
+import renderer
+import reviewlog
+import session
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"   # From RFC 6455, used to accept the handshake.
+MAX_MESSAGE = 64 * 1024     # The biggest message a client can send.
+MAX_HEADER = 16 * 1024      # The biggest HTTP request head a client can send.
+MAX_CHOICES = 8             # The most options a multiple choice prompt shows.
+
+# WebSocket opcodes.
+CONTINUATION = 0x0
+TEXT = 0x1
+BINARY = 0x2
+CLOSE = 0x8
+PING = 0x9
+PONG = 0xA
+
+class ConnectionClosed(Exception):
+    """
+    Raised when the other side closes the WebSocket (or breaks the protocol).
+    """
+
+class WebSocket:
+    """
+    Used to send and receive WebSocket (RFC 6455) text messages over an asyncio stream.
+    """
+    def __init__(self, reader, writer, client=False):
+        """
+        This function is used to wrap a stream that has finished the handshake.
+
+        :param self: The object.
+        :param reader: The asyncio StreamReader.
+        :param writer: The asyncio StreamWriter.
+        :param client: Whether this is the client side (clients have to mask their frames).
+        """
+        self.reader = reader
+        self.writer = writer
+        self.client = client
+        self.closed = False
+
+    async def sendFrame(self, opcode, payload):
+        """
+        This function is used to send a single (unfragmented) frame. It waits
+        until the socket has drained, so a client that doesn't read holds
+        up only its own session.
+
+        :param self: The WebSocket.
+        :param opcode: The opcode.
+        :param payload: The payload (bytes).
+        :return: None
+        """
+        n = len(payload)
+        maskBit = 0x80 if self.client else 0
+        if n < 126:
+            head = struct.pack("!BB", 0x80 | opcode, maskBit | n)
+        elif n < 0x10000:
+            head = struct.pack("!BBH", 0x80 | opcode, maskBit | 126, n)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, maskBit | 127, n)
+        if self.client:
+            mask = os.urandom(4)
+            head += mask
+            payload = unmask(payload, mask)
+        self.writer.write(head + payload)
+        await self.writer.drain()
+
+    async def send(self, message):
+        """
+        This function is used to send a message as JSON.
+
+        :param self: The WebSocket.
+        :param message: The message (anything json can dump).
+        :return: None
+        """
+        await self.sendFrame(TEXT, json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+    async def receive(self):
+        """
+        This function is used to wait for the next text message. Pings are
+        answered, and fragmented messages are put back together.
+
+        :param self: The WebSocket.
+        :return: The message (decoded from JSON).
+        """
+        parts = []
+        size = 0
+        while True:
+            (b0, b1) = await self.reader.readexactly(2)
+            opcode = b0 & 0x0F
+            n = b1 & 0x7F
+            if n == 126:
+                (n,) = struct.unpack("!H", await self.reader.readexactly(2))
+            elif n == 127:
+                (n,) = struct.unpack("!Q", await self.reader.readexactly(8))
+            size += n
+            if size > MAX_MESSAGE:
+                await self.close(1009)
+                raise ConnectionClosed("message too big")
+
+            mask = await self.reader.readexactly(4) if b1 & 0x80 else None
+            payload = await self.reader.readexactly(n)
+            if mask is not None:
+                payload = unmask(payload, mask)
+
+            if opcode == CLOSE:
+                await self.close()
+                raise ConnectionClosed("closed by peer")
+            if opcode == PING:
+                await self.sendFrame(PONG, payload)
+                continue
+            if opcode == PONG:
+                continue
+            if opcode not in (TEXT, BINARY, CONTINUATION):
+                await self.close(1002)
+                raise ConnectionClosed("bad opcode")
+
+            parts.append(payload)
+            if b0 & 0x80:
+                try:
+                    return json.loads(b"".join(parts).decode("utf-8"))
+                except ValueError:
+                    await self.close(1007)
+                    raise ConnectionClosed("bad message")
+
+    async def close(self, code=1000):
+        """
+        This function is used to send a close frame and close the socket.
+
+        :param self: The WebSocket.
+        :param code: The close status code.
+        :return: None
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.sendFrame(CLOSE, struct.pack("!H", code))
+        except (ConnectionError, RuntimeError):
+            pass
+        self.writer.close()
+
+def unmask(payload, mask):
+    """
+    This function is used to (un)mask a frame's payload (XOR with the 4 byte mask).
+
+    :param payload: The payload.
+    :param mask: The mask.
+    :return: The (un)masked payload.
+    """
+    n = len(payload)
+    key = int.from_bytes((mask * (n // 4 + 1))[:n], "big")
+    return (int.from_bytes(payload, "big") ^ key).to_bytes(n, "big")
+
+def acceptKey(key):
+    """
+    This function is used to answer a client's Sec-WebSocket-Key.
+
+    :param key: The key the client sent.
+    :return: The Sec-WebSocket-Accept value.
+    """
+    return base64.b64encode(hashlib.sha1((key + GUID).encode("ascii")).digest()).decode("ascii")
+
+async def readHead(reader):
+    """
+    This function is used to read the head of an HTTP request (or response).
+
+    :param reader: The asyncio StreamReader.
+    :return: (the first line, a dict of lowercase header names to values)
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        (name, _, value) = line.partition(":")
+        if name:
+            headers[name.strip().lower()] = value.strip()
+    return (lines[0], headers)
+
+class QuizServer:
+    """
+    Used to serve quiz sessions over HTTP and WebSockets.
+    """
+    def __init__(self, host="127.0.0.1", port=8080, maxSessions=10000, idleTimeout=300.0, log=None):
+        """
+        This function is used to create a QuizServer object.
+
+        :param self: The object.
+        :param host: The address to listen on.
+        :param port: The port to listen on (0 picks a free one).
+        :param maxSessions: The most sessions open at once (new ones are turned away with a 503).
+        :param idleTimeout: How many seconds a session can wait for an answer before it's dropped.
+        :param log: A ReviewLog to log every answer to (None to not log).
+        """
+        self.host = host
+        self.port = port
+        self.maxSessions = maxSessions
+        self.idleTimeout = idleTimeout
+        self.log = log
+        self.sessions = 0
+        self.served = 0
+        self.server = None
+
+    def deck(self, name):
+        """
+        This function is used to get a deck. Every session shares the
+        same deck object (and its cards).
+
+        :param self: The server.
+        :param name: The name of the deck.
+        :return: The deck.
+        """
+        import japanese_quiz
+        return japanese_quiz.openDeck(name)
+
+    async def start(self):
+        """
+        This function is used to start listening.
+
+        :param self: The server.
+        :return: None
+        """
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEADER)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        """
+        This function handles a single connection.
+
+        :param self: The server.
+        :param reader: The asyncio StreamReader.
+        :param writer: The asyncio StreamWriter.
+        :return: None
+        """
+        try:
+            (line, headers) = await asyncio.wait_for(readHead(reader), self.idleTimeout)
+            (method, target, _) = line.split(" ", 2)
+            url = urllib.parse.urlsplit(target)
+            query = dict(urllib.parse.parse_qsl(url.query))
+
+            if method != "GET":
+                await self.respond(writer, 405, "text/plain", b"Method Not Allowed")
+            elif url.path == "/":
+                await self.respond(writer, 200, "text/html; charset=utf-8", PAGE.encode("utf-8"))
+            elif url.path == "/decks":
+                import japanese_quiz
+                decks = [{"name": deck.name, "kind": deck.kind, "title": deck.title, "cards": len(deck)}
+                         for deck in japanese_quiz.listDecks()]
+                await self.respond(writer, 200, "application/json", json.dumps(decks, ensure_ascii=False).encode("utf-8"))
+            elif url.path == "/metrics":
+                await self.respond(writer, 200, "text/plain; version=0.0.4", metrics.prometheus().encode("utf-8"))
+            elif url.path == "/quiz" and headers.get("upgrade", "").lower() == "websocket":
+                await self.quiz(reader, writer, headers, query)
+            else:
+                await self.respond(writer, 404, "text/plain", b"Not Found")
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, contentType, body):
+        """
+        This function is used to send a plain HTTP response.
+
+        :param self: The server.
+        :param writer: The asyncio StreamWriter.
+        :param status: The status code.
+        :param contentType: The Content-Type of the body.
+        :param body: The body (bytes).
+        :return: None
+        """
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 503: "Service Unavailable"}
+        writer.write("HTTP/1.1 {} {}\r\nContent-Type: {}\r\nContent-Length: {}\r\nConnection: close\r\n\r\n"
+                     .format(status, reasons[status], contentType, len(body)).encode("latin-1") + body)
+        await writer.drain()
+
+    async def quiz(self, reader, writer, headers, query):
+        """
+        This function is used to run a quiz session over a WebSocket.
+
+        :param self: The server.
+        :param reader: The asyncio StreamReader.
+        :param writer: The asyncio StreamWriter.
+        :param headers: The headers of the upgrade request.
+        :param query: The query string (deck=NAME, keyboard=0 or 1, fuzzy=0 or 1, choices=N,
+                      and user=NAME, who the answers are logged under).
+        :return: None
+        """
+        key = headers.get("sec-websocket-key")
+        if key is None:
+            await self.respond(writer, 400, "text/plain", b"Bad Request")
+            return
+        if self.sessions >= self.maxSessions:
+            await self.respond(writer, 503, "text/plain", b"Service Unavailable")
+            return
+        try:
+            deck = self.deck(query.get("deck", ""))
+        except KeyError:
+            await self.respond(writer, 404, "text/plain", b"Unknown deck")
+            return
+        choices = query.get("choices", "0")
+        if not choices.isdecimal():
+            await self.respond(writer, 400, "text/plain", b"Bad choices")
+            return
+        user = query.get("user", "")
+        if len(user.encode("utf-8")) > deckfile.MAX_USER:
+            await self.respond(writer, 400, "text/plain", b"Bad user")
+            return
+
+        writer.write("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     "Sec-WebSocket-Accept: {}\r\n\r\n".format(acceptKey(key)).encode("latin-1"))
+        await writer.drain()
+
+        self.sessions += 1
+        socket = WebSocket(reader, writer)
+        code = 1000
+        try:
+            # Reading the learner's history waits for the review log's writer, which mustn't hold up the other sessions.
+            history = ()
+            if user and self.log is not None:
+                history = await asyncio.get_running_loop().run_in_executor(None, self.log.deckHistory, deck.name, user)
+            quiz = session.QuizSession(deck, query.get("keyboard", "1") != "0", self.log, fuzzy=query.get("fuzzy", "0") == "1",
+                                       choices=min(int(choices), MAX_CHOICES), user=user, history=history)
+            await self.run(socket, quiz)
+            self.served += 1
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionClosed, ConnectionError):
+            pass
+        except Exception:
+            # Anything else is a bug (or a broken review log): it only ends this session, and the client is told.
+            code = 1011
+            traceback.print_exc()
+        finally:
+            self.sessions -= 1
+            await socket.close(code)
+
+    async def run(self, socket, quiz):
+        """
+        This function is the quiz loop of a session: send a prompt, wait
+        (up to the idle timeout) for the answers, send the result.
+
+        :param self: The server.
+        :param socket: The WebSocket.
+        :param quiz: The QuizSession.
+        :return: None
+        """
+        number = 0
+        rendering = metrics.histogram("quiz_render_seconds", renderer="server")
+        while True:
+            prompt = quiz.nextPrompt()
+            if prompt is None:
+                break
+            number += 1
+            await socket.send({"type": "prompt", "number": number, "text": prompt.text, "labels": prompt.labels,
+                               "choices": prompt.choices})
+
+            while True:
+                message = await asyncio.wait_for(socket.receive(), self.idleTimeout)
+                answers = message.get("answers") if isinstance(message, dict) else None
+                if isinstance(answers, list) and len(answers) == len(prompt.labels) and all(isinstance(a, str) for a in answers):
+                    break
+                await socket.send({"type": "error", "message": "expected {} answer(s)".format(len(prompt.labels))})
+
+            result = quiz.submit(*answers)
+            start = metrics.clock()
+            lines = renderer.feedback(quiz.deck[prompt.card], prompt, result)
+            metrics.since(rendering, start)
+            await socket.send({"type": "result", "points": result.points, "maxPoints": result.maxPoints, "feedback": lines})
+        await socket.send({"type": "score", "score": quiz.score, "maxScore": quiz.maxScore})
+
+class QuizClient:
+    """
+    Used to take a quiz from a QuizServer (mainly for testing it).
+    """
+    def __init__(self, socket):
+        self.socket = socket
+
+    @classmethod
+    async def connect(cls, host, port, deck, keyboard=True):
+        """
+        This function is used to open a quiz session.
+
+        :param host: The server's address.
+        :param port: The server's port.
+        :param deck: The name of the deck.
+        :param keyboard: Whether the client can answer in Japanese.
+        :return: The QuizClient.
+        """
+        (reader, writer) = await asyncio.open_connection(host, port, limit=MAX_MESSAGE)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        target = "/quiz?" + urllib.parse.urlencode({"deck": deck, "keyboard": int(keyboard)})
+        writer.write("GET {} HTTP/1.1\r\nHost: {}:{}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     "Sec-WebSocket-Key: {}\r\nSec-WebSocket-Version: 13\r\n\r\n".format(target, host, port, key).encode("latin-1"))
+        await writer.drain()
+
+        (line, headers) = await readHead(reader)
+        if line.split(" ")[1] != "101" or headers.get("sec-websocket-accept") != acceptKey(key):
+            writer.close()
+            raise ConnectionClosed(line)
+        return cls(WebSocket(reader, writer, client=True))
+
+    async def receive(self):
+        return await self.socket.receive()
+
+    async def answer(self, *answers):
+        await self.socket.send({"answers": list(answers)})
+
+    async def close(self):
+        await self.socket.close()
+
+async def scriptedLearner(host, port, deck, rng):
+    """
+    This function is used to take a whole quiz with made up answers (for load testing).
+
+    :param host: The server's address.
+    :param port: The server's port.
+    :param deck: The name of the deck.
+    :param rng: The random number generator.
+    :return: (prompts answered, final score message)
+    """
+    client = await QuizClient.connect(host, port, deck, keyboard=False)
+    answered = 0
+    try:
+        while True:
+            message = await client.receive()
+            if message["type"] == "prompt":
+                await client.answer(*["?" if rng.random() < 0.5 else "" for _ in message["labels"]])
+                answered += 1
+            elif message["type"] == "score":
+                return (answered, message)
+    finally:
+        await client.close()
+
+async def loadTest(clients, deck, concurrency=1000):
+    """
+    This function is used to run many scripted learners against a local server.
+
+    :param clients: How many learners take the quiz.
+    :param deck: The name of the deck (vocab and kanji decks end after one pass).
+    :param concurrency: The most learners connected at once.
+    :return: None
+    """
+    server = QuizServer(port=0, maxSessions=concurrency)
+    await server.start()
+    limit = asyncio.Semaphore(concurrency)
+    rng = random.Random(0)
+
+    async def learner():
+        async with limit:
+            return await scriptedLearner(server.host, server.port, deck, rng)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[learner() for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    await server.stop()
+
+    prompts = sum(answered for (answered, _) in results)
+    print("[!] {} sessions ({} prompts) in {:.2f}s: {:.0f} sessions/s, {:.0f} prompts/s"
+          .format(len(results), prompts, elapsed, len(results) / elapsed, prompts / elapsed))
+
+async def serve(host, port, maxSessions, idleTimeout):
+    """
+    This function is used to run the server until it's interrupted.
+
+    :param host: The address to listen on.
+    :param port: The port to listen on.
+    :param maxSessions: The most sessions open at once.
+    :param idleTimeout: How many seconds a session can wait for an answer.
+    :return: None
+    """
+    server = QuizServer(host, port, maxSessions, idleTimeout, reviewlog.ReviewLog())
+    await server.start()
+    print("[!] Serving quizzes on http://{}:{}/".format(server.host, server.port))
+    await asyncio.Event().wait()
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Japanese Quiz (日本語クイズ)</title></head>
+<body>
+<h1>Japanese Quiz (日本語クイズ)</h1>
+<p><input id="user" placeholder="Your name"> <select id="deck"></select> <label><input id="keyboard" type="checkbox" checked> Japanese keyboard</label>
+<label><input id="fuzzy" type="checkbox"> Allow typos</label> <label><input id="choices" type="checkbox"> Multiple choice</label> <button id="start">Start</button></p>
+<h2 id="prompt"></h2>
+<form id="form"></form>
+<pre id="feedback"></pre>
+<script>
+var socket = null;
+fetch("/decks").then(function (r) { return r.json(); }).then(function (decks) {
+    decks.forEach(function (d) {
+        var o = document.createElement("option");
+        o.value = d.name;
+        o.textContent = d.title + " (" + d.cards + ")";
+        document.getElementById("deck").appendChild(o);
+    });
+});
+document.getElementById("start").onclick = function () {
+    if (socket) { socket.close(); }
+    var url = "ws://" + location.host + "/quiz?deck=" + encodeURIComponent(document.getElementById("deck").value) +
+        "&keyboard=" + (document.getElementById("keyboard").checked ? 1 : 0) +
+        "&fuzzy=" + (document.getElementById("fuzzy").checked ? 1 : 0) +
+        "&choices=" + (document.getElementById("choices").checked ? 4 : 0) +
+        "&user=" + encodeURIComponent(document.getElementById("user").value);
+    socket = new WebSocket(url);
+    socket.onmessage = function (event) {
+        var m = JSON.parse(event.data);
+        var form = document.getElementById("form");
+        if (m.type === "prompt") {
+            document.getElementById("prompt").textContent = m.text;
+            if (m.choices) {
+                document.getElementById("prompt").textContent += "  " + m.choices.map(function (c, n) { return (n + 1) + " " + c; }).join("  ");
+            }
+            form.innerHTML = "";
+            m.labels.forEach(function (label) {
+                var p = document.createElement("p");
+                p.textContent = label + " ";
+                var input = document.createElement("input");
+                p.appendChild(input);
+                form.appendChild(p);
+            });
+            var button = document.createElement("button");
+            button.textContent = "Answer";
+            form.appendChild(button);
+            form.querySelector("input").focus();
+        } else if (m.type === "result" || m.type === "error") {
+            document.getElementById("feedback").textContent = m.type === "result" ? m.feedback.join("\\n") : m.message;
+        } else if (m.type === "score") {
+            document.getElementById("prompt").textContent = m.score + "/ " + m.maxScore + " 正解しました。";
+            form.innerHTML = "";
+        }
+    };
+};
+document.getElementById("form").onsubmit = function (event) {
+    event.preventDefault();
+    var answers = Array.prototype.map.call(this.querySelectorAll("input"), function (i) { return i.value; });
+    socket.send(JSON.stringify({answers: answers}));
+};
+</script>
+</body>
+</html>
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Japanese Quiz (日本語クイズ) server")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="the port to listen on")
+    parser.add_argument("--max-sessions", type=int, default=10000, help="the most sessions open at once")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds a session can sit idle")
+    parser.add_argument("--clients", type=int, help="load test a local server with this many scripted learners instead")
+    parser.add_argument("--deck", default="vocab-chapter1", help="the deck the scripted learners take")
+    args = parser.parse_args()
+
+    if args.clients:
+        asyncio.run(loadTest(args.clients, args.deck))
+    else:
+        try:
+            asyncio.run(serve(args.host, args.port, args.max_sessions, args.timeout))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,431 @@
+"""
+desc: The quizzes without any input or output. A QuizSession hands out one prompt at a time (nextPrompt) and grades
+        the answers it's given (submit), following the same rules as kanaQuiz, kanjiQuizPrompt and vocabQuizPrompt.
+        Whatever talks to the learner (the terminal menu or the quiz server) only has to show the prompt and
+        send back what was typed.
+
+        Cards are scheduled by SM-2 (see scheduler.py). The learner's past answers in the deck are replayed
+        from the review log when a session starts, and a quiz of a whole deck only asks the cards that are due
+        (the cards never seen count as due), the most overdue first. When no card is due every card is asked,
+        the soonest due first. A session without a learner (user "") starts fresh, since every anonymous
+        learner's answers are logged under the same empty name.
+
+        A session only holds indices into its deck, so it can be snapshotted into a few bytes a card (the cards
+        left and when they're due, the missed cards and their weights, the SM-2 state of the cards answered
+        before, and the score) and restored later, in another process or after a crash.
+"""
+
+import array
+import collections
+import math
+import random
+import struct
+import time
+import uuid
+
+import deckfile
+import distractors
+import fuzzy
+import grading
+import metrics
+import reviewlog
+import sampling
+import scheduler
+
+# What a prompt asks for. The card is the index of the card in the deck, labels has one entry for every
+# answer the prompt expects, and choices lists the options of a multiple choice prompt (None otherwise).
+Prompt = collections.namedtuple("Prompt", ["card", "direction", "text", "labels", "choices"], defaults=(None,))
+
+# How an answer was graded. wrong is the part of a half correct Kanji answer that was wrong, and almost is
+# the English answer a near miss was taken for (fuzzy grading only).
+Result = collections.namedtuple("Result", ["card", "direction", "answers", "points", "maxPoints", "wrong", "almost"],
+                                defaults=(None,))
+
+# Snapshot layout: version, flags, length of the deck name, length of the learner's name, session id, score, maxScore,
+# last card, current prompt's card and direction, number of queued cards, number of missed cards, number of multiple
+# choice options, number of card states. The deck name, the learner's name, the queued cards (in order), the missed
+# cards, their weights, when each queued card is due, the cards with a state, and their states follow.
+SNAPSHOT = struct.Struct("<BBBB16sIIIIBIIHI")
+SNAPSHOT_VERSION = 5
+CARD_STATE = struct.Struct("<ffHH")      # stability, difficulty, reps, lapses (see scheduler.CardState).
+KEYBOARD = 0x01         # Snapshot flag: the learner has a Japanese keyboard.
+HAS_PROMPT = 0x02       # Snapshot flag: a prompt was waiting for an answer.
+HAS_LAST = 0x04         # Snapshot flag: a card has been answered.
+WIDE = 0x08             # Snapshot flag: card indices are 4 bytes (decks with more than 65535 cards).
+FUZZY = 0x10            # Snapshot flag: English answers with a typo or two are accepted.
+
+# The directions a prompt can be asked in, by their code in a snapshot.
+DIRECTIONS = (grading.FORWARD, grading.REVERSE, grading.KANJI, reviewlog.READING_AND_MEANING)
+
+def scheduleDeck(deck, rng=random, now=None, cards=None, groups=None, history=()):
+    """
+    This function is used to schedule the cards of a deck for a quiz. Cards
+    that were answered before are due when SM-2 says they are, the others
+    are due now (in a random order). Of a whole deck, only the cards that
+    are due are queued (every card if none are).
+
+    :param deck: The deck.
+    :param rng: The random number generator.
+    :param now: The current time (defaults to now).
+    :param cards: The indices of the cards to schedule (None for every card that's due).
+    :param groups: Groups of card indices asked one group after another, each in a random order (instead of cards).
+    :param history: The learner's past answers in the deck: (card, points, maxPoints, timestamp) rows, oldest first.
+    :return: A Scheduler holding the state of every card answered before, with the cards to ask queued.
+    """
+    queue = scheduler.Scheduler()
+    if now is None:
+        now = time.time()
+    queue.replay((card, scheduler.qualityOf(points, maxPoints), timestamp) for (card, points, maxPoints, timestamp) in history)
+
+    def schedule(i, due):
+        if i in queue:
+            state = queue.state(i)
+            if due is not None:
+                state.due = due
+            queue.push(i, state)
+        else:
+            queue.add(i, now + rng.random() if due is None else due)
+
+    if groups is not None:
+        for (n, group) in enumerate(groups):
+            for i in group:
+                schedule(i, now + n + rng.random())
+        return queue
+    if cards is None:
+        cards = range(len(deck))
+        if queue.cards:
+            due = [i for i in cards if i not in queue or queue.state(i).due <= now + scheduler.LEARN_AHEAD]
+            cards = due or cards
+    for i in cards:
+        schedule(i, None)
+    return queue
+
+class QuizSession:
+    """
+    Used to run a quiz on a deck one prompt at a time.
+    """
+    def __init__(self, deck, keyboard=True, log=None, rng=random, fuzzy=False, choices=0, confusions=None, cards=None,
+                 groups=None, user="", history=None):
+        """
+        This function is used to start a quiz on a deck.
+
+        :param self: The object.
+        :param deck: The deck (its kind picks the quiz: kana, kanji, or vocab).
+        :param keyboard: Whether the learner has a Japanese keyboard (vocab quizzes only ask English without one).
+        :param log: A ReviewLog to log every answer to (None to not log).
+        :param rng: The random number generator.
+        :param fuzzy: Whether English answers with a typo or two are almost correct (see fuzzy.py).
+        :param choices: How many options kana and vocab prompts show (0 asks for the answer to be typed).
+        :param confusions: A confusion.Recorder every kana answer is added to (None to not keep track).
+        :param cards: Only quiz these cards (i.e. a drill, None quizzes the whole deck).
+        :param groups: Only quiz these groups of cards, one group after another (i.e. Kanji that look alike).
+        :param user: The learner (answers are logged under their name and the cards are scheduled by their past answers).
+        :param history: The learner's past answers in the deck (see ReviewLog.deckHistory, None reads them from the log).
+        """
+        if len(user.encode("utf-8")) > deckfile.MAX_USER:
+            raise ValueError("the learner's name is longer than {} bytes".format(deckfile.MAX_USER))
+        self.deck = deck
+        self.keyboard = keyboard
+        self.fuzzy = fuzzy
+        self.choices = choices if deck.kind in ("kana", "vocab") else 0
+        self.log = log
+        self.confusions = confusions
+        self.rng = rng
+        self.user = user
+        self.id = reviewlog.newSession()
+
+        self.score = 0
+        if history is None:
+            history = log.deckHistory(deck.name, user) if log is not None and user else ()
+        self.queue = scheduleDeck(deck, rng, cards=cards, groups=groups, history=history)
+        self.maxScore = len(self.queue) if deck.kind in ("kana", "vocab") else 0
+        self.retry = sampling.WeightedBag(rng=rng)
+        self.last = None
+        self.prompt = None
+        self.correctChoice = None
+        self.asked = None
+        self.timeMetrics()
+
+    def timeMetrics(self):
+        """
+        This function is used to get the histograms the session's prompts
+        and grading are timed in (see metrics.py).
+
+        :param self: The session.
+        :return: None
+        """
+        self.promptTimes = metrics.histogram("quiz_prompt_seconds", deck=self.deck.name)
+        self.cardTimes = metrics.family("quiz_card_prompt_seconds", "card", deck=self.deck.name)
+        self.gradeTimes = metrics.family("quiz_grade_seconds", "direction", deck=self.deck.name)
+
+    @property
+    def finished(self):
+        return self.prompt is None and not self.queue and not self.retry
+
+    @property
+    def firstPassDone(self):
+        """
+        Whether every card has been asked once (kana quizzes keep drilling missed cards after that).
+        """
+        return not self.queue
+
+    def nextPrompt(self):
+        """
+        This function is used to get the next prompt. The same prompt is
+        returned until it's answered.
+
+        :param self: The session.
+        :return: The Prompt (None once the quiz is over).
+        """
+        if self.prompt is not None:
+            return self.prompt
+
+        if self.queue:
+            i = self.queue.pop(ahead=math.inf)      # Only the cards to ask were queued, due or not.
+        elif self.retry:
+            i = self.retry.sample()
+            while i == self.last and len(self.retry) > 1:
+                i = self.retry.sample()
+        else:
+            return None
+
+        if self.deck.kind == "kanji":
+            direction = reviewlog.READING_AND_MEANING if self.rng.randint(0, 1) == 0 else grading.KANJI
+        elif self.deck.kind == "vocab" and self.keyboard and self.rng.randint(0, 1) == 1:
+            direction = grading.REVERSE
+        else:
+            direction = grading.FORWARD
+        self.prompt = self.makePrompt(i, direction)
+        self.asked = metrics.clock()
+        return self.prompt
+
+    def addChoices(self, prompt):
+        """
+        This function is used to turn a prompt into a multiple choice prompt.
+        The wrong options are the cards most easily confused with the card
+        (see distractors.py).
+
+        :param self: The session.
+        :param prompt: The prompt.
+        :return: The multiple choice Prompt.
+        """
+        options = distractors.choices(self.deck, prompt.card, self.choices, self.rng)
+        if prompt.direction == grading.REVERSE:
+            texts = [self.deck[j].question for j in options]
+        else:
+            texts = [self.deck[j].correctAnswer for j in options]
+        self.correctChoice = options.index(prompt.card)
+        return prompt._replace(choices=texts)
+
+    def makePrompt(self, i, direction):
+        """
+        This function is used to build the prompt for a card.
+
+        :param self: The session.
+        :param i: The index of the card.
+        :param direction: The direction it's asked in (one of DIRECTIONS).
+        :return: The Prompt.
+        """
+        prompt = self.questionPrompt(i, direction)
+        if self.choices:
+            prompt = self.addChoices(prompt)
+        return prompt
+
+    def questionPrompt(self, i, direction):
+        """
+        This function is used to build the (typed answer) prompt for a card.
+
+        :param self: The session.
+        :param i: The index of the card.
+        :param direction: The direction it's asked in.
+        :return: The Prompt.
+        """
+        element = self.deck[i]
+        if self.deck.kind == "kana":
+            return Prompt(i, direction, element.question, [""])
+        if direction == reviewlog.READING_AND_MEANING:
+            return Prompt(i, direction, element.kanji, ["Enter the Hiragana of this Kanji?", "What does this Kanji mean?"])
+        if direction == grading.KANJI:
+            return Prompt(i, direction, element.meaning, ["What is the Kanji for the word above?"])
+        if direction == grading.REVERSE:
+            return Prompt(i, direction, element.reverseQuestion("Vocab").question, ["What is the English for the word above?"])
+
+        text = element.question
+        if element.context is not None:
+            text += " (" + element.context + ")"
+        return Prompt(i, direction, text, ["What is the Japanese for the word above?"])
+
+    def submit(self, *answers):
+        """
+        This function is used to grade the answer(s) to the current prompt.
+
+        :param self: The session.
+        :param answers: One answer for every label of the prompt.
+        :return: The Result.
+        """
+        prompt = self.nextPrompt()
+        if prompt is None:
+            raise ValueError("the quiz is over")
+        if len(answers) != len(prompt.labels):
+            raise ValueError("expected {} answer(s)".format(len(prompt.labels)))
+
+        # How long the learner took (a restored prompt wasn't timed), and how long grading takes.
+        start = metrics.clock()
+        i = prompt.card
+        if self.asked is not None and metrics.enabled:
+            latency = (start - self.asked) // 1000
+            self.promptTimes.record(latency)
+            self.cardTimes[i].record(latency)
+        element = self.deck[i]
+        wrong = None
+        almost = None
+        if prompt.choices and answers[0].strip() in [str(n + 1) for n in range(len(prompt.choices))]:
+            # An option was picked. Options with the same text as the right one are right too.
+            chosen = prompt.choices[int(answers[0]) - 1]
+            points = int(chosen == prompt.choices[self.correctChoice])
+            maxPoints = 1
+            response = chosen
+            answers = (chosen,)
+        elif prompt.direction == reviewlog.READING_AND_MEANING:
+            (points, wrong) = element.isCorrect(answers[0], answers[1])
+            maxPoints = 2
+            response = answers[0] + "\t" + answers[1]
+            if self.fuzzy and wrong == element.meaning and points < maxPoints:
+                almost = fuzzy.almost(self.deck, element, answers[1])
+                if almost is not None:
+                    points += 1
+                    wrong = None if points == maxPoints else element.hiragana
+        elif prompt.direction == grading.KANJI:
+            points = int(grading.grade(element.answerKey, grading.KANJI, answers[0]))
+            maxPoints = 1
+            response = answers[0]
+        else:
+            points = int(element.isCorrect(answers[0], prompt.direction))
+            maxPoints = 1
+            response = answers[0]
+            if self.fuzzy and not points and prompt.direction == grading.REVERSE:
+                almost = fuzzy.almost(self.deck, element, answers[0])
+                points = int(almost is not None)
+
+        # A near miss earns its points, but the card counts as only half remembered.
+        quality = scheduler.qualityOf(points, maxPoints) if almost is None else scheduler.HALF_CORRECT
+        metrics.since(self.gradeTimes[prompt.direction], start)
+        self.queue.review(i, quality, requeue=False)
+        if self.log is not None:
+            self.log.record(self.deck.name, i, prompt.direction, response, points, maxPoints, self.id, self.user)
+        if self.confusions is not None:
+            self.confusions.record(self.deck, i, response, points == maxPoints)
+
+        if self.deck.kind == "kana":
+            # Missed kana are drilled (by how often they were missed) until they're answered correctly.
+            if points:
+                if i in self.retry:
+                    self.retry.remove(i)
+                else:
+                    self.score += 1
+            else:
+                self.retry.add(i, self.retry.weight(i) + 1 if i in self.retry else 1)
+        else:
+            self.score += points
+            if self.deck.kind == "kanji":
+                self.maxScore += maxPoints
+
+        self.last = i
+        self.prompt = None
+        self.asked = None
+        return Result(i, prompt.direction, answers, points, maxPoints, wrong, almost)
+
+    def snapshot(self):
+        """
+        This function is used to save the session into a few hundred bytes.
+
+        :param self: The session.
+        :return: The snapshot (bytes).
+        """
+        queued = self.queue.queuedCards()
+        missed = list(self.retry.weights)
+        states = [i for i in queued + missed if i in self.queue and (self.queue.state(i).reps or self.queue.state(i).lapses)]
+        wide = len(self.deck) > 0xFFFF
+        flags = (KEYBOARD if self.keyboard else 0) | (WIDE if wide else 0) | (FUZZY if self.fuzzy else 0)
+        if self.prompt is not None:
+            flags |= HAS_PROMPT
+        if self.last is not None:
+            flags |= HAS_LAST
+        name = self.deck.name.encode("utf-8")
+        user = self.user.encode("utf-8")
+
+        head = SNAPSHOT.pack(SNAPSHOT_VERSION, flags, len(name), len(user), uuid.UUID(self.id).bytes, self.score, self.maxScore,
+                             self.last or 0, self.prompt.card if self.prompt else 0,
+                             DIRECTIONS.index(self.prompt.direction) if self.prompt else 0, len(queued), len(missed), self.choices,
+                             len(states))
+        typecode = "I" if wide else "H"
+        state = self.queue.state
+        return (head + name + user + array.array(typecode, queued + missed).tobytes() + bytes(self.retry.weight(i) for i in missed)
+                + array.array("d", [state(i).due for i in queued]).tobytes() + array.array(typecode, states).tobytes()
+                + b"".join(CARD_STATE.pack(state(i).stability, state(i).difficulty, state(i).reps, state(i).lapses)
+                           for i in states))
+
+    @classmethod
+    def restore(cls, data, openDeck, log=None, rng=random, confusions=None):
+        """
+        This function is used to pick a session back up from a snapshot.
+
+        :param data: The snapshot.
+        :param openDeck: Called with the name of a deck to open it.
+        :param log: A ReviewLog to log every answer to (None to not log).
+        :param rng: The random number generator.
+        :param confusions: A confusion.Recorder every kana answer is added to (None to not keep track).
+        :return: The QuizSession.
+        """
+        (version, flags, nameLength, userLength, sessionId, score, maxScore, last, promptCard, promptDirection,
+            queued, missed, choices, stated) = SNAPSHOT.unpack_from(data, 0)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError("not a version {} session snapshot".format(SNAPSHOT_VERSION))
+        offset = SNAPSHOT.size
+        deck = openDeck(data[offset:offset + nameLength].decode("utf-8"))
+        offset += nameLength
+        user = data[offset:offset + userLength].decode("utf-8")
+        offset += userLength
+
+        def read(typecode, count):
+            nonlocal offset
+            values = array.array(typecode)
+            values.frombytes(data[offset:offset + count * values.itemsize])
+            offset += count * values.itemsize
+            return values
+
+        typecode = "I" if flags & WIDE else "H"
+        cards = read(typecode, queued + missed)
+        weights = read("B", missed)
+        dues = read("d", queued)
+        states = read(typecode, stated)
+
+        quiz = cls.__new__(cls)
+        quiz.deck = deck
+        quiz.keyboard = bool(flags & KEYBOARD)
+        quiz.fuzzy = bool(flags & FUZZY)
+        quiz.choices = choices
+        quiz.correctChoice = None
+        quiz.asked = None
+        quiz.timeMetrics()
+        quiz.log = log
+        quiz.confusions = confusions
+        quiz.rng = rng
+        quiz.user = user
+        quiz.id = uuid.UUID(bytes=sessionId).hex
+        quiz.score = score
+        quiz.maxScore = maxScore
+        quiz.last = last if flags & HAS_LAST else None
+
+        quiz.queue = scheduler.Scheduler()
+        for (i, due) in zip(cards[:queued], dues):
+            quiz.queue.add(i, due)
+        for i in states:
+            quiz.queue.load(i, *CARD_STATE.unpack_from(data, offset))
+            offset += CARD_STATE.size
+        quiz.retry = sampling.WeightedBag(rng=rng)
+        for (i, weight) in zip(cards[queued:], weights):
+            quiz.retry.add(i, weight)
+
+        quiz.prompt = quiz.makePrompt(promptCard, DIRECTIONS[promptDirection]) if flags & HAS_PROMPT else None
+        return quiz
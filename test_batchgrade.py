@@ -0,0 +1,27 @@
+"""
+desc: Tests of grading submissions (see batchgrade.py).
+
+        python3 -m pytest test_batchgrade.py
+"""
+
+import batchgrade
+import japanese_quiz
+
+def test_bad_cards_are_errors():
+    """
+    This function is used to check that a submission whose card isn't a
+    card index is graded as an error instead of stopping the whole batch.
+
+    :return: None
+    """
+    answer = japanese_quiz.openDeck("hiragana")[0].correctAnswer
+    lines = ['{{"student": "mika", "deck": "hiragana", "card": {}, "answer": "{}"}}\n'.format(card, answer)
+             for card in ("0", "1e400", "-1e400", "Infinity", "NaN", "1.5", "true", "-1", '"0"', "null")]
+    (results, _) = batchgrade.gradeChunk("jsonl", lines)
+    assert [r[-1] for r in results] == ["", "unknown card", "unknown card", "unknown card", "unknown card", "unknown card",
+                                        "unknown card", "unknown card", "", "unknown card"]
+    assert results[0][5] == results[8][5] == 1
+
+    (results, _) = batchgrade.gradeChunk("csv", [{"student": "mika", "deck": "hiragana", "card": card, "answer": answer}
+                                                 for card in ("0", " 0 ", "1e400", "inf", "-1", "")])
+    assert [r[-1] for r in results] == ["", "", "unknown card", "unknown card", "unknown card", "unknown card"]
@@ -0,0 +1,54 @@
+"""
+desc: Tests of QuizSession (see session.py).
+
+        python3 -m pytest test_session.py
+"""
+
+import random
+
+import pytest
+
+import distractors
+import japanese_quiz
+import reviewlog
+import session
+
+def test_drill_multiple_choice(tmp_path, monkeypatch):
+    """
+    This function is used to check that a conjugation drill can be taken as
+    multiple choice (its options are cached by the vocab deck it's built from).
+
+    :param tmp_path: A scratch directory (pytest fixture).
+    :param monkeypatch: The pytest monkeypatch fixture.
+    :return: None
+    """
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(distractors, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(distractors, "tables", {})
+
+    drill = japanese_quiz.openDeck("conjugations:vocab-chapter3")
+    quiz = session.QuizSession(drill, False, choices=4, cards=range(len(drill)), rng=random.Random(1))
+    while not quiz.finished:
+        prompt = quiz.nextPrompt()
+        assert prompt.choices[quiz.correctChoice] == drill[prompt.card].correctAnswer
+        assert quiz.submit(str(quiz.correctChoice + 1)).points == 1
+    assert quiz.score == quiz.maxScore == len(drill)
+    assert len(list(tmp_path.iterdir())) == 1
+
+def test_anonymous_sessions_start_fresh(tmp_path):
+    """
+    This function is used to check that a learner's session is scheduled by
+    their own answers, and that a session without a learner ignores the log.
+
+    :param tmp_path: A scratch directory (pytest fixture).
+    :return: None
+    """
+    log = reviewlog.ReviewLog(str(tmp_path / "reviews.db"))
+    try:
+        hiragana = japanese_quiz.openDeck("hiragana")
+        for user in ("", "mika"):
+            log.record("hiragana", 0, "forward", "a", 1, user=user)
+        assert session.QuizSession(hiragana, log=log, user="mika").queue.state(0).reps == 1
+        assert session.QuizSession(hiragana, log=log).queue.state(0).reps == 0
+    finally:
+        log.close()
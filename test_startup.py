@@ -0,0 +1,23 @@
+"""
+desc: Tests of how the quiz starts (see benchmarks.py). Getting to the menu mustn't import any of the modules
+        that are only needed once a quiz starts.
+
+        python3 -m pytest test_startup.py
+"""
+
+import pytest
+
+import benchmarks
+
+@pytest.mark.parametrize("args", [[], ["--user", "mika", "--fuzzy", "--choices", "4", "--level", "10"], ["--plain"]])
+def test_menu_imports_no_lazy_modules(args):
+    """
+    This function is used to check that starting the quiz (as far as the
+    menu) doesn't import any of benchmarks.LAZY_MODULES.
+
+    :param args: The quiz's command line arguments.
+    :return: None
+    """
+    modules = benchmarks.startupModules(args)
+    assert "japanese_quiz" not in modules and "deckfile" in modules
+    assert [module for module in benchmarks.LAZY_MODULES if module in modules] == []